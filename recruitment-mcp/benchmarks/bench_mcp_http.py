@@ -0,0 +1,124 @@
+# bench_mcp_http.py — streamable-HTTP MCP 서버 부하 테스트 (워커 수별 처리량)
+#
+# 실행: recruitment-mcp> python benchmarks/bench_mcp_http.py [--workers 1 2 4] [--concurrency 32] [--duration 10]
+#
+# 워커 수마다 python -m src.mcp_http <server> --workers N 을 띄우고
+# 클라이언트 프로세스 여러 개(프로세스당 MCP 세션 concurrency/client-procs개)로 같은 도구를 duration초 동안 호출해
+# 처리량(req/s)과 지연시간(p50/p95)을 비교합니다. 마지막에 SIGTERM을 보내 정상 종료에 걸린 시간도 잽니다.
+# 기본 도구(searchPoliciesByRegion)는 정책 미러(YOUTH_MIRROR_PATH)를 CPU로 검색하므로 업스트림 API 없이도 측정됩니다.
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def wait_for_port(port: int, timeout: float = 60) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return True
+        time.sleep(0.2)
+    return False
+
+
+async def _client_tasks(url: str, sessions: int, tool: str, arguments: dict, duration: float):
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    latencies, errors = [], 0
+
+    async def worker(deadline: float):
+        nonlocal errors
+        async with streamablehttp_client(url) as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        result = await session.call_tool(tool, arguments)
+                        if result.isError:
+                            errors += 1
+                            continue
+                    except Exception:
+                        errors += 1
+                        continue
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(worker(deadline) for _ in range(sessions)), return_exceptions=True)
+    return latencies, errors
+
+
+def run_client_process(args):
+    return asyncio.run(_client_tasks(*args))
+
+
+def run_load(port: int, args) -> dict:
+    url = f"http://127.0.0.1:{port}/mcp"
+    arguments = json.loads(args.args)
+    per_proc = max(1, args.concurrency // args.client_procs)
+    jobs = [(url, per_proc, args.tool, arguments, args.duration)] * args.client_procs
+    with multiprocessing.Pool(args.client_procs) as pool:
+        results = pool.map(run_client_process, jobs)
+    latencies = sorted(ms for part, _ in results for ms in part)
+    errors = sum(err for _, err in results)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] if latencies else float("nan")
+
+    return {"requests": len(latencies), "errors": errors, "rps": len(latencies) / args.duration,
+            "p50": pct(50), "p95": pct(95)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--server", default="youth_policy")
+    parser.add_argument("--tool", default="searchPoliciesByRegion")
+    # **kwargs를 받는 도구는 MCP 스키마에 'kwargs' 필수 필드가 생기므로 빈 dict를 함께 보냄
+    parser.add_argument("--args", default='{"regionCode": "44790", "pageSize": 10, "kwargs": {}}')
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8190)
+    args = parser.parse_args()
+
+    print(f"{args.server}.{args.tool} {args.args} — 동시 세션 {args.concurrency}, {args.duration:g}초, CPU {os.cpu_count()}개")
+    print(f"{'workers':>7} {'req/s':>8} {'p50(ms)':>8} {'p95(ms)':>8} {'errors':>6} {'shutdown(s)':>11}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for workers in args.workers:
+            env = {**os.environ, "MCP_SHARED_CACHE_PATH": os.path.join(cache_dir, f"shared-{workers}.sqlite3")}
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "src.mcp_http", args.server, "--workers", str(workers), "--port", str(args.port)],
+                cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                if not wait_for_port(args.port):
+                    raise RuntimeError(f"서버가 {args.port} 포트에서 시작되지 않았습니다")
+                # 워커가 모두 앱을 올릴 시간 + 첫 요청 워밍업
+                time.sleep(1 + workers)
+                result = run_load(args.port, args)
+            finally:
+                started = time.perf_counter()
+                proc.terminate()  # SIGTERM → uvicorn 정상 종료
+                try:
+                    proc.wait(timeout=60)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                shutdown = time.perf_counter() - started
+            print(f"{workers:>7} {result['rps']:>8.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+                  f"{result['errors']:>6} {shutdown:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# bench_region_matcher.py — searchPoliciesByRegion 지역 필터 벤치마크 (부분 문자열 반복 검사 vs 키워드 오토마톤 태그)
+#
+# 실행: recruitment-mcp> python benchmarks/bench_region_matcher.py [--feed .youth_mirror/policies.json] [--items 3000] [--repeat 20]
+#
+# 정책 전체 피드(미러 파일이 있으면 그 파일, 없으면 합성 피드)에 대해
+#   1) 기존 방식: 요청마다 정책별 full_text를 만들고 target in / any(sibling in) 로 최대 17번 부분 문자열 검사
+#   2) 새 방식: 수집 시 REGION_MATCHER로 정책별 지역 태그를 한 번 계산 → 요청 시 집합 연산만 수행
+# 의 요청당 필터 시간과 수집(태그 계산) 1회 비용을 비교하고, 두 방식의 결과가 같은지 확인합니다.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import youth_policy_server as yps  # noqa: E402
+
+
+def make_feed(n_items: int, seed: int = 7):
+    rnd = random.Random(seed)
+    places = ["청양", "충남", "강릉", "강원", "김제", "전북", "정선", "영월", "천안", "춘천", "전주", "서울", "부산", "전국"]
+    filler = "청년의 안정적인 정착과 자립을 위해 주거비, 교통비, 교육비 및 취업 준비 비용을 지원하는 사업입니다. "
+    feed = []
+    for i in range(n_items):
+        place = rnd.choice(places)
+        feed.append({
+            "plcyNo": f"R{i:06d}",
+            "plcyNm": f"{place} 청년 {rnd.choice(['월세', '창업', '일자리', '교육', '교통비'])} 지원 {i}",
+            "plcyExplnCn": (f"{rnd.choice(places)} 지역 " if rnd.random() < 0.3 else "") + filler * rnd.randint(1, 4),
+            "cnsgNmor": rnd.choice(["", f"{place}청년센터", "한국고용정보원"]),
+        })
+    return feed
+
+
+def legacy_filter(policies, region_code):
+    """Aho-Corasick 도입 전 searchPoliciesByRegion의 지역 필터 (정책마다 본문을 이어 붙여 키워드 부분 문자열 검색)"""
+    region_info = yps.REGION_MAPPING[region_code]
+    target_keyword = region_info["keywords"][0]
+    sibling_keywords = set(region_info.get("sibling_city_keywords", []))
+    filtered = []
+    for policy in policies:
+        full_text = " ".join(filter(None, [
+            policy.get("plcyNm", ""),
+            policy.get("plcyExplnCn", ""),
+            policy.get("cnsgNmor", ""),
+        ]))
+        if target_keyword in full_text:
+            filtered.append(policy)
+            continue
+        if any(sibling in full_text for sibling in sibling_keywords):
+            continue
+        filtered.append(policy)
+    return filtered
+
+
+def per_request(fn, policies, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for code in yps.REGION_MAPPING:
+            fn(policies, code)
+    return (time.perf_counter() - started) / (repeat * len(yps.REGION_MAPPING))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feed", default=yps.YOUTH_MIRROR_PATH)
+    parser.add_argument("--items", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if os.path.exists(args.feed):
+        with open(args.feed, encoding="utf-8") as f:
+            feed = json.load(f)["policies"]
+        print(f"피드: {args.feed} ({len(feed)}건)")
+    else:
+        feed = make_feed(args.items)
+        print(f"피드: 합성 {len(feed)}건 (미러 파일 없음)")
+
+    started = time.perf_counter()
+    snapshot = yps.PolicySnapshot(feed, time.time())
+    build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for policy in snapshot.policies:
+        yps.REGION_MATCHER.find(yps._region_text(policy))
+    tag_s = time.perf_counter() - started
+    yps.policy_mirror.snapshot = snapshot
+    policies = snapshot.policies
+
+    for code in yps.REGION_MAPPING:
+        assert legacy_filter(policies, code) == yps.filter_policies_for_region(policies, code), code
+
+    legacy_s = per_request(legacy_filter, policies, args.repeat)
+    tagged_s = per_request(yps.filter_policies_for_region, policies, args.repeat)
+    print(f"{'방식':<22} {'요청당(ms)':>10}")
+    print(f"{'legacy substring scan':<22} {legacy_s * 1000:>10.2f}")
+    print(f"{'ingest tags + set ops':<22} {tagged_s * 1000:>10.2f}   (x{legacy_s / tagged_s:.1f})")
+    print(f"수집 1회: 스냅샷 전체 {build_s * 1000:.1f}ms 중 지역 태그 계산 {tag_s * 1000:.1f}ms "
+          f"(요청 {tag_s / max(legacy_s - tagged_s, 1e-9):.1f}회분이면 회수)")
+
+
+if __name__ == "__main__":
+    main()
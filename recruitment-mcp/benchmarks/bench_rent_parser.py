@@ -0,0 +1,90 @@
+# bench_rent_parser.py — MOLIT 전월세 XML 파서 벤치마크 (DOM vs 스트리밍 타입 파서)
+#
+# 실행: recruitment-mcp> python benchmarks/bench_rent_parser.py [--items 5000 20000 100000]
+#
+# 큰 월 덤프(수만 건)를 가정한 합성 XML로
+#   1) 기존 방식: ET.fromstring DOM → 문자열 dict → 소비처에서 replace(',') / isdigit()
+#   2) 새 방식: realestate_server.iter_rent_records 스트리밍 → RentRecord (수집 시 1회 타입 변환)
+# 의 파싱 시간과 tracemalloc 최대 메모리 / 결과 보유 메모리를 비교합니다.
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import realestate_server  # noqa: E402
+
+
+def make_month_dump(n_items: int, seed: int = 42) -> bytes:
+    rnd = random.Random(seed)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        "<response><header><resultCode>000</resultCode><resultMsg>OK</resultMsg></header>"
+        "<body><items>"
+    ]
+    for i in range(n_items):
+        rent = 0 if rnd.random() < 0.4 else rnd.randint(10, 150)
+        parts.append(
+            "<item>"
+            f"<aptNm>테스트아파트{i % 500}</aptNm><buildYear>{rnd.randint(1985, 2024)}</buildYear>"
+            "<contractTerm>25.01~27.01</contractTerm><contractType>신규</contractType>"
+            f"<dealDay>{rnd.randint(1, 28)}</dealDay><dealMonth>1</dealMonth><dealYear>2025</dealYear>"
+            f"<deposit>{rnd.randint(500, 60000):,}</deposit><excluUseAr>{rnd.uniform(18, 140):.4f}</excluUseAr>"
+            f"<floor>{rnd.randint(1, 30)}</floor><jibun>{rnd.randint(1, 999)}</jibun>"
+            f"<monthlyRent>{rent}</monthlyRent><preDeposit></preDeposit><preMonthlyRent></preMonthlyRent>"
+            "<sggCd>44790</sggCd><umdNm>읍내리</umdNm><useRRRight></useRRRight>"
+            "</item>"
+        )
+    parts.append(f"</items><numOfRows>{n_items}</numOfRows><pageNo>1</pageNo><totalCount>{n_items}</totalCount></body></response>")
+    return "".join(parts).encode("utf-8")
+
+
+def parse_dom(xml_bytes: bytes):
+    """기존 PerfectChatbot.parse_apartment_xml + 소비처 재파싱과 동일한 작업"""
+    root = ET.fromstring(xml_bytes)
+    rows = []
+    for item in root.findall(".//item"):
+        row = {child.tag: child.text.strip() if child.text else "" for child in item}
+        deposit = row.get("deposit", "0").replace(",", "")
+        rent = row.get("monthlyRent", "0").replace(",", "")
+        row["_deposit"] = int(deposit) if deposit.isdigit() else 0
+        row["_rent"] = int(rent) if rent.isdigit() else 0
+        rows.append(row)
+    return rows
+
+
+def parse_streaming(xml_bytes: bytes):
+    chunks = realestate_server._iter_chunks(xml_bytes)
+    return list(realestate_server.iter_rent_records(chunks))
+
+
+def measure(fn, xml_bytes: bytes):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(xml_bytes)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(result), elapsed, peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, nargs="+", default=[5000, 20000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'parser':<10} {'time(s)':>8} {'peak(MB)':>9} {'kept(MB)':>9}")
+    for n_items in args.items:
+        xml_bytes = make_month_dump(n_items)
+        for name, fn in (("dom", parse_dom), ("streaming", parse_streaming)):
+            count, elapsed, peak, retained = measure(fn, xml_bytes)
+            assert count == n_items
+            print(f"{n_items:>8} {name:<10} {elapsed:>8.3f} {peak / 2**20:>9.1f} {retained / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
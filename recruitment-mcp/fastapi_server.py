@@ -6,14 +6,20 @@ import traceback
 import time
 import httpx
 import asyncio
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from sentence_transformers import SentenceTransformer, util
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from src import metrics, realestate_server
+from src.stage_timer import StageTimer
+from src.tracing import span
+
 # [1] 환경 설정 및 AI 모델 로딩
 load_dotenv()
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'True'
@@ -28,13 +34,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id", "Server-Timing"],
 )
 
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """
+    요청마다 루트 span(TRACE_ENABLED=1) + 처리 중 요청 수/처리 시간 메트릭.
+    하위 단계(데이터 수집, 유사도, AI 리포트)는 자식 span과 단계별 히스토그램으로 기록됨
+    """
+    started = time.perf_counter()
+    status = 500
+    metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        with span(f"http {request.method} {request.url.path}") as sp:
+            response = await call_next(request)
+            status = response.status_code
+            sp.set(status_code=status)
+            if sp.trace_id:
+                response.headers["X-Trace-Id"] = sp.trace_id
+            return response
+    finally:
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+        # 라벨은 경로 템플릿으로 (없는 경로는 하나로 묶어 라벨 수가 늘어나지 않게)
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, method=request.method,
+            route=getattr(route, "path", "unmatched"), status=str(status),
+        )
+
 print("🔄 AI 모델 로딩 중...")
 device = "cuda" if torch.cuda.is_available() else "cpu"
 model = SentenceTransformer('BM-K/KoSimCSE-roberta-multitask', device=device)
 print(f"✅ 모델 로드 완료! (Device: {device})")
 
+def encode_texts(texts: List[str], target: str):
+    """문장 임베딩 — 배치 크기와 인코딩 시간을 target(질의/정책명/직무 등)별로 기록"""
+    metrics.EMBED_BATCH_SIZE.observe(len(texts), target=target)
+    with metrics.EMBED_SECONDS.time(target=target):
+        return model.encode(texts)
+
 # --- 2. 분석 대상 및 매핑 정의 ---
 EXTINCTION_RISK_MAP = {
     "26710": "부산 기장군", "41250": "경기 동두천시", "41650": "경기 포천시",
@@ -55,6 +94,7 @@ class RecommendationRequest(BaseModel):
     policy_query: str
     budget: int
     rent_budget: int
+    debug: bool = False  # true면 응답 JSON에 단계별 소요 시간(timing) 포함
 
 class RegionDetailRequest(BaseModel):
     regionCode: str
@@ -62,50 +102,57 @@ class RegionDetailRequest(BaseModel):
     policy_query: str
     budget: int
     rent_budget: int
+    debug: bool = False
 
 # --- 3. 실시간 데이터 수집 함수 (API Fetchers) ---
 
-async def fetch_api_data(url: str, params: dict):
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url, params=params)
+async def fetch_api_data(url: str, params: dict, api: str = "external"):
+    with span("http.get", url=url, api=api) as sp:
+        started = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(url, params=params)
+        except Exception:
+            metrics.UPSTREAM_ERRORS.inc(api=api, status="exception")
+            raise
+        finally:
+            metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, api=api)
+        sp.set(status_code=response.status_code)
         if response.status_code != 200:
+            metrics.UPSTREAM_ERRORS.inc(api=api, status=str(response.status_code))
             return []
         return response.json()
 
 async def get_all_policies():
     """청년정책 API 호출 및 데이터프레임 변환"""
     # 실제 운영 시 페이지네이션 처리가 필요할 수 있습니다.
-    data = await fetch_api_data(os.getenv("POLICY_API_URL"), {"apiKey": os.getenv("POLICY_API_KEY"), "display": 100})
+    data = await fetch_api_data(os.getenv("POLICY_API_URL"), {"apiKey": os.getenv("POLICY_API_KEY"), "display": 100}, api="policy")
     # API 응답 구조에 맞게 리스트 추출 (예: data['policies'])
     policies = data.get('policies', []) if isinstance(data, dict) else []
     return pd.DataFrame(policies).fillna("")
 
 async def get_all_jobs():
     """공공기관 채용 API 호출"""
-    data = await fetch_api_data(os.getenv("JOB_API_URL"), {"apiKey": os.getenv("JOB_API_KEY")})
+    data = await fetch_api_data(os.getenv("JOB_API_URL"), {"apiKey": os.getenv("JOB_API_KEY")}, api="job")
     jobs = data.get('jobs', []) if isinstance(data, dict) else []
     return pd.DataFrame(jobs).fillna("")
 
-async def get_real_estate(region_code: str):
-    """국토부 실거래가 API 호출 (특정 지역)"""
-    params = {
-        "serviceKey": os.getenv("REAL_ESTATE_API_KEY"),
-        "LAWD_CD": region_code[:5],
-        "DEAL_YMD": "202512" # 최근 데이터 기준
-    }
-    data = await fetch_api_data(os.getenv("REAL_ESTATE_API_URL"), params)
-    items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-    # API 필드명을 기존 CSV 컬럼명으로 매핑
-    df = pd.DataFrame(items)
-    if not df.empty:
-        df = df.rename(columns={
-            "아파트": "아파트명", "보증금액": "보증금(만원)", 
-            "월세금액": "월세(만원)", "전용면적": "전용면적(m2)",
-            "층": "층수", "건축년도": "건축년도", "법정동": "법정동"
-        })
-        df["보증금(만원)"] = df["보증금(만원)"].str.replace(",", "").astype(int)
-        df["월세(만원)"] = df["월세(만원)"].str.replace(",", "").astype(int)
-    return df.fillna(0)
+async def get_real_estate(region_code: str, budget: int, rent_budget: int, limit: int = 20):
+    """국토부 전월세 실거래 (특정 지역) — realestate_server의 (지역, 월) 예산 인덱스로 바로 필터링"""
+    with metrics.UPSTREAM_SECONDS.time(api="realestate"):
+        result = await asyncio.to_thread(
+            realestate_server.searchRentalsByBudget,
+            region_code[:5], "202512", budget, rent_budget, limit,  # 최근 데이터 기준
+            list(realestate_server.HOUSING_TYPES)  # 아파트 + 오피스텔/연립/단독
+        )
+    if result.get("status") == "error":
+        metrics.UPSTREAM_ERRORS.inc(api="realestate", status="error")
+    for prop in result.get("records", []):
+        if prop["monthlyRent"] == 0:
+            prop["dealAmount"] = f"전세 {prop['deposit']:,}만원"
+        else:
+            prop["dealAmount"] = f"보증금 {prop['deposit']:,} / 월세 {prop['monthlyRent']:,}만원"
+    return result
 
 # --- 4. 기존 유틸리티 및 AI 로직 (유지) ---
 
@@ -132,60 +179,93 @@ def is_relevant_policy(zip_str: str, inst_name: str, target_code: str):
     return inst_match
 
 def generate_ai_report(name, job, policy, j_count, re_count, p_count, top_jobs, top_policies):
-    try:
-        prompt = f"""지역:{name}, 희망직무:{job}, 정책관심:{policy}, 결과:일자리{j_count}건, 매물{re_count}건, 정책{p_count}건. 
+    prompt = f"""지역:{name}, 희망직무:{job}, 정책관심:{policy}, 결과:일자리{j_count}건, 매물{re_count}건, 정책{p_count}건. 
         위 데이터를 기반으로 이 지역의 특징과 추천 이유를 2문장 내외의 전문적인 한국어로 작성하세요."""
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": "지역 정착 컨설턴트 '이음'입니다."}, {"role": "user", "content": prompt}],
-            max_tokens=200
-        )
-        return response.choices[0].message.content.strip()
-    except:
-        return f"{name}은 {job} 관련 기회가 풍부하여 정착하기에 우수한 환경을 갖추고 있습니다."
+    with span("llm.chat", model="gpt-4o-mini", region=name) as sp:
+        started = time.perf_counter()
+        try:
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "system", "content": "지역 정착 컨설턴트 '이음'입니다."}, {"role": "user", "content": prompt}],
+                max_tokens=200
+            )
+            metrics.LLM_SECONDS.observe(time.perf_counter() - started, model="gpt-4o-mini", outcome="ok")
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            sp.set_error(e)
+            metrics.LLM_SECONDS.observe(time.perf_counter() - started, model="gpt-4o-mini", outcome="error")
+            return f"{name}은 {job} 관련 기회가 풍부하여 정착하기에 우수한 환경을 갖추고 있습니다."
 
 # --- 5. API 엔드포인트 구현 ---
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 스크레이프용 (이 워커 프로세스의 집계값)"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+def timed_response(timer: StageTimer, body: Any, debug: bool, list_key: str) -> JSONResponse:
+    """JSON 직렬화도 단계로 재고 Server-Timing 헤더를 붙임 (debug=true면 본문에 단계별 시간 포함)"""
+    with timer.stage("serialize"):
+        content = jsonable_encoder(body)
+    if debug:
+        content = timer.attach(content, list_key=list_key)
+    response = JSONResponse(content)
+    response.headers["Server-Timing"] = timer.server_timing()
+    response.headers["Timing-Allow-Origin"] = "*"  # 다른 오리진(프론트엔드)에서도 PerformanceResourceTiming으로 보이도록
+    return response
+
 @app.post("/api/recommendation/integrated-ranking")
 async def get_integrated_ranking(req: RecommendationRequest):
+    timer = StageTimer("integrated_ranking")
     try:
         # 실시간 데이터 로드
-        df_p, df_j = await asyncio.gather(get_all_policies(), get_all_jobs())
+        with timer.stage("fetch"):
+            df_p, df_j = await asyncio.gather(get_all_policies(), get_all_jobs())
         
+        # 임베딩
+        with timer.stage("encode", policies=len(df_p), jobs=len(df_j)):
+            p_unique = df_p['plcyNm'].unique().tolist()
+            p_query_emb, p_emb = encode_texts([req.policy_query], "policy_query"), encode_texts(p_unique, "policy_title")
+            j_query_emb, j_emb = encode_texts([req.user_interest], "job_query"), encode_texts(df_j['ncsCdNmLst'].astype(str).tolist(), "job_ncs")
+
         # 유사도 계산
-        p_unique = df_p['plcyNm'].unique().tolist()
-        p_sim_map = dict(zip(p_unique, util.cos_sim(model.encode([req.policy_query]), model.encode(p_unique))[0].tolist()))
-        df_j['sim'] = util.cos_sim(model.encode([req.user_interest]), model.encode(df_j['ncsCdNmLst'].astype(str).tolist()))[0].tolist()
+        with timer.stage("score"):
+            p_sim_map = dict(zip(p_unique, util.cos_sim(p_query_emb, p_emb)[0].tolist()))
+            df_j['sim'] = util.cos_sim(j_query_emb, j_emb)[0].tolist()
 
         p_scores, j_scores, re_counts, p_m, j_m = {}, {}, {}, {}, {}
 
-        for code, name in EXTINCTION_RISK_MAP.items():
-            # 정책/일자리 필터링
-            p_reg = df_p[df_p.apply(lambda x: is_relevant_policy(x['zipCd'], x['sprvsnInstCdNm'], code), axis=1)].copy()
-            p_reg['sim'] = p_reg['plcyNm'].map(p_sim_map)
-            p_scores[code] = float(p_reg['sim'].sum())
-            p_m[code] = int(len(p_reg[p_reg['sim'] >= 0.3]))
-
-            city_short = name.split()[-1]
-            j_reg = df_j[df_j['workRgnNmLst'].str.contains(city_short) | 
-                         df_j['workRgnNmLst'].apply(lambda x: any(p in str(x) for p, cs in PROVINCE_JOB_MAP.items() if code in cs))]
-            j_scores[code] = float(j_reg['sim'].sum())
-            j_m[code] = int(len(j_reg[j_reg['sim'] >= 0.3]))
-
-            # 부동산은 랭킹 단계에서는 대표 샘플링 혹은 통계 API 사용 가능 (여기서는 빈값 처리 후 상세에서 호출)
-            re_counts[code] = 10 # 시뮬레이션 데이터
-
-        p_norm, j_norm = normalize_scores(p_scores), normalize_scores(j_scores)
-
-        final_ranking = []
-        for code, name in EXTINCTION_RISK_MAP.items():
-            total = (p_norm.get(code,0) + j_norm.get(code,0)) / 2
-            final_ranking.append({
-                "regionName": name, "regionCode": code, "score": round(float(total), 2),
-                "houseCount": re_counts[code], "jobCount": j_m[code], "policyCount": p_m[code]
-            })
-
-        return sorted(final_ranking, key=lambda x: x['score'], reverse=True)[:6]
+        with timer.stage("filter"):
+            for code, name in EXTINCTION_RISK_MAP.items():
+                # 정책/일자리 필터링
+                p_reg = df_p[df_p.apply(lambda x: is_relevant_policy(x['zipCd'], x['sprvsnInstCdNm'], code), axis=1)].copy()
+                p_reg['sim'] = p_reg['plcyNm'].map(p_sim_map)
+                p_scores[code] = float(p_reg['sim'].sum())
+                p_m[code] = int(len(p_reg[p_reg['sim'] >= 0.3]))
+
+                city_short = name.split()[-1]
+                j_reg = df_j[df_j['workRgnNmLst'].str.contains(city_short) | 
+                             df_j['workRgnNmLst'].apply(lambda x: any(p in str(x) for p, cs in PROVINCE_JOB_MAP.items() if code in cs))]
+                j_scores[code] = float(j_reg['sim'].sum())
+                j_m[code] = int(len(j_reg[j_reg['sim'] >= 0.3]))
+
+                # 부동산은 랭킹 단계에서는 대표 샘플링 혹은 통계 API 사용 가능 (여기서는 빈값 처리 후 상세에서 호출)
+                re_counts[code] = 10 # 시뮬레이션 데이터
+
+        with timer.stage("score"):
+            p_norm, j_norm = normalize_scores(p_scores), normalize_scores(j_scores)
+
+            final_ranking = []
+            for code, name in EXTINCTION_RISK_MAP.items():
+                total = (p_norm.get(code,0) + j_norm.get(code,0)) / 2
+                final_ranking.append({
+                    "regionName": name, "regionCode": code, "score": round(float(total), 2),
+                    "houseCount": re_counts[code], "jobCount": j_m[code], "policyCount": p_m[code]
+                })
+            top = sorted(final_ranking, key=lambda x: x['score'], reverse=True)[:6]
+
+        # debug=true면 리스트를 {"top_recommendations": [...], "timing": {...}}로 감쌈 (프론트엔드가 둘 다 읽음)
+        return timed_response(timer, top, req.debug, list_key="top_recommendations")
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
@@ -193,36 +273,44 @@ async def get_integrated_ranking(req: RecommendationRequest):
 @app.post("/api/recommendation/region-detail")
 async def get_region_detail(req: RegionDetailRequest):
     code, name = req.regionCode, EXTINCTION_RISK_MAP.get(req.regionCode, "알 수 없는 지역")
+    timer = StageTimer("region_detail")
     try:
         # 실시간 데이터 병렬 수집
-        df_p, df_j, df_re = await asyncio.gather(get_all_policies(), get_all_jobs(), get_real_estate(code))
+        with timer.stage("fetch"):
+            df_p, df_j, re_result = await asyncio.gather(get_all_policies(), get_all_jobs(), get_real_estate(code, req.budget, req.rent_budget))
         
-        # 1. 일자리
+        # 1. 일자리 / 정책 지역 필터링
         city_short = name.split()[-1]
-        j_f = df_j[df_j['workRgnNmLst'].str.contains(city_short) | df_j['workRgnNmLst'].apply(lambda x: any(p in str(x) for p, cs in PROVINCE_JOB_MAP.items() if code in cs))].copy()
-        j_sims = util.cos_sim(model.encode([req.user_interest]), model.encode(j_f['ncsCdNmLst'].astype(str).tolist()))[0].tolist()
-        j_f['sim'] = j_sims
-        jobs_list = j_f.sort_values('sim', ascending=False).head(15).to_dict('records')
-
-        # 2. 부동산 (예산 필터링 적용)
-        re_f = df_re[(df_re['보증금(만원)'] <= req.budget) & (df_re['월세(만원)'] <= req.rent_budget)]
-        re_list = re_f.head(20).to_dict('records')
-
-        # 3. 정책
-        p_f = df_p[df_p.apply(lambda x: is_relevant_policy(x['zipCd'], x['sprvsnInstCdNm'], code), axis=1)].copy()
-        p_sims = util.cos_sim(model.encode([req.policy_query]), model.encode(p_f['plcyNm'].tolist()))[0].tolist()
-        p_f['sim'] = p_sims
-        policies_list = p_f.sort_values('sim', ascending=False).head(15).to_dict('records')
-
-        # 4. AI 리포트
-        ai_report = generate_ai_report(name, req.user_interest, req.policy_query, len(j_f[j_f['sim'] >= 0.3]), len(re_f), len(p_f[p_f['sim'] >= 0.3]), [j['recrutPbancTtl'] for j in jobs_list], [p['plcyNm'] for p in policies_list])
-
-        return {
-            "summary": {"success": True, "summary": {"total_jobs": len(j_f[j_f['sim'] >= 0.3]), "total_properties": len(re_f), "total_policies": len(p_f[p_f['sim'] >= 0.3]), "region_name": name, "text": ai_report}, "region_info": {"name": name}},
+        with timer.stage("filter"):
+            j_f = df_j[df_j['workRgnNmLst'].str.contains(city_short) | df_j['workRgnNmLst'].apply(lambda x: any(p in str(x) for p, cs in PROVINCE_JOB_MAP.items() if code in cs))].copy()
+            p_f = df_p[df_p.apply(lambda x: is_relevant_policy(x['zipCd'], x['sprvsnInstCdNm'], code), axis=1)].copy()
+
+        # 2. 임베딩
+        with timer.stage("encode", jobs=len(j_f), policies=len(p_f)):
+            j_query_emb, j_emb = encode_texts([req.user_interest], "job_query"), encode_texts(j_f['ncsCdNmLst'].astype(str).tolist(), "job_ncs")
+            p_query_emb, p_emb = encode_texts([req.policy_query], "policy_query"), encode_texts(p_f['plcyNm'].tolist(), "policy_title")
+
+        # 3. 유사도 점수 + 상위 15건
+        with timer.stage("score"):
+            j_f['sim'] = util.cos_sim(j_query_emb, j_emb)[0].tolist()
+            jobs_list = j_f.sort_values('sim', ascending=False).head(15).to_dict('records')
+            p_f['sim'] = util.cos_sim(p_query_emb, p_emb)[0].tolist()
+            policies_list = p_f.sort_values('sim', ascending=False).head(15).to_dict('records')
+
+        # 4. 부동산 (예산 필터링 적용)
+        re_list = re_result.get("records", [])
+        re_count = re_result.get("count", len(re_list))
+
+        # 5. AI 리포트
+        with timer.stage("report"):
+            ai_report = generate_ai_report(name, req.user_interest, req.policy_query, len(j_f[j_f['sim'] >= 0.3]), re_count, len(p_f[p_f['sim'] >= 0.3]), [j['recrutPbancTtl'] for j in jobs_list], [p['plcyNm'] for p in policies_list])
+
+        return timed_response(timer, {
+            "summary": {"success": True, "summary": {"total_jobs": len(j_f[j_f['sim'] >= 0.3]), "total_properties": re_count, "total_policies": len(p_f[p_f['sim'] >= 0.3]), "region_name": name, "text": ai_report}, "region_info": {"name": name}},
             "jobs": {"success": True, "jobs": jobs_list},
             "realestate": {"success": True, "properties": re_list},
             "policies": {"success": True, "policies": policies_list}
-        }
+        }, req.debug, list_key="data")
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
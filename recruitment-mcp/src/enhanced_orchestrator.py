@@ -1,305 +1,466 @@
 # enhanced_orchestrator.py — 청소년정책 포함 확장 오케스트레이터
 import asyncio
 import json
-from typing import Dict, Any, Optional
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, List
 
 # 상대 import로 변경
 from . import server
 from . import realestate_server
 from . import youth_policy_server
+from .tool_registry import ToolRegistry, ToolSpec, default_cache_key
+from .tracing import span, traced
+
+# 🔌 도구 실행 위치 — inprocess: 서버 모듈을 웹 프로세스 안에서 직접 호출 (기본)
+#                   stdio / http: MCP 서버를 별도 프로세스로 두고 영속 세션 풀로 호출 (mcp_client_pool)
+ORCHESTRATOR_TRANSPORT = os.getenv("ORCHESTRATOR_TRANSPORT", "inprocess").strip().lower()
+# 📅 실거래 신고는 한 달가량 늦게 쌓이므로 기본 분석 구간은 지난달에서 끝남
+FEASIBILITY_MONTHS = int(os.getenv("FEASIBILITY_MONTHS", "6"))
+FEASIBILITY_LAG_MONTHS = int(os.getenv("FEASIBILITY_LAG_MONTHS", "1"))
+
+# 📍 지원 지역의 채용 근무지 키워드 (도시 우선 → 없으면 광역)
+JOB_REGION_KEYWORDS = {
+    "51770": {"city": "정선", "province": "강원"},
+    "51750": {"city": "영월", "province": "강원"},
+    "44790": {"city": "청양", "province": "충남"},  # 🔑 '충청' 제거
+    "51150": {"city": "강릉", "province": "강원"},
+    "52210": {"city": "김제", "province": "전북"},  # 🔑 '전라' 제거
+}
+# 여러 지역 일괄 분석 시 한 번에 받아 지역별로 나눌 채용공고 수
+BATCH_RECRUITMENT_ROWS = int(os.getenv("BATCH_RECRUITMENT_ROWS", "100"))
+
+def partition_jobs_by_region(jobs: List[Dict], region_codes: List[str]) -> Dict[str, List[Dict]]:
+    """
+    채용공고를 지역별로 나눔 (공고 목록은 지역 무관하게 한 번만 받고 여기서 분할)
+    각 지역: 근무지에 도시명이 있는 공고, 0건이면 광역명이 있는 공고 (공고 순서 유지)
+    """
+    regions = [code for code in region_codes if code in JOB_REGION_KEYWORDS]
+    city_jobs: Dict[str, List[Dict]] = {code: [] for code in regions}
+    province_jobs: Dict[str, List[Dict]] = {code: [] for code in regions}
+    for job in jobs:
+        work_region = (job.get("workRgnNmLst", "") or "").replace(" ", "")
+        for code in regions:
+            keywords = JOB_REGION_KEYWORDS[code]
+            if keywords["city"] in work_region:
+                city_jobs[code].append(job)
+            if keywords["province"] in work_region:
+                province_jobs[code].append(job)
+    return {code: city_jobs[code] or province_jobs[code] for code in regions}
+
+def recent_months(count: int, lag: int = FEASIBILITY_LAG_MONTHS, today: Optional[datetime] = None) -> List[str]:
+    """오늘 기준 lag개월 전에 끝나는 최근 count개월 (YYYYMM, 오래된 달부터)"""
+    today = today or datetime.now()
+    last = today.year * 12 + (today.month - 1) - lag
+    return [f"{i // 12}{i % 12 + 1:02d}" for i in range(last - count + 1, last + 1)]
+
+def _region_policy_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """searchPoliciesByRegion 인자 — 기존 기본값(pageSize 50) 유지"""
+    user_query = arguments.get('user_query')
+    print(f"🔧 [ORCHESTRATOR-DEBUG] tool_name: searchPoliciesByRegion")
+    print(f"🔧 [ORCHESTRATOR-DEBUG] arguments: {arguments}")
+    print(f"🔧 [ORCHESTRATOR-DEBUG] user_query 추출: '{user_query}'")
+    return {
+        'regionCode': arguments.get('regionCode'),
+        'pageNum': arguments.get('pageNum', 1),
+        'pageSize': arguments.get('pageSize', 50),
+        'categories': arguments.get('categories'),
+        'user_query': user_query,  # ⭐ 추가
+        'eligibility': arguments.get('eligibility')
+    }
+
+def _shared_cache_key(arguments: Dict[str, Any]) -> Optional[str]:
+    """사용자 질문(user_query)이 있으면 개인화된 AI 결과라 캐시하지 않음 (AI 분석은 자체 의미 캐시 사용)"""
+    if arguments.get('user_query'):
+        return None
+    return default_cache_key(arguments)
+
+# 🗂️ 도구별 호출 정책 — 캐시 TTL(초), 제한 시간, 동시 실행 수, 재시도
+#    실거래/정책 원천 데이터는 하루에 몇 번 바뀌지 않으므로 분 단위 TTL, 상세 조회는 더 길게
+TOOL_SPECS = [
+    # 채용정보
+    ToolSpec('recruitment', 'listRecruitments', '공공기관 채용정보 목록 조회',
+             cache_ttl=300, timeout=15, max_concurrency=4, retries=1),
+    ToolSpec('recruitment', 'getRecruitmentDetail', '채용정보 상세 조회',
+             cache_ttl=3600, timeout=15, max_concurrency=4, retries=1),
+    ToolSpec('recruitment', 'getRecruitmentDetails', '채용정보 상세 일괄 조회 (캐시)',
+             cache_ttl=600, timeout=30),
+    ToolSpec('recruitment', 'ping', '헬스체크', timeout=5),
+    # 부동산
+    ToolSpec('realestate', 'getApartmentTrades', '아파트 실거래가 조회',
+             cache_ttl=3600, timeout=15, max_concurrency=4, retries=1),
+    ToolSpec('realestate', 'getApartmentRentsRange', '아파트 전월세 기간 조회 (여러 달 병렬)',
+             cache_ttl=600, timeout=60),
+    ToolSpec('realestate', 'getRentStatistics', '아파트 전월세 지역/월별 통계',
+             cache_ttl=600, timeout=60),
+    ToolSpec('realestate', 'searchRentalsByBudget', '아파트 전월세 예산(보증금·월세) 검색',
+             cache_ttl=300, timeout=30),
+    ToolSpec('realestate', 'getOfficeTrades', '오피스텔 전월세 조회',
+             cache_ttl=3600, timeout=15, max_concurrency=4, retries=1),
+    ToolSpec('realestate', 'getRowHouseTrades', '연립/다세대 전월세 조회',
+             cache_ttl=3600, timeout=15, max_concurrency=4, retries=1),
+    ToolSpec('realestate', 'getHouseTrades', '단독/다가구 전월세 조회',
+             cache_ttl=3600, timeout=15, max_concurrency=4, retries=1),
+    ToolSpec('realestate', 'getAllRentals', '전체 주택 유형 전월세 동시 조회',
+             cache_ttl=600, timeout=30),
+    ToolSpec('realestate', 'ping', '헬스체크', timeout=5),
+    # 청소년정책 (AI 분석이 붙는 검색은 정책 조회 + AI 마감시간을 고려해 길게)
+    ToolSpec('youth_policy', 'searchYouthPolicies', '청소년정책 검색',
+             cache_ttl=300, cache_key=_shared_cache_key, timeout=45),
+    ToolSpec('youth_policy', 'getYouthPolicyDetail', '청소년정책 상세 조회',
+             cache_ttl=3600, timeout=15, retries=1),
+    ToolSpec('youth_policy', 'searchPoliciesByRegion', '지역별 청소년정책 검색',
+             cache_ttl=300, cache_key=_shared_cache_key, timeout=45,
+             adapt_arguments=_region_policy_arguments),
+    ToolSpec('youth_policy', 'searchPoliciesByKeywords', '키워드 기반 청소년정책 검색',
+             cache_ttl=300, cache_key=_shared_cache_key, timeout=45),
+    ToolSpec('youth_policy', 'ping', '헬스체크', timeout=5),
+]
+
 
 class EnhancedOrchestrator:
     """채용정보 + 부동산 + 청소년정책을 통합하는 확장된 오케스트레이터"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[str] = None):
         self.recruitment_server = server
         self.realestate_server = realestate_server
         self.youth_policy_server = youth_policy_server
+        # 모듈은 날짜/자격 색인 같은 보조 함수용으로 계속 쓰고, 도구 호출만 전송 방식에 따라 보냄
+        self.transport = transport or ORCHESTRATOR_TRANSPORT
+        self.mcp_hub = None
+        tool_servers = {
+            'recruitment': self.recruitment_server,
+            'realestate': self.realestate_server,
+            'youth_policy': self.youth_policy_server,
+        }
+        if self.transport != "inprocess":
+            from .mcp_client_pool import get_shared_hub
+            self.mcp_hub = get_shared_hub(self.transport)
+            tool_servers = {name: self.mcp_hub.remote(name, module) for name, module in tool_servers.items()}
+            print(f"🔌 도구 호출 전송 방식: {self.transport} (MCP 세션 풀)")
+        # 모든 도구 호출은 레지스트리를 거쳐 캐시/제한 시간/동시성/재시도 정책이 똑같이 적용됨
+        self.registry = ToolRegistry(tool_servers)
+        for spec in TOOL_SPECS:
+            self.registry.register(spec)
     
     def get_available_tools(self) -> Dict[str, list]:
         """사용 가능한 모든 도구 목록"""
-        return {
-            'recruitment': [
-                {'name': 'listRecruitments', 'description': '공공기관 채용정보 목록 조회'},
-                {'name': 'getRecruitmentDetail', 'description': '채용정보 상세 조회'},
-                {'name': 'ping', 'description': '헬스체크'}
-            ],
-            'realestate': [
-                {'name': 'getApartmentTrades', 'description': '아파트 실거래가 조회'},
-                {'name': 'getOfficeTrades', 'description': '오피스텔 실거래가 조회'},
-                {'name': 'getHouseTrades', 'description': '단독/다가구 실거래가 조회'},
-                {'name': 'ping', 'description': '헬스체크'}
-            ],
-            'youth_policy': [
-                {'name': 'searchYouthPolicies', 'description': '청소년정책 검색'},
-                {'name': 'getYouthPolicyDetail', 'description': '청소년정책 상세 조회'},
-                {'name': 'searchPoliciesByRegion', 'description': '지역별 청소년정책 검색'},
-                {'name': 'searchPoliciesByKeywords', 'description': '키워드 기반 청소년정책 검색'},
-                {'name': 'ping', 'description': '헬스체크'}
-            ]
-        }
+        return self.registry.tools()
+
+    def get_tool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """도구별 호출 수, 캐시 적중률, 오류/시간 초과, 지연시간(p50/p95)"""
+        return self.registry.stats()
+
+    def get_transport_status(self) -> Dict[str, Any]:
+        """도구 호출 전송 방식과 (MCP 모드일 때) 서버별 세션 상태"""
+        if self.mcp_hub is None:
+            return {"transport": "inprocess"}
+        return self.mcp_hub.status()
+
+    def close(self):
+        """MCP 세션/자식 프로세스 정리 (inprocess 모드에서는 할 일 없음)"""
+        if self.mcp_hub is not None:
+            self.mcp_hub.close()
     
-    def call_recruitment_tool(self, tool_name: str, arguments: Dict[str, Any]):
+    def call_recruitment_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float] = None):
         """채용정보 서버 도구 호출"""
-        try:
-            if tool_name == 'listRecruitments':
-                return {
-                    "status": "success",
-                    "server": "recruitment",
-                    "tool": tool_name,
-                    "result": self.recruitment_server.listRecruitments(**arguments)
-                }
-            elif tool_name == 'getRecruitmentDetail':
-                return {
-                    "status": "success", 
-                    "server": "recruitment",
-                    "tool": tool_name,
-                    "result": self.recruitment_server.getRecruitmentDetail(**arguments)
-                }
-            elif tool_name == 'ping':
-                return {
-                    "status": "success",
-                    "server": "recruitment", 
-                    "tool": tool_name,
-                    "result": self.recruitment_server.ping()
-                }
-            else:
-                return {
-                    "status": "error",
-                    "server": "recruitment",
-                    "tool": tool_name,
-                    "message": f"알 수 없는 도구: {tool_name}"
-                }
-        except Exception as e:
-            return {
-                "status": "error",
-                "server": "recruitment",
-                "tool": tool_name,
-                "message": str(e)
-            }
+        return self.registry.call('recruitment', tool_name, arguments, timeout)
     
-    def call_realestate_tool(self, tool_name: str, arguments: Dict[str, Any]):
+    def call_realestate_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float] = None):
         """부동산 서버 도구 호출"""
-        try:
-            if tool_name == 'getApartmentTrades':
-                return {
-                    "status": "success",
-                    "server": "realestate",
-                    "tool": tool_name,
-                    "result": self.realestate_server.getApartmentTrades(**arguments)
-                }
-            elif tool_name == 'getOfficeTrades':
-                return {
-                    "status": "success",
-                    "server": "realestate", 
-                    "tool": tool_name,
-                    "result": self.realestate_server.getOfficeTrades(**arguments)
-                }
-            elif tool_name == 'getHouseTrades':
-                return {
-                    "status": "success",
-                    "server": "realestate",
-                    "tool": tool_name, 
-                    "result": self.realestate_server.getHouseTrades(**arguments)
-                }
-            elif tool_name == 'ping':
-                return {
-                    "status": "success",
-                    "server": "realestate",
-                    "tool": tool_name,
-                    "result": self.realestate_server.ping()
-                }
-            else:
-                return {
-                    "status": "error",
-                    "server": "realestate",
-                    "tool": tool_name,
-                    "message": f"알 수 없는 도구: {tool_name}"
-                }
-        except Exception as e:
-            return {
-                "status": "error",
-                "server": "realestate",
-                "tool": tool_name,
-                "message": str(e)
-            }
+        return self.registry.call('realestate', tool_name, arguments, timeout)
     
-    def call_youth_policy_tool(self, tool_name: str, arguments: Dict[str, Any]):
+    def call_youth_policy_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float] = None):
         """청소년정책 서버 도구 호출"""
-        try:
-            if tool_name == 'searchYouthPolicies':
-                return {
-                    "status": "success",
-                    "server": "youth_policy",
-                    "tool": tool_name,
-                    "result": self.youth_policy_server.searchYouthPolicies(**arguments)
-                }
-            elif tool_name == 'getYouthPolicyDetail':
-                return {
-                    "status": "success",
-                    "server": "youth_policy",
-                    "tool": tool_name,
-                    "result": self.youth_policy_server.getYouthPolicyDetail(**arguments)
-                }
-            elif tool_name == 'searchPoliciesByRegion':
-                user_query = arguments.get('user_query')
-                print(f"🔧 [ORCHESTRATOR-DEBUG] tool_name: {tool_name}")
-                print(f"🔧 [ORCHESTRATOR-DEBUG] arguments: {arguments}")
-                print(f"🔧 [ORCHESTRATOR-DEBUG] user_query 추출: '{user_query}'")
-
-                return {
-                    "status": "success",
-                    "server": "youth_policy",
-                    "tool": tool_name,
-                    "result": self.youth_policy_server.searchPoliciesByRegion(
-                        regionCode=arguments.get('regionCode'),
-                        pageNum=arguments.get('pageNum', 1),
-                        pageSize=arguments.get('pageSize', 50),
-                        categories=arguments.get('categories'),
-                        user_query=arguments.get('user_query')  # ⭐ 추가
-                    )
-                }
-
-            # 2번째 수정  
-            elif tool_name == 'searchPoliciesByKeywords':
-                return {
-                    "status": "success",
-                    "server": "youth_policy",
-                    "tool": tool_name,
-                    "result": self.youth_policy_server.searchPoliciesByKeywords(
-                        **arguments,
-                        user_query=arguments.get('user_query')  # ⭐ 추가
-                    )
-                }
-
-            elif tool_name == 'ping':
-                return {
-                    "status": "success",
-                    "server": "youth_policy",
-                    "tool": tool_name,
-                    "result": self.youth_policy_server.ping()
-                }
-            else:
-                return {
-                    "status": "error",
-                    "server": "youth_policy",
-                    "tool": tool_name,
-                    "message": f"알 수 없는 도구: {tool_name}"
-                }
-        except Exception as e:
-            return {
-                "status": "error",
-                "server": "youth_policy",
-                "tool": tool_name,
-                "message": str(e)
-            }
+        return self.registry.call('youth_policy', tool_name, arguments, timeout)
     
-    def comprehensive_region_analysis(self, region_code: str, deal_ymd: str = "202506"):
-        """지역 종합 분석 - 채용정보 + 부동산 + 청소년정책"""
+    # 🚀 비동기 도구 호출 — 이벤트 루프를 막지 않고 레지스트리의 스레드 풀에서 실행
+    async def acall_recruitment_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float] = None):
+        """채용정보 서버 도구 비동기 호출"""
+        return await self.registry.acall('recruitment', tool_name, arguments, timeout)
+
+    async def acall_realestate_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float] = None):
+        """부동산 서버 도구 비동기 호출"""
+        return await self.registry.acall('realestate', tool_name, arguments, timeout)
+
+    async def acall_youth_policy_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float] = None):
+        """청소년정책 서버 도구 비동기 호출"""
+        return await self.registry.acall('youth_policy', tool_name, arguments, timeout)
+
+    @traced("orchestrator.comprehensive_region_analysis")
+    async def acomprehensive_region_analysis(self, region_code: str, deal_ymd: str = "202506",
+                                             timeout: Optional[float] = None):
+        """지역 종합 분석 (비동기) - 채용정보 + 부동산 + 청소년정책 4개 호출을 동시에 실행"""
         print(f"🔍 지역 종합 분석 시작: {region_code}")
-        
-        results = {}
-        
-        # 1. 채용정보 조회
-        print("  📋 채용정보 조회 중...")
-        recruitment_result = self.call_recruitment_tool(
-            'listRecruitments',
-            {'pageNo': 1, 'numOfRows': 10}
-        )
-        results['recruitment'] = recruitment_result
-        
-        # 2. 부동산 아파트 실거래가 조회
-        print("  🏠 아파트 실거래가 조회 중...")
-        apt_result = self.call_realestate_tool(
-            'getApartmentTrades',
-            {
-                'lawdcd': region_code,
-                'deal_ymd': deal_ymd,
-                'pageNo': 1,
-                'numOfRows': 5
-            }
-        )
-        results['apartment_trades'] = apt_result
-        
-        # 3. 지역별 청소년정책 조회 (새로 추가!)
-        print("  🎯 지역별 청소년정책 조회 중...")
-        policy_result = self.call_youth_policy_tool(
-            'searchPoliciesByRegion',
-            {
-                'regionCode': region_code,
-                'pageNum': 1,
-                'pageSize': 10,
-                'categories': "일자리,주거,교육,복지"  # 주요 관심 분야
-            }
-        )
-        results['youth_policies'] = policy_result
-        
-        # 4. 청년 특화 정책 검색
-        print("  🚀 청년 특화 정책 검색 중...")
-        youth_specific_result = self.call_youth_policy_tool(
-            'searchPoliciesByKeywords',
-            {
-                'keywords': "청년,취업,창업,주거지원,생활비지원",
-                'regionCode': region_code,
-                'pageNum': 1,
-                'pageSize': 8
-            }
-        )
-        results['youth_specific_policies'] = youth_specific_result
-        
-        print("✅ 지역 종합 분석 완료")
-        return results
+        started = time.perf_counter()
 
-    def analyze_living_feasibility(self, region_code: str, age_group: str = "청년"):
-        """거주 타당성 분석 - 일자리, 주거비, 정책 지원 종합"""
-        print(f"📊 {age_group} 거주 타당성 분석: {region_code}")
-        
-        results = {}
-        
-        # 1. 일자리 현황
-        recruitment_result = self.call_recruitment_tool(
-            'listRecruitments',
-            {'pageNo': 1, 'numOfRows': 20}
-        )
-        results['job_market'] = recruitment_result
-        
-        # 2. 주거비 현황 (최근 6개월)
-        months = ["202501", "202502", "202503", "202504", "202505", "202506"]
-        housing_costs = []
-        
-        for month in months[-3:]:  # 최근 3개월만
-            apt_result = self.call_realestate_tool(
+        sections = {
+            # 1. 채용정보 조회
+            'recruitment': self.acall_recruitment_tool(
+                'listRecruitments',
+                {'pageNo': 1, 'numOfRows': 10},
+                timeout
+            ),
+            # 2. 부동산 아파트 실거래가 조회
+            'apartment_trades': self.acall_realestate_tool(
                 'getApartmentTrades',
                 {
                     'lawdcd': region_code,
-                    'deal_ymd': month,
+                    'deal_ymd': deal_ymd,
+                    'pageNo': 1,
+                    'numOfRows': 5
+                },
+                timeout
+            ),
+            # 3. 지역별 청소년정책 조회
+            'youth_policies': self.acall_youth_policy_tool(
+                'searchPoliciesByRegion',
+                {
+                    'regionCode': region_code,
                     'pageNum': 1,
-                    'numOfRows': 10
-                }
-            )
-            housing_costs.append({month: apt_result})
-        
-        results['housing_trends'] = housing_costs
-        
-        # 3. 정책 지원 현황
+                    'pageSize': 10,
+                    'categories': "일자리,주거,교육,복지"  # 주요 관심 분야
+                },
+                timeout
+            ),
+            # 4. 청년 특화 정책 검색
+            'youth_specific_policies': self.acall_youth_policy_tool(
+                'searchPoliciesByKeywords',
+                {
+                    'keywords': "청년,취업,창업,주거지원,생활비지원",
+                    'regionCode': region_code,
+                    'pageNum': 1,
+                    'pageSize': 8
+                },
+                timeout
+            ),
+        }
+
+        results = await self._run_sections(sections, started)
+        print(f"✅ 지역 종합 분석 완료 ({results['analysis_meta']['elapsed_ms']}ms, "
+              f"실패 {len(results['analysis_meta']['failed_sections'])}건)")
+        return results
+
+    async def _run_sections(self, sections: Dict[str, Any], started: float) -> Dict[str, Any]:
+        """섹션별 도구 호출(코루틴)을 동시에 실행 → {섹션: 결과, 'analysis_meta': 섹션별 상태/소요시간}"""
+        async def timed(name, coro):
+            section_started = time.perf_counter()
+            with span(f"section.{name}") as sp:
+                result = await coro
+                elapsed_ms = round((time.perf_counter() - section_started) * 1000, 1)
+                if result.get("timed_out"):
+                    status = "timeout"
+                elif result.get("status") != "success":
+                    status = "error"
+                elif isinstance(result.get("result"), dict) and result["result"].get("status") == "error":
+                    status = "error"  # 도구는 실행됐지만 업스트림 API가 실패
+                else:
+                    status = "ok"
+                sp.set(status=status)
+            print(f"  {'✅' if status == 'ok' else '⚠️'} {name}: {status} ({elapsed_ms}ms)")
+            return name, result, {"status": status, "elapsed_ms": elapsed_ms}
+
+        outcomes = await asyncio.gather(*(timed(name, coro) for name, coro in sections.items()))
+
+        results = {name: result for name, result, _ in outcomes}
+        timings = {name: info for name, _, info in outcomes}
+        failed = [name for name, info in timings.items() if info["status"] != "ok"]
+        results['analysis_meta'] = {
+            "sections": timings,
+            "failed_sections": failed,
+            "partial": bool(failed),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+        return results
+
+    def comprehensive_region_analysis(self, region_code: str, deal_ymd: str = "202506",
+                                      timeout: Optional[float] = None):
+        """지역 종합 분석 - 동기 호출용 (이벤트 루프 안에서는 acomprehensive_region_analysis를 await)"""
+        return asyncio.run(self.acomprehensive_region_analysis(region_code, deal_ymd, timeout))
+
+    @traced("orchestrator.analyze_regions")
+    async def aanalyze_regions(self, region_codes: Optional[List[str]] = None, deal_ymd: Optional[str] = None,
+                               timeout: Optional[float] = None):
+        """
+        여러 지역 일괄 분석 (비동기)
+        - 지역 무관 데이터(채용공고 목록)는 한 번만 받아 지역별로 나눔
+        - 지역별 데이터(전월세 통계, 지역 정책, 청년 특화 정책)는 모든 지역을 동시에 조회
+        → 5개 지역 비교 비용이 1개 지역 분석과 비슷함
+        """
+        started = time.perf_counter()
+        region_codes = list(dict.fromkeys(region_codes or JOB_REGION_KEYWORDS))
+        deal_ymd = deal_ymd or recent_months(1)[0]
+        print(f"🗺️ 지역 일괄 분석 시작: {region_codes} ({deal_ymd})")
+
+        def region_sections(region_code: str) -> Dict[str, Any]:
+            return {
+                'rent_statistics': self.acall_realestate_tool(
+                    'getRentStatistics',
+                    {'lawdcd': region_code, 'from_ymd': deal_ymd},
+                    timeout
+                ),
+                'youth_policies': self.acall_youth_policy_tool(
+                    'searchPoliciesByRegion',
+                    {
+                        'regionCode': region_code,
+                        'pageNum': 1,
+                        'pageSize': 10,
+                        'categories': "일자리,주거,교육,복지"  # 주요 관심 분야
+                    },
+                    timeout
+                ),
+                'youth_specific_policies': self.acall_youth_policy_tool(
+                    'searchPoliciesByKeywords',
+                    {
+                        'keywords': "청년,취업,창업,주거지원,생활비지원",
+                        'regionCode': region_code,
+                        'pageNum': 1,
+                        'pageSize': 8
+                    },
+                    timeout
+                ),
+            }
+
+        shared_task = self._run_sections({
+            'recruitment': self.acall_recruitment_tool(
+                'listRecruitments',
+                {'pageNo': 1, 'numOfRows': BATCH_RECRUITMENT_ROWS},
+                timeout
+            ),
+        }, started)
+        region_tasks = [self._run_sections(region_sections(code), started) for code in region_codes]
+        shared, *per_region = await asyncio.gather(shared_task, *region_tasks)
+
+        # 채용공고는 한 번 받은 목록을 지역별로 분할
+        recruitment = shared['recruitment']
+        jobs = []
+        if recruitment.get("status") == "success" and isinstance(recruitment.get("result"), dict):
+            jobs = recruitment["result"].get("data", {}).get("result", []) or []
+        jobs_by_region = partition_jobs_by_region(jobs, region_codes)
+
+        regions = {}
+        for code, result in zip(region_codes, per_region):
+            result['jobs'] = jobs_by_region.get(code, [])
+            result['job_count'] = len(result['jobs'])
+            regions[code] = result
+
+        failed = {
+            code: result['analysis_meta']['failed_sections']
+            for code, result in regions.items() if result['analysis_meta']['failed_sections']
+        }
+        if shared['analysis_meta']['failed_sections']:
+            failed['shared'] = shared['analysis_meta']['failed_sections']
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(f"✅ 지역 일괄 분석 완료 ({len(region_codes)}개 지역, {elapsed_ms}ms, 공고 {len(jobs)}건 분할)")
+        return {
+            "deal_ymd": deal_ymd,
+            "regions": regions,
+            "shared": {
+                "recruitment_total": len(jobs),
+                "analysis_meta": shared['analysis_meta'],
+            },
+            "analysis_meta": {
+                "failed": failed,
+                "partial": bool(failed),
+                "elapsed_ms": elapsed_ms,
+            },
+        }
+
+    def analyze_regions(self, region_codes: Optional[List[str]] = None, deal_ymd: Optional[str] = None,
+                        timeout: Optional[float] = None):
+        """여러 지역 일괄 분석 - 동기 호출용 (이벤트 루프 안에서는 aanalyze_regions를 await)"""
+        return asyncio.run(self.aanalyze_regions(region_codes, deal_ymd, timeout))
+
+    @traced("orchestrator.analyze_living_feasibility")
+    async def aanalyze_living_feasibility(self, region_code: str, age_group: str = "청년",
+                                          months: int = FEASIBILITY_MONTHS, timeout: Optional[float] = None):
+        """
+        거주 타당성 분석 (비동기) - 일자리, 주거비 추이, 정책 지원을 동시에 조회
+        - months: 오늘 기준 최근 몇 개월의 전월세 추이를 볼지 (지난달까지, 최대 RANGE_MAX_MONTHS)
+        """
+        started = time.perf_counter()
+        months = max(1, min(int(months), self.realestate_server.RANGE_MAX_MONTHS))
+        window = recent_months(months)
+        print(f"📊 {age_group} 거주 타당성 분석: {region_code} ({window[0]} ~ {window[-1]})")
+
+        # 연령대별 정책 검색 키워드
         if age_group == "청년":
             policy_keywords = "청년,취업지원,주거지원,창업지원,생활비지원"
         else:
             policy_keywords = "일자리,주거,복지,교육"
-        
-        policy_result = self.call_youth_policy_tool(
-            'searchPoliciesByKeywords',
-            {
-                'keywords': policy_keywords,
-                'regionCode': region_code,
-                'pageNum': 1,
-                'pageSize': 15
-            }
-        )
-        results['policy_support'] = policy_result
-        
+
+        sections = {
+            # 1. 일자리 현황
+            'job_market': self.acall_recruitment_tool(
+                'listRecruitments',
+                {'pageNo': 1, 'numOfRows': 20},
+                timeout
+            ),
+            # 2. 주거비 현황 — 구간 전체를 한 번에 요청 (아카이브에 없는 달만 병렬 조회)
+            'housing_trends': self.acall_realestate_tool(
+                'getRentStatistics',
+                {'lawdcd': region_code, 'from_ymd': window[0], 'to_ymd': window[-1]},
+                timeout
+            ),
+            # 3. 정책 지원 현황
+            'policy_support': self.acall_youth_policy_tool(
+                'searchPoliciesByKeywords',
+                {
+                    'keywords': policy_keywords,
+                    'regionCode': region_code,
+                    'pageNum': 1,
+                    'pageSize': 15
+                },
+                timeout
+            ),
+        }
+
+        results = await self._run_sections(sections, started)
+        results['housing_trends'] = self._rent_trend(results['housing_trends'], window)
         return results
 
+    def _rent_trend(self, stats_result: Dict[str, Any], window: List[str]) -> Dict[str, Any]:
+        """getRentStatistics 결과 → 월별 중앙값 추이 (보증금/전세 보증금/월세, 건수)"""
+        trend = {"from_ymd": window[0], "to_ymd": window[-1], "series": []}
+        if stats_result.get("status") != "success":
+            return {**trend, "status": "error", "message": stats_result.get("message", "")}
+        stats = stats_result["result"]
+        if stats.get("status") == "error" and not stats.get("months"):
+            return {**trend, "status": "error", "message": stats.get("message", "")}
+
+        for month in stats.get("months", []):
+            trend["series"].append({
+                "deal_ymd": month["deal_ymd"],
+                "count": month.get("count", 0),
+                "jeonse_ratio": month.get("jeonse_ratio"),
+                "median_deposit": month.get("deposit", {}).get("median"),
+                "median_jeonse_deposit": month.get("jeonse_deposit", {}).get("median"),
+                "median_monthly_rent": month.get("monthly_rent", {}).get("median"),
+                "source": month.get("source"),
+            })
+
+        # 값이 있는 첫 달 대비 마지막 달 변화율 (%)
+        def change(key):
+            values = [m[key] for m in trend["series"] if m[key] is not None]
+            if len(values) < 2 or not values[0]:
+                return None
+            return round((values[-1] - values[0]) / values[0] * 100, 1)
+
+        trend["status"] = stats.get("status", "ok")
+        trend["change_pct"] = {
+            "median_deposit": change("median_deposit"),
+            "median_jeonse_deposit": change("median_jeonse_deposit"),
+            "median_monthly_rent": change("median_monthly_rent"),
+        }
+        trend["total_count"] = sum(m["count"] for m in trend["series"])
+        return trend
+
+    def analyze_living_feasibility(self, region_code: str, age_group: str = "청년",
+                                   months: int = FEASIBILITY_MONTHS, timeout: Optional[float] = None):
+        """거주 타당성 분석 - 동기 호출용 (이벤트 루프 안에서는 aanalyze_living_feasibility를 await)"""
+        return asyncio.run(self.aanalyze_living_feasibility(region_code, age_group, months, timeout))
+
 
 def test_all_servers():
     """모든 서버 연결 테스트"""
@@ -3,10 +3,9 @@ import asyncio
 import json
 import re
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 
 # 확장된 오케스트레이터 import
-from .enhanced_orchestrator import EnhancedOrchestrator
+from .enhanced_orchestrator import EnhancedOrchestrator, partition_jobs_by_region
 
 class PerfectChatbot:
     def __init__(self):
@@ -274,40 +273,8 @@ class PerfectChatbot:
         return self.allowed_regions_code_to_name.get(region_code, f"지원하지 않는 지역({region_code})")
 
     def filter_active_policies(self, policies: List[Dict]) -> List[Dict]:
-        """현재 날짜 기준으로 유효한 정책만 필터링"""
-        today = datetime.now().strftime("%Y%m%d")
-        active_policies = []
-
-        for policy in policies:
-            is_active = True
-
-            # 1. 사업 종료일 체크
-            biz_end_date = policy.get("bizPrdEndYmd", "")
-            if biz_end_date and len(biz_end_date) == 8 and biz_end_date.isdigit():
-                if biz_end_date < today:
-                    is_active = False
-                    continue
-
-            # 2. 신청 마감일 체크 (aplyYmd에서 종료일 추출)
-            apply_period = policy.get("aplyYmd", "")
-            if apply_period and " ~ " in apply_period:
-                dates = apply_period.split(" ~ ")
-                if len(dates) == 2:
-                    end_date = dates[1].strip()
-                    if len(end_date) == 8 and end_date.isdigit():
-                        if end_date < today:
-                            is_active = False
-                            continue
-            elif apply_period and len(apply_period) == 8 and apply_period.isdigit():
-                if apply_period < today:
-                    is_active = False
-                    continue
-
-            # 3. 상시 신청이거나 날짜 정보가 없으면 활성으로 간주
-            if is_active:
-                active_policies.append(policy)
-
-        return active_policies
+        """현재 날짜 기준으로 유효한 정책만 필터링 (사업 종료일/신청 마감일 기준, 상시 신청은 활성)"""
+        return self.orchestrator.youth_policy_server.filter_active_policies(policies)
 
     def format_job_results(self, results: List[Dict], limit: int = 5, region_name: str = "") -> str:
         """채용정보 결과를 보기 좋게 포맷"""
@@ -361,26 +328,26 @@ class PerfectChatbot:
         output = [f"🏠 **아파트 실거래가** (총 {len(apt_data)}건 중 상위 {min(limit, len(apt_data))}건)\n"]
 
         for i, apt in enumerate(apt_data[:limit], 1):
-            name = apt.get("aptNm", "아파트명 없음")
-            price = apt.get("dealAmount", "가격정보없음")
+            name = apt.get("aptNm") or "아파트명 없음"
             area = apt.get("excluUseAr", "면적정보없음")
             floor = apt.get("floor", "층수정보없음")
             year = apt.get("buildYear", "건축년도없음")
-            dong = apt.get("umdNm", "동정보없음")
-
-            if price and price.replace(",", "").isdigit():
-                price_int = int(price.replace(",", ""))
-                if price_int >= 10000:
-                    eok = price_int // 10000
-                    man = price_int % 10000
-                    if man > 0:
-                        price_formatted = f"{eok}억 {man:,}만원"
-                    else:
-                        price_formatted = f"{eok}억원"
-                else:
-                    price_formatted = f"{price_int:,}만원"
+            dong = apt.get("umdNm") or "동정보없음"
+
+            # 수집 시점에 정수로 변환된 보증금/월세 사용 (만원 단위)
+            deposit = apt.get("deposit", 0)
+            rent = apt.get("monthlyRent", 0)
+
+            def format_man(value: int) -> str:
+                if value >= 10000:
+                    eok, man = value // 10000, value % 10000
+                    return f"{eok}억 {man:,}만원" if man > 0 else f"{eok}억원"
+                return f"{value:,}만원"
+
+            if rent == 0:
+                price_formatted = f"전세 {format_man(deposit)}"
             else:
-                price_formatted = price
+                price_formatted = f"보증금 {format_man(deposit)} / 월세 {rent:,}만원"
 
             output.append(f"{i}. **{name}** ({dong})")
             output.append(f"   💰 {price_formatted} | {area}㎡ | {floor}층 | {year}년")
@@ -507,38 +474,8 @@ class PerfectChatbot:
         if target_region_code and target_region_code in self.allowed_regions_name_to_code:
             target_region_code = self.allowed_regions_name_to_code[target_region_code]
 
-        region_mapping = {
-            "51770": {"city": "정선", "province": "강원"},
-            "51750": {"city": "영월", "province": "강원"},
-            "44790": {"city": "청양", "province": "충남"},  # 🔑 '충청' 제거
-            "51150": {"city": "강릉", "province": "강원"},
-            "52210": {"city": "김제", "province": "전북"},  # 🔑 '전라' 제거
-        }
-
-        if target_region_code not in region_mapping:
-            return []
-
-        city = region_mapping[target_region_code]["city"]
-        province = region_mapping[target_region_code]["province"]
-
-        def normalize(s: str) -> str:
-            return (s or "").replace(" ", "")
-
-        def match(job: Dict, keyword: str) -> bool:
-            return keyword in normalize(job.get("workRgnNmLst", ""))
-
-        # 1) 도시 필터
-        city_jobs = [j for j in jobs if match(j, city)]
-        if city_jobs:
-            return city_jobs
-
-        # 2) 도시 0건이면 광역 필터
-        province_jobs = [j for j in jobs if match(j, province)]
-        if province_jobs:
-            return province_jobs
-
-        # 3) 둘 다 없으면 빈 리스트
-        return []
+        # 도시 우선 → 없으면 광역 (규칙은 오케스트레이터의 지역 일괄 분석과 공유)
+        return partition_jobs_by_region(jobs, [target_region_code]).get(target_region_code, [])
 
 
     def filter_and_sort_policies_by_region(self, policies: List[Dict], target_region_code: str) -> List[Dict]:
@@ -612,29 +549,22 @@ class PerfectChatbot:
                 print("🏠 부동산 검색 중...")
                 # ... (기존 call_realestate_tool 호출 코드) ...
 
+                # 최대 가격(보증금)은 예산 인덱스에서 바로 필터링
+                max_price = intent.get("max_price")
                 apt_result = self.orchestrator.call_realestate_tool(
-                    'getApartmentTrades',
+                    'searchRentalsByBudget',
                     {
                         'lawdcd': region_code,
                         'deal_ymd': self.state["deal_ymd"],
-                        'pageNo': 1,
-                        'numOfRows': 30 # 필터링을 위해 충분한 데이터를 가져옵니다.
+                        'maxDeposit': max_price,
+                        'limit': 30
                     }
                 )
                 
                 if apt_result["status"] == "success":
-                    apt_text = apt_result["result"].get("text", "")
-                    apt_data = self.parse_apartment_xml(apt_text)
-
-                    # 🆕 최대 가격 필터링 로직 추가
-                    max_price = intent.get("max_price")
+                    apt_data = self.extract_rent_records(apt_result["result"])
                     if max_price:
-                        original_count = len(apt_data)
-                        apt_data = [
-                            apt for apt in apt_data
-                            if int(apt.get("dealAmount", "0").replace(",", "")) <= max_price
-                        ]
-                        print(f"💰 {max_price:,}만원 이하 매물 필터링: {original_count}건 -> {len(apt_data)}건")
+                        print(f"💰 {max_price:,}만원 이하 매물: {apt_result['result'].get('totalCount', 0)}건 -> {apt_result['result'].get('count', 0)}건")
                     
                     results.append(self.format_realestate_results(apt_data, limit=5))
                 else:
@@ -670,19 +600,16 @@ class PerfectChatbot:
         else:
             return "❌ 검색 결과를 찾을 수 없습니다."
 
+    def extract_rent_records(self, server_response: Dict[str, Any]) -> List[Dict]:
+        """getApartmentTrades 응답에서 타입 레코드 추출 (아카이브 records 우선, 없으면 XML 파싱)"""
+        if server_response.get("records") is not None:
+            return server_response["records"]
+        return self.parse_apartment_xml(server_response.get("text", ""))
+
     def parse_apartment_xml(self, xml_text: str) -> List[Dict]:
-        """XML 형태의 아파트 데이터를 파싱"""
-        import xml.etree.ElementTree as ET
+        """XML 형태의 아파트 데이터를 타입 레코드로 파싱 (보증금/월세는 정수)"""
         try:
-            root = ET.fromstring(xml_text)
-            items = root.findall('.//item')
-            apt_list = []
-            for item in items:
-                apt_data = {}
-                for child in item:
-                    apt_data[child.tag] = child.text.strip() if child.text else ""
-                apt_list.append(apt_data)
-            return apt_list
+            return self.orchestrator.realestate_server.parse_rent_xml(xml_text)
         except Exception as e:
             print(f"XML 파싱 오류: {e}")
             return []
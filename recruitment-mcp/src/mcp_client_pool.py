@@ -0,0 +1,387 @@
+# mcp_client_pool.py — MCP 서버 3종을 별도 프로세스로 띄우고 영속 세션 풀로 호출 (오케스트레이터 out-of-process 모드)
+#
+# 기본(inprocess) 모드에서는 오케스트레이터가 서버 모듈을 import해 웹 프로세스 안에서(같은 GIL) 도구를 실행합니다.
+# ORCHESTRATOR_TRANSPORT=stdio | http 이면 도구 호출만 MCP로 보냅니다.
+#   - stdio: 서버마다 MCP_POOL_SIZE개의 자식 프로세스를 띄우고 프로세스당 세션 1개를 계속 유지
+#            (정책 AI 분석처럼 CPU를 쓰는 작업이 여러 코어로 나뉨)
+#   - http : 따로 띄운 streamable-HTTP 서버(MCP_<SERVER>_URL)에 세션 MCP_POOL_SIZE개를 유지 (다른 노드로 분리 가능)
+# 한 세션에 여러 요청을 동시에 보내고(파이프라이닝), 진행 중인 요청이 가장 적은 세션을 고릅니다.
+# 연결이 끊긴 세션은 백그라운드에서 다시 연결합니다.
+#
+# 서버 실행 (stdio 자식 프로세스는 풀이 자동으로 띄움):
+#   recruitment-mcp> python -m src.mcp_http youth_policy --workers 4 --port 8103
+import argparse
+import asyncio
+import importlib
+import inspect
+import io
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_MODULES = {
+    "recruitment": "src.server",
+    "realestate": "src.realestate_server",
+    "youth_policy": "src.youth_policy_server",
+}
+DEFAULT_HTTP_PORTS = {"recruitment": 8101, "realestate": 8102, "youth_policy": 8103}
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+MCP_CALL_TIMEOUT = float(os.getenv("MCP_CALL_TIMEOUT", "60"))
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "30"))
+MCP_RECONNECT_MAX = 10.0  # 재연결 대기 상한 (초)
+
+
+class RemoteToolError(RuntimeError):
+    """서버가 도구 실행 오류(isError)를 돌려준 경우"""
+
+
+def decode_tool_result(result) -> Any:
+    """CallToolResult → 도구가 반환한 값 (FastMCP는 dict 결과를 JSON 텍스트로 보냄)"""
+    texts = [c.text for c in result.content if getattr(c, "type", "") == "text"]
+    if result.isError:
+        raise RemoteToolError("; ".join(texts) or "도구 실행 오류")
+    values = []
+    for text in texts:
+        try:
+            values.append(json.loads(text))
+        except ValueError:
+            values.append(text)
+    if not values and result.structuredContent is not None:
+        return result.structuredContent
+    return values[0] if len(values) == 1 else values
+
+
+class MCPEndpoint:
+    """MCP 서버 1개에 연결하는 방법 (stdio 자식 프로세스 또는 streamable-HTTP URL)"""
+
+    def __init__(self, server: str, transport: str, url: Optional[str] = None):
+        if server not in SERVER_MODULES:
+            raise ValueError(f"알 수 없는 MCP 서버: {server}")
+        if transport not in ("stdio", "http"):
+            raise ValueError(f"지원하지 않는 전송 방식: {transport} (stdio | http)")
+        self.server = server
+        self.transport = transport
+        self.url = url or os.getenv(f"MCP_{server.upper()}_URL") or f"http://127.0.0.1:{DEFAULT_HTTP_PORTS[server]}/mcp"
+
+    @asynccontextmanager
+    async def connect(self):
+        """(read_stream, write_stream)"""
+        if self.transport == "stdio":
+            params = StdioServerParameters(
+                command=sys.executable,
+                args=["-m", "src.mcp_client_pool", "serve", self.server],
+                cwd=PROJECT_ROOT,
+                env=dict(os.environ),  # API 키 등 환경변수를 자식 프로세스에 그대로 전달
+            )
+            async with stdio_client(params) as (read_stream, write_stream):
+                yield read_stream, write_stream
+        else:
+            async with streamablehttp_client(self.url) as (read_stream, write_stream, _):
+                yield read_stream, write_stream
+
+    def describe(self) -> str:
+        return self.url if self.transport == "http" else f"stdio:{SERVER_MODULES[self.server]}"
+
+
+class _PooledSession:
+    """영속 세션 1개 — 연결/초기화/재연결을 전담하는 백그라운드 태스크가 소유"""
+
+    def __init__(self, endpoint: MCPEndpoint, index: int):
+        self.endpoint = endpoint
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.inflight = 0
+        self.calls = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self.ready = asyncio.Event()
+        self._reset = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        backoff = 0.5
+        while not self._closing:
+            try:
+                async with self.endpoint.connect() as (read_stream, write_stream):
+                    async with ClientSession(read_stream, write_stream) as session:
+                        await asyncio.wait_for(session.initialize(), MCP_CONNECT_TIMEOUT)
+                        self.session = session
+                        self.last_error = None
+                        self.ready.set()
+                        backoff = 0.5
+                        print(f"🔌 [MCP-POOL] {self.endpoint.server}#{self.index} 연결됨 ({self.endpoint.describe()})")
+                        # 종료 요청이나 전송 오류가 날 때까지 세션 유지
+                        await self._reset.wait()
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                print(f"⚠️ [MCP-POOL] {self.endpoint.server}#{self.index} 연결 오류: {self.last_error}")
+            finally:
+                self.session = None
+                self.ready.clear()
+                self._reset.clear()
+            if not self._closing:
+                self.reconnects += 1
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MCP_RECONNECT_MAX)
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: float) -> Any:
+        session = self.session
+        if session is None:
+            raise ConnectionError(f"{self.endpoint.server}#{self.index} 세션 없음")
+        self.inflight += 1
+        self.calls += 1
+        try:
+            result = await session.call_tool(tool_name, arguments, read_timeout_seconds=timedelta(seconds=timeout))
+        except (McpError, asyncio.CancelledError):
+            raise  # 서버가 돌려준 프로토콜 오류(잘못된 인자 등) / 호출자 취소는 세션 문제가 아님
+        except Exception as e:
+            # 전송 계층 오류 → 세션을 버리고 다시 연결
+            self.last_error = str(e) or type(e).__name__
+            self._reset.set()
+            raise
+        finally:
+            self.inflight -= 1
+        return decode_tool_result(result)
+
+    async def close(self):
+        self._closing = True
+        self._reset.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, 5)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+
+
+class MCPSessionPool:
+    """서버 1개에 대한 세션 풀 — 준비된 세션 중 진행 중인 요청이 가장 적은 세션으로 보냄"""
+
+    def __init__(self, endpoint: MCPEndpoint, size: int = MCP_POOL_SIZE):
+        self.endpoint = endpoint
+        self.sessions = [_PooledSession(endpoint, i) for i in range(max(1, size))]
+        self._started = False
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            for pooled in self.sessions:
+                pooled.start()
+
+    async def _acquire(self, timeout: float) -> _PooledSession:
+        ready = [s for s in self.sessions if s.ready.is_set()]
+        if not ready:
+            waiters = [asyncio.ensure_future(s.ready.wait()) for s in self.sessions]
+            try:
+                await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+            ready = [s for s in self.sessions if s.ready.is_set()]
+            if not ready:
+                errors = {s.last_error for s in self.sessions if s.last_error}
+                raise ConnectionError(f"{self.endpoint.server} MCP 서버에 연결할 수 없습니다: {'; '.join(errors) or '시간 초과'}")
+        return min(ready, key=lambda s: s.inflight)
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: float = MCP_CALL_TIMEOUT) -> Any:
+        self.start()
+        deadline = time.monotonic() + timeout
+        pooled = await self._acquire(min(timeout, MCP_CONNECT_TIMEOUT))
+        return await pooled.call_tool(tool_name, arguments, max(0.1, deadline - time.monotonic()))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint.describe(),
+            "sessions": [
+                {
+                    "ready": s.ready.is_set(), "inflight": s.inflight, "calls": s.calls,
+                    "reconnects": s.reconnects, "last_error": s.last_error,
+                }
+                for s in self.sessions
+            ],
+        }
+
+    async def close(self):
+        await asyncio.gather(*(s.close() for s in self.sessions))
+
+
+def pack_arguments(local_func, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    **params처럼 가변 키워드 인자를 받는 도구는 MCP 스키마에서 그 이름('params', 'kwargs' 등)의 필수 필드 하나가 됨
+    → 이름 있는 매개변수가 아닌 인자는 모두 그 필드에 담아 보냄 (도구 쪽에서 다시 펼침)
+    """
+    params = inspect.signature(local_func).parameters
+    var_keyword = next((name for name, p in params.items() if p.kind is inspect.Parameter.VAR_KEYWORD), None)
+    if var_keyword is None:
+        return arguments
+    named = {k: v for k, v in arguments.items() if k in params and k != var_keyword}
+    # 이미 그 필드에 담아 넘긴 인자도 그대로 합침
+    extra = {**(arguments.get(var_keyword) or {}),
+             **{k: v for k, v in arguments.items() if k not in named and k != var_keyword}}
+    return {**named, var_keyword: extra}
+
+
+class RemoteServer:
+    """서버 모듈 대신 레지스트리에 넣는 프록시 — remote.searchPoliciesByRegion(**kw)가 MCP 호출이 됨"""
+
+    def __init__(self, hub: "MCPClientHub", server: str, local_module=None):
+        self._hub = hub
+        self._server = server
+        self._local_module = local_module  # 인자 모양(시그니처)을 맞추는 데만 사용
+
+    def __getattr__(self, tool_name: str):
+        if tool_name.startswith("_"):
+            raise AttributeError(tool_name)
+        local_func = getattr(self._local_module, tool_name, None)
+
+        def call(**arguments):
+            if local_func is not None:
+                arguments = pack_arguments(local_func, arguments)
+            return self._hub.call(self._server, tool_name, arguments)
+
+        call.__name__ = tool_name
+        return call
+
+
+class MCPClientHub:
+    """
+    서버별 세션 풀을 전용 이벤트 루프 스레드에서 운영.
+    오케스트레이터의 도구 실행은 동기(스레드 풀)이므로 call()이 루프로 넘겨 결과를 기다림.
+    """
+
+    def __init__(self, transport: str, size: int = MCP_POOL_SIZE, servers: Optional[List[str]] = None):
+        self.transport = transport
+        self.pools = {name: MCPSessionPool(MCPEndpoint(name, transport), size) for name in (servers or SERVER_MODULES)}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="mcp-client-pool", daemon=True).start()
+            return self._loop
+
+    def start(self):
+        """모든 풀의 세션 연결을 미리 시작 (첫 호출 지연 방지)"""
+        loop = self._get_loop()
+        for pool in self.pools.values():
+            loop.call_soon_threadsafe(pool.start)
+
+    def call(self, server: str, tool_name: str, arguments: Dict[str, Any], timeout: float = MCP_CALL_TIMEOUT) -> Any:
+        future = asyncio.run_coroutine_threadsafe(
+            self.pools[server].call_tool(tool_name, arguments, timeout), self._get_loop()
+        )
+        return future.result(timeout + MCP_CONNECT_TIMEOUT)
+
+    def remote(self, server: str, local_module=None) -> RemoteServer:
+        return RemoteServer(self, server, local_module)
+
+    def wait_ready(self, timeout: float = MCP_CONNECT_TIMEOUT) -> bool:
+        """모든 서버에 준비된 세션이 하나 이상 생길 때까지 대기 (서버 프로세스 기동 시간 흡수)"""
+        async def ready():
+            await asyncio.gather(*(
+                asyncio.wait([asyncio.ensure_future(s.ready.wait()) for s in pool.sessions],
+                             return_when=asyncio.FIRST_COMPLETED)
+                for pool in self.pools.values()
+            ))
+
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(ready(), timeout), self._get_loop())
+        try:
+            future.result(timeout + 1)
+            return True
+        except Exception:
+            print(f"⚠️ [MCP-POOL] {timeout:g}초 안에 일부 서버에 연결하지 못했습니다: {self.status()}")
+            return False
+
+    def status(self) -> Dict[str, Any]:
+        return {"transport": self.transport, "pools": {name: pool.status() for name, pool in self.pools.items()}}
+
+    def close(self):
+        if self._loop is None:
+            return
+        async def close_pools():
+            await asyncio.gather(*(pool.close() for pool in self.pools.values()))
+
+        future = asyncio.run_coroutine_threadsafe(close_pools(), self._loop)
+        try:
+            future.result(10)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_shared_hubs: Dict[str, MCPClientHub] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_hub(transport: str) -> MCPClientHub:
+    """전송 방식별 프로세스 공용 허브 (오케스트레이터가 여러 개 만들어져도 자식 프로세스/세션은 한 벌)"""
+    with _shared_lock:
+        hub = _shared_hubs.get(transport)
+        if hub is None:
+            hub = _shared_hubs[transport] = MCPClientHub(transport)
+            hub.start()
+            hub.wait_ready()
+        return hub
+
+
+# --- 서버 실행 ---
+
+async def _serve_stdio(mcp_server, protocol_fd: int):
+    import anyio
+    from mcp.server.stdio import stdio_server
+
+    stdout = anyio.wrap_file(io.TextIOWrapper(os.fdopen(protocol_fd, "wb"), encoding="utf-8"))
+    async with stdio_server(stdout=stdout) as (read_stream, write_stream):
+        await mcp_server._mcp_server.run(
+            read_stream, write_stream, mcp_server._mcp_server.create_initialization_options()
+        )
+
+
+def serve(server: str, transport: str = "stdio", host: Optional[str] = None, port: Optional[int] = None):
+    """
+    MCP 서버 1개 실행. stdio에서는 서버 코드의 print()가 프로토콜 스트림을 깨뜨리지 않도록
+    원래 stdout은 프로토콜 전용으로 떼어 두고 나머지 출력은 stderr로 보냄.
+    """
+    if transport != "stdio":
+        # HTTP 서빙은 워커 수/공유 캐시/정상 종료를 다루는 mcp_http로 위임
+        from .mcp_http import serve_http
+        serve_http(server, host, port)
+        return
+    protocol_fd = os.dup(1)
+    os.dup2(2, 1)
+    module = importlib.import_module(SERVER_MODULES[server])
+    import anyio
+    anyio.run(_serve_stdio, module.mcp, protocol_fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 서버 실행 (오케스트레이터 out-of-process 모드용)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve")
+    serve_parser.add_argument("server", choices=sorted(SERVER_MODULES))
+    serve_parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio")
+    serve_parser.add_argument("--host")
+    serve_parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+    serve(args.server, args.transport, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
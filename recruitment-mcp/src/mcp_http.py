@@ -0,0 +1,106 @@
+# mcp_http.py — MCP 서버를 streamable-HTTP로 여러 워커에서 서빙
+#
+# 기본 main()은 mcp.run()(stdio, 단일 프로세스)이라 데스크톱 클라이언트 1개용입니다.
+# 여러 에이전트가 동시에 붙는 환경에서는 이 모듈로 서버 1종을 uvicorn 워커 N개로 띄웁니다.
+#   - stateless HTTP: 요청마다 독립적으로 처리하므로 어느 워커가 받아도 됨 (워커 간 세션 공유 불필요)
+#   - 공유 캐시: 같은 머신의 워커들은 SQLite 파일 하나(src/shared_cache.py)로 상세 조회 캐시를 함께 쓰고,
+#                정책 미러 갱신/지역 인사이트 생성은 리스를 얻은 워커 하나만 수행 (나머지는 디스크에서 따라감)
+#   - 정상 종료: SIGTERM/SIGINT 시 새 연결을 받지 않고 진행 중인 요청을 MCP_SHUTDOWN_GRACE초까지 기다린 뒤
+#                리스를 반납하고 공유 캐시를 닫음
+#   - 메트릭: GET /metrics (src/metrics.py) — 도구 호출/업스트림/캐시/스냅샷 나이를 워커마다 따로 노출하므로
+#             워커별로 스크레이프해 Prometheus 쪽에서 합산
+#
+# 실행:
+#   recruitment-mcp> python -m src.mcp_http youth_policy --workers 4 --port 8103
+#   recruitment-mcp> MCP_TRANSPORT=streamable-http MCP_HTTP_WORKERS=4 python -m src.youth_policy_server
+# 오케스트레이터는 ORCHESTRATOR_TRANSPORT=http + MCP_<SERVER>_URL=http://host:port/mcp 로 붙습니다.
+import argparse
+import importlib
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from . import metrics
+from .mcp_client_pool import DEFAULT_HTTP_PORTS, PROJECT_ROOT, SERVER_MODULES
+from .shared_cache import SHARED_CACHE_PATH, SharedTTLCache
+
+MCP_HTTP_HOST = os.getenv("MCP_HTTP_HOST") or "127.0.0.1"
+MCP_HTTP_WORKERS = int(os.getenv("MCP_HTTP_WORKERS") or 1)
+MCP_SHUTDOWN_GRACE = int(os.getenv("MCP_SHUTDOWN_GRACE") or 30)  # 종료 시 진행 중 요청 대기(초)
+MCP_HTTP_LOG_LEVEL = os.getenv("MCP_HTTP_LOG_LEVEL") or "warning"
+
+
+async def metrics_endpoint(request):
+    """이 워커 프로세스의 메트릭 (Prometheus 텍스트 형식)"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def create_app():
+    """uvicorn 워커마다 호출되는 앱 팩토리 — 서빙할 서버는 부모가 MCP_SERVE_SERVER로 넘김"""
+    server = os.environ["MCP_SERVE_SERVER"]
+    module = importlib.import_module(SERVER_MODULES[server])
+    cache = SharedTTLCache(os.getenv("MCP_SHARED_CACHE_PATH") or SHARED_CACHE_PATH)
+    attach = getattr(module, "attach_shared_cache", None)
+    if attach is not None:
+        attach(cache)
+
+    module.mcp.settings.stateless_http = True
+    module.mcp.settings.json_response = True
+    app = module.mcp.streamable_http_app()
+    app.router.routes.append(Route("/metrics", metrics_endpoint, methods=["GET"]))
+
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        print(f"🚀 [MCP-HTTP] {server} 워커 시작 (pid {os.getpid()})", flush=True)
+        async with session_lifespan(app):
+            yield
+        # uvicorn이 진행 중 요청을 모두 끝낸(또는 유예 시간이 지난) 뒤에 실행됨
+        cache.release_all()
+        cache.close()
+        print(f"🛑 [MCP-HTTP] {server} 워커 종료 (pid {os.getpid()}, 공유 캐시 {cache.status()})", flush=True)
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+def serve_http(server: str, host: Optional[str] = None, port: Optional[int] = None,
+               workers: Optional[int] = None):
+    import uvicorn
+
+    host = host or MCP_HTTP_HOST
+    port = port or int(os.getenv("MCP_HTTP_PORT") or DEFAULT_HTTP_PORTS[server])
+    workers = max(1, workers or MCP_HTTP_WORKERS)
+    # 워커 프로세스는 환경 변수를 물려받으므로 서버 이름/공유 캐시 경로를 여기서 고정
+    os.environ["MCP_SERVE_SERVER"] = server
+    os.environ.setdefault("MCP_SHARED_CACHE_PATH", SHARED_CACHE_PATH)
+    print(f"🌐 [MCP-HTTP] {server} → http://{host}:{port}/mcp (워커 {workers}개, "
+          f"종료 유예 {MCP_SHUTDOWN_GRACE}초, 공유 캐시 {os.environ['MCP_SHARED_CACHE_PATH']})", flush=True)
+    uvicorn.run(
+        "src.mcp_http:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        app_dir=PROJECT_ROOT,
+        timeout_graceful_shutdown=MCP_SHUTDOWN_GRACE,
+        log_level=MCP_HTTP_LOG_LEVEL,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 서버 streamable-HTTP 멀티 워커 서빙")
+    parser.add_argument("server", choices=sorted(SERVER_MODULES))
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    serve_http(args.server, args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# metrics.py — Prometheus 텍스트 형식 메트릭 (외부 라이브러리 없이 프로세스 메모리에 집계, GET /metrics로 노출)
+#
+#   UPSTREAM_SECONDS.observe(0.42, api="policy")
+#   with STAGE_SECONDS.time(endpoint="region_detail", stage="filter"):
+#       ...
+#   CACHE_REQUESTS.inc(cache="tool_registry", result="hit")
+# 게이지는 값을 직접 set/inc/dec 하거나, 스크레이프 시점에 계산하는 콜백을 등록합니다 (스냅샷 나이 등).
+# 멀티 워커(uvicorn --workers)에서는 워커마다 따로 집계되므로 Prometheus 쪽에서 합산합니다.
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 지연시간 버킷(초) — 캐시 적중(ms 단위)부터 느린 업스트림/LLM(수십 초)까지
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40)
+BATCH_SIZE_BUCKETS = (1, 4, 16, 64, 256, 1024, 4096, 16384)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _label_text(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨 {sorted(labels)} != {sorted(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._callbacks: List[Callable[[], Dict[LabelKey, float]]] = []
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, callback: Callable[[], Dict[LabelKey, float]]):
+        """스크레이프 시점에 {라벨 값 튜플: 값}을 돌려주는 콜백 (값이 없으면 빈 dict)"""
+        self._callbacks.append(callback)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        for callback in self._callbacks:
+            try:
+                values.update(callback())
+            except Exception as e:
+                print(f"⚠️ [METRICS] {self.name} 콜백 실패: {e}")
+        return [f"{self.name}{_label_text(self.labelnames, key)} {_format_value(v)}" for key, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelKey, List[float]] = {}  # 버킷별 개수 + [합계]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 1)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """블록 실행 시간(초)을 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series_items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in series_items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {_format_value(cumulative)}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name}은 이미 {metric.kind}로 등록됨")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- 공용 메트릭 (서버 모듈/오케스트레이터/FastAPI가 함께 씀) ---
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "ieum_http_requests_in_flight", "처리 중인 HTTP 요청 수")
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "ieum_http_request_seconds", "HTTP 요청 처리 시간", ("method", "route", "status"))
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "ieum_upstream_fetch_seconds", "업스트림 API 호출 시간", ("api",))
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "ieum_upstream_errors_total", "업스트림 API 오류 (HTTP 상태 코드 또는 exception)", ("api", "status"))
+TLS_ATTEMPTS = REGISTRY.counter(
+    "ieum_tls_attempts_total", "TLS 폴백 단계별 연결 시도 (default → tls12_seclevel1 → insecure)",
+    ("server", "mode", "outcome"))
+CACHE_REQUESTS = REGISTRY.counter(
+    "ieum_cache_requests_total", "캐시 조회 결과", ("cache", "result"))
+EMBED_SECONDS = REGISTRY.histogram(
+    "ieum_embedding_encode_seconds", "임베딩 인코딩 시간", ("target",))
+EMBED_BATCH_SIZE = REGISTRY.histogram(
+    "ieum_embedding_batch_size", "임베딩 인코딩 1회당 문장 수", ("target",), BATCH_SIZE_BUCKETS)
+STAGE_SECONDS = REGISTRY.histogram(
+    "ieum_stage_seconds", "엔드포인트 단계별 처리 시간 (필터링, 점수 계산 등)", ("endpoint", "stage"))
+LLM_SECONDS = REGISTRY.histogram(
+    "ieum_llm_request_seconds", "LLM 호출 시간", ("model", "outcome"))
+TOOL_SECONDS = REGISTRY.histogram(
+    "ieum_tool_call_seconds", "오케스트레이터 도구 호출 시간", ("server", "tool", "outcome"))
+SNAPSHOT_AGE = REGISTRY.gauge(
+    "ieum_snapshot_age_seconds", "메모리에 올라온 데이터 스냅샷의 나이", ("source",))
+
+
+def _snapshot_ages() -> Dict[LabelKey, float]:
+    """이 프로세스에 로드된 서버 모듈의 스냅샷만 보고 (import하지 않은 모듈은 건너뜀)"""
+    ages: Dict[LabelKey, float] = {}
+    now = time.time()
+    youth = sys.modules.get("src.youth_policy_server")
+    if youth is not None and youth.policy_mirror.snapshot is not None:
+        ages[("youth_policy_mirror",)] = now - youth.policy_mirror.snapshot.fetched_at
+    realestate = sys.modules.get("src.realestate_server")
+    if realestate is not None:
+        with realestate._budget_indexes_lock:
+            fetched = [index.fetched_at for index in realestate._budget_indexes.values() if index.fetched_at]
+        if fetched:
+            # 가장 오래된 인덱스 기준 — 예산 검색이 얼마나 오래된 거래 자료로 답하고 있는지
+            ages[("rent_budget_index",)] = now - min(fetched)
+    return ages
+
+
+SNAPSHOT_AGE.set_function(_snapshot_ages)
+
+
+def render() -> str:
+    return REGISTRY.render()
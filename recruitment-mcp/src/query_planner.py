@@ -0,0 +1,154 @@
+# query_planner.py — 요청 단위 도구 호출 계획 (같은 엔드포인트 호출을 합쳐 한 번만 실행)
+#
+# 한 요청 안의 소비자(핸들러)들이 플래너 하나를 공유하고 await planner.call(...)로 도구를 부르면,
+# 같은 이벤트 루프 차례에 들어온 호출을 모아
+#   1) 같은 엔드포인트 호출(1페이지)을 가장 큰 페이지 크기 하나로 합치고 (인자가 완전히 같으면 그대로 하나로)
+#   2) 합친 호출들을 동시에 실행한 다음
+#   3) 각 소비자에게는 자기가 요청한 페이지 크기만큼 잘라서 돌려줍니다.
+# 합칠 것이 없으면 호출 인자는 소비자가 요청한 그대로이므로, 플래너를 거쳐도 응답은 직접 호출과 같습니다.
+# 예: WebAPIHandler.search_region_pages는 요약/일자리/부동산/정책 페이지 핸들러를 한 플래너로 동시에 실행해
+#     요약과 일자리 페이지의 listRecruitments를 한 번만 호출합니다.
+import asyncio
+import copy
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .tracing import span
+
+
+@dataclass(frozen=True)
+class PageRule:
+    """페이지 단위로 자를 수 있는 도구 — 페이지 크기 인자, 결과 목록 위치"""
+    page_field: str
+    list_path: Tuple[str, ...]
+    page_no_field: Optional[str] = None
+
+
+# 큰 페이지의 앞부분이 작은 페이지와 같은 도구만 등록
+# (searchPoliciesByRegion은 페이지를 받은 뒤 지역으로 거르므로 페이지 크기가 다르면 결과가 달라 제외)
+PAGE_RULES: Dict[Tuple[str, str], PageRule] = {
+    ('recruitment', 'listRecruitments'): PageRule('numOfRows', ('data', 'result'), page_no_field='pageNo'),
+    ('realestate', 'getApartmentTrades'): PageRule('numOfRows', ('records',), page_no_field='pageNo'),
+    ('realestate', 'getOfficeTrades'): PageRule('numOfRows', ('records',), page_no_field='pageNo'),
+    ('realestate', 'getRowHouseTrades'): PageRule('numOfRows', ('records',), page_no_field='pageNo'),
+    ('realestate', 'getHouseTrades'): PageRule('numOfRows', ('records',), page_no_field='pageNo'),
+    ('realestate', 'searchRentalsByBudget'): PageRule('limit', ('records',)),
+    ('youth_policy', 'searchYouthPolicies'): PageRule('pageSize', ('policies',), page_no_field='pageNum'),
+    ('youth_policy', 'searchPoliciesByKeywords'): PageRule('pageSize', ('policies',), page_no_field='pageNum'),
+}
+
+
+@dataclass
+class PlannedCall:
+    """합쳐진 호출 1건 — 실제 인자와 이 결과를 나눠 받을 소비자 (소비자, 요청 페이지 크기)"""
+    server: str
+    tool: str
+    arguments: Dict[str, Any]
+    consumers: List[Tuple[Any, Optional[int]]] = field(default_factory=list)
+
+
+def _slice_result(response: Dict[str, Any], rule: PageRule, size: int) -> Dict[str, Any]:
+    """응답 봉투에서 결과 목록만 앞에서 size개로 자른 사본 (목록까지의 dict만 얕은 복사)"""
+    if response.get("status") != "success" or not isinstance(response.get("result"), dict):
+        return response
+    sliced = dict(response)
+    parent = sliced["result"] = dict(sliced["result"])
+    for key in rule.list_path[:-1]:
+        if not isinstance(parent.get(key), dict):
+            return response
+        parent[key] = dict(parent[key])
+        parent = parent[key]
+    items = parent.get(rule.list_path[-1])
+    if isinstance(items, list) and len(items) > size:
+        parent[rule.list_path[-1]] = items[:size]
+    if rule.page_field in sliced["result"]:
+        sliced["result"][rule.page_field] = size
+    return sliced
+
+
+def _merge_key(server: str, tool: str, arguments: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+    """(합칠 수 있는 인자 키, 요청 페이지 크기) — 1페이지 요청만 페이지 크기를 빼고 비교"""
+    rule = PAGE_RULES.get((server, tool))
+    size = None
+    key_args = arguments
+    if rule is not None and rule.page_field in arguments:
+        page_no = arguments.get(rule.page_no_field, 1) if rule.page_no_field else 1
+        if int(page_no or 1) == 1:
+            size = int(arguments[rule.page_field])
+            key_args = {k: v for k, v in arguments.items() if k != rule.page_field}
+    key = json.dumps([server, tool, key_args], ensure_ascii=False, sort_keys=True, default=str)
+    return key, size
+
+
+def plan_calls(requests: List[Tuple[Any, str, str, Dict[str, Any]]]) -> List[PlannedCall]:
+    """(소비자, 서버, 도구, 인자) 목록 → 합쳐진 호출 목록 (처음 등장한 순서)"""
+    calls: Dict[str, PlannedCall] = {}
+    for consumer, server, tool, arguments in requests:
+        key, size = _merge_key(server, tool, arguments)
+        planned = calls.get(key)
+        if planned is None:
+            planned = calls[key] = PlannedCall(server, tool, dict(arguments))
+        planned.consumers.append((consumer, size))
+
+    for planned in calls.values():
+        rule = PAGE_RULES.get((planned.server, planned.tool))
+        sizes = [size for _, size in planned.consumers if size is not None]
+        if rule is not None and sizes:
+            planned.arguments[rule.page_field] = max(sizes)
+    return list(calls.values())
+
+
+class QueryPlanner:
+    """
+    요청 1건 동안 여러 소비자가 공유하는 호출 계획.
+        planner = QueryPlanner(orchestrator)
+        summary, page = await asyncio.gather(
+            planner.call('recruitment', 'listRecruitments', {'pageNo': 1, 'numOfRows': 50}),
+            planner.call('recruitment', 'listRecruitments', {'pageNo': 1, 'numOfRows': 20}),
+        )   # 50행으로 한 번만 호출하고, page는 앞 20행으로 잘린 사본
+    """
+
+    def __init__(self, orchestrator, timeout: Optional[float] = None):
+        self.orchestrator = orchestrator
+        self.timeout = timeout
+        self._pending: List[Tuple[str, str, Dict[str, Any], "asyncio.Future"]] = []
+        self._dispatch_scheduled = False
+
+    async def call(self, server: str, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """도구 호출을 등록하고, 같은 차례에 등록된 호출과 함께 실행된 결과(응답 봉투)를 기다림"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((server, tool, dict(arguments or {}), future))
+        if not self._dispatch_scheduled:
+            # 이미 실행 대기 중인 다른 소비자들이 call()까지 진행한 뒤에 묶어서 실행
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        batch, self._pending, self._dispatch_scheduled = self._pending, [], False
+        asyncio.ensure_future(self._execute(batch))
+
+    async def _execute(self, batch: List[Tuple[str, str, Dict[str, Any], "asyncio.Future"]]):
+        """합친 호출을 동시에 실행하고 소비자별로 (필요하면 잘라서) 결과 전달"""
+        planned_calls = plan_calls([(future, server, tool, arguments) for server, tool, arguments, future in batch])
+        with span("planner.execute", requests=len(batch), calls=len(planned_calls)):
+            responses = await asyncio.gather(*(
+                self.orchestrator.registry.acall(p.server, p.tool, p.arguments, self.timeout)
+                for p in planned_calls
+            ), return_exceptions=True)
+
+        for planned, response in zip(planned_calls, responses):
+            rule = PAGE_RULES.get((planned.server, planned.tool))
+            for n, (future, size) in enumerate(planned.consumers):
+                if future.done():  # 기다리던 소비자가 취소된 경우
+                    continue
+                if isinstance(response, BaseException):
+                    future.set_exception(response)
+                    continue
+                # 두 번째 소비자부터는 사본 — 결과를 고쳐 써도 서로 영향이 없도록 (레지스트리 캐시 적중과 같은 방식)
+                result = copy.deepcopy(response) if n else response
+                if rule is not None and size is not None and size < planned.arguments[rule.page_field]:
+                    result = _slice_result(result, rule, size)
+                future.set_result(result)
@@ -1,12 +1,31 @@
-# realestate_server.py — 아파트 전월세 전용 MCP 서버
+# realestate_server.py — 주택 전월세 MCP 서버 (아파트 / 오피스텔 / 연립다세대 / 단독다가구)
+import heapq
+import json
 import os
+import shutil
 import ssl
-from typing import Any, Dict, Optional, Tuple, Iterable
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple, Iterable, Iterator, List, NamedTuple
 
 import httpx
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 
+try:
+    from src import metrics
+    from src.tracing import span, wrap
+except ImportError:  # python src/realestate_server.py 처럼 단독 스크립트로 실행한 경우
+    import metrics
+    from tracing import span, wrap
+
 load_dotenv()
 
 mcp = FastMCP("realestate-mcp")
@@ -15,43 +34,155 @@ mcp = FastMCP("realestate-mcp")
 BASE_URL = "https://apis.data.go.kr/1613000/RTMSDataSvcAptRent"
 API_KEY = (os.getenv("MOLIT_API_KEY") or "").strip()
 
-def _client_candidates() -> Iterable[Tuple[str, httpx.Client]]:
-    """TLS/SSL 호환성을 위한 클라이언트 후보 생성"""
+# 주택 유형별 전월세 API — 응답 형식은 같고 이름/면적 필드만 다름
+#   name_field: RentRecord.aptNm 자리에 넣을 필드 (단독/다가구는 단지명이 없어 주택유형)
+#   area_field: RentRecord.excluUseAr 자리에 넣을 필드 (단독/다가구는 연면적)
+HOUSING_TYPES: Dict[str, Dict[str, str]] = {
+    "apt": {
+        "label": "아파트",
+        "url": f"{BASE_URL}/getRTMSDataSvcAptRent",
+        "dataset": "apt_rent",
+        "name_field": "aptNm",
+        "area_field": "excluUseAr",
+    },
+    "offi": {
+        "label": "오피스텔",
+        "url": "https://apis.data.go.kr/1613000/RTMSDataSvcOffiRent/getRTMSDataSvcOffiRent",
+        "dataset": "offi_rent",
+        "name_field": "offiNm",
+        "area_field": "excluUseAr",
+    },
+    "rh": {
+        "label": "연립다세대",
+        "url": "https://apis.data.go.kr/1613000/RTMSDataSvcRHRent/getRTMSDataSvcRHRent",
+        "dataset": "rh_rent",
+        "name_field": "mhouseNm",
+        "area_field": "excluUseAr",
+    },
+    "sh": {
+        "label": "단독다가구",
+        "url": "https://apis.data.go.kr/1613000/RTMSDataSvcSHRent/getRTMSDataSvcSHRent",
+        "dataset": "sh_rent",
+        "name_field": "houseType",
+        "area_field": "totalFloorAr",
+    },
+}
+
+# 여러 달/여러 페이지/여러 주택 유형을 동시에 받을 때의 최대 동시 요청 수 (프로세스 전체 공유)
+RANGE_MAX_CONCURRENCY = int(os.getenv("MOLIT_MAX_CONCURRENCY") or 6)
+_fetch_slots = threading.BoundedSemaphore(RANGE_MAX_CONCURRENCY)
+# 한 번에 조회할 수 있는 최대 개월 수 (5년)
+RANGE_MAX_MONTHS = 60
+
+CLIENT_MODES = ("default", "tls12_seclevel1", "insecure")
+
+
+def _make_client(mode: str) -> httpx.Client:
+    """TLS/SSL 호환성 모드별 클라이언트 생성"""
+    limits = httpx.Limits(
+        max_connections=RANGE_MAX_CONCURRENCY * 2,
+        max_keepalive_connections=RANGE_MAX_CONCURRENCY,
+    )
     # 1) 기본값
-    yield "default", httpx.Client(http2=False, timeout=20, trust_env=True)
+    if mode == "default":
+        return httpx.Client(http2=False, timeout=20, trust_env=True, limits=limits)
 
     # 2) TLS 1.2 + 낮은 보안 레벨 (공공기관 구형 서버 호환용)
-    try:
+    if mode == "tls12_seclevel1":
         tls = ssl.create_default_context()
         tls.minimum_version = ssl.TLSVersion.TLSv1_2
         try:
             tls.set_ciphers("DEFAULT:@SECLEVEL=1")
         except Exception:
             pass
-        yield "tls12_seclevel1", httpx.Client(verify=tls, http2=False, timeout=20, trust_env=True)
-    except Exception:
-        pass
+        return httpx.Client(verify=tls, http2=False, timeout=20, trust_env=True, limits=limits)
 
     # 3) 최후 수단 (인증서 검증 무시)
-    yield "insecure", httpx.Client(verify=False, http2=False, timeout=20, trust_env=True)
+    return httpx.Client(verify=False, http2=False, timeout=20, trust_env=True, limits=limits)
+
+
+# 모드별 클라이언트는 한 번만 만들어 커넥션을 재사용하고,
+# 마지막으로 성공한 모드를 다음 요청에서 먼저 시도합니다.
+_pooled_clients: Dict[str, httpx.Client] = {}
+_pool_lock = threading.Lock()
+_preferred_mode: Optional[str] = None
+
+
+def _pooled_client(mode: str) -> httpx.Client:
+    with _pool_lock:
+        client = _pooled_clients.get(mode)
+        if client is None:
+            client = _pooled_clients[mode] = _make_client(mode)
+        return client
+
+
+def _ordered_modes() -> List[str]:
+    modes = list(CLIENT_MODES)
+    if _preferred_mode in modes:
+        modes.remove(_preferred_mode)
+        modes.insert(0, _preferred_mode)
+    return modes
 
 
 def _try_get(url: str, params: Dict[str, Any]):
-    """가능한 클라이언트로 순차적 요청 시도"""
+    """가능한 클라이언트로 순차적 요청 시도 (커넥션 풀 재사용)"""
+    global _preferred_mode
     last_err: Optional[Exception] = None
-    for mode, client in _client_candidates():
-        try:
-            with client as c:
-                resp = c.get(url, params=params)
+    for mode in _ordered_modes():
+        with span("http.attempt", tls_mode=mode, url=url) as sp:
+            try:
+                resp = _pooled_client(mode).get(url, params=params)
+                sp.set(status_code=resp.status_code)
+                metrics.TLS_ATTEMPTS.inc(server="realestate", mode=mode, outcome="ok")
+                _preferred_mode = mode
                 return mode, resp
-        except Exception as e:
-            last_err = e
-            continue
+            except Exception as e:
+                sp.set_error(e)
+                metrics.TLS_ATTEMPTS.inc(server="realestate", mode=mode, outcome="error")
+                last_err = e
+                continue
+    if last_err:
+        raise last_err
+    raise RuntimeError("No HTTP client candidates available")
+
+
+def _try_stream(url: str, params: Dict[str, Any], consume: Callable[[Iterator[bytes]], Any]):
+    """
+    _try_get과 같은 순서로 스트리밍 요청을 시도하고 consume(바이트 청크)의 결과를 반환.
+    연결 단계(TransportError) 실패만 다음 모드로 넘어가고, 파싱 오류 등은 그대로 던짐.
+    """
+    global _preferred_mode
+    last_err: Optional[Exception] = None
+    for mode in _ordered_modes():
+        with span("http.attempt", tls_mode=mode, url=url, stream=True) as sp:
+            try:
+                with _pooled_client(mode).stream("GET", url, params=params) as resp:
+                    sp.set(status_code=resp.status_code)
+                    resp.raise_for_status()
+                    result = consume(resp.iter_bytes())
+                metrics.TLS_ATTEMPTS.inc(server="realestate", mode=mode, outcome="ok")
+                _preferred_mode = mode
+                return mode, result
+            except httpx.TransportError as e:
+                sp.set_error(e)
+                metrics.TLS_ATTEMPTS.inc(server="realestate", mode=mode, outcome="error")
+                last_err = e
+                continue
     if last_err:
         raise last_err
     raise RuntimeError("No HTTP client candidates available")
 
 
+def _rent_params(lawdcd: str, deal_ymd: str, page_no: int, num_rows: int) -> Dict[str, Any]:
+    return {
+        "serviceKey": API_KEY,
+        "pageNo": page_no,
+        "numOfRows": num_rows,
+        "LAWD_CD": lawdcd,
+        "DEAL_YMD": deal_ymd,
+    }
+
+
 def call_apt_rent_api(
     lawdcd: str,
     deal_ymd: str,
@@ -68,13 +199,7 @@ def call_apt_rent_api(
     # 아파트 전월세 조회 오퍼레이션
     url = f"{BASE_URL}/getRTMSDataSvcAptRent"
     
-    params: Dict[str, Any] = {
-        "serviceKey": API_KEY,
-        "pageNo": page_no,
-        "numOfRows": num_rows,
-        "LAWD_CD": lawdcd,
-        "DEAL_YMD": deal_ymd,
-    }
+    params = _rent_params(lawdcd, deal_ymd, page_no, num_rows)
     if filters:
         params.update(filters)
 
@@ -119,28 +244,1008 @@ def getApartmentTrades(
     
     - lawdcd: 법정동코드 5자리 (예: 11110)
     - deal_ymd: 계약년월 YYYYMM (예: 202506)
+
+    추가 필터가 없으면 월 단위 아카이브(마감된 달은 영구 보관)에서 해당 페이지를 잘라 반환하고,
+    필터가 있거나 아카이브를 쓸 수 없으면 원본 API를 호출합니다.
+    어느 경로든 응답은 타입 레코드(records) + totalCount 형식으로 같습니다.
+    """
+    if not filters:
+        try:
+            page = _typed_rent_page("apt", lawdcd, deal_ymd, pageNo, numOfRows)
+            if page["status"] == "ok":
+                return page
+        except Exception as e:
+            print(f"⚠️ 아카이브 조회 실패, 원본 API로 대체: {e}", file=sys.stderr)
+
+    return _api_rent_page(
+        call_apt_rent_api(
+            lawdcd=lawdcd,
+            deal_ymd=deal_ymd,
+            page_no=pageNo,
+            num_rows=numOfRows,
+            filters=filters
+        ),
+        pageNo,
+        numOfRows,
+    )
+
+
+def _typed_rent_page(housing_type: str, lawdcd: str, deal_ymd: str, pageNo: int, numOfRows: int) -> Dict[str, Any]:
+    """한 달치 아카이브(또는 새로 받은) 레코드에서 요청한 페이지만 잘라 반환"""
+    month_records, month_info = load_rent_months(lawdcd, [deal_ymd], housing_type=housing_type)
+    info = month_info[deal_ymd]
+    if info["errors"]:
+        return {"status": "error", "message": "; ".join(info["errors"]), "source": info["source"]}
+    records = month_records[deal_ymd]
+    page_no, num_rows = max(1, int(pageNo)), max(1, int(numOfRows))
+    start = (page_no - 1) * num_rows
+    return {
+        "status": "ok",
+        "records": [r._asdict() for r in records[start:start + num_rows]],
+        "totalCount": len(records),
+        "pageNo": page_no,
+        "numOfRows": num_rows,
+        "source": info["source"],
+        "note": f"{HOUSING_TYPES[housing_type]['label']} Rent Data (typed)",
+    }
+
+
+def _api_rent_page(response: Dict[str, Any], pageNo: int, numOfRows: int) -> Dict[str, Any]:
+    """call_apt_rent_api 원본 응답(XML text 또는 JSON data) → _typed_rent_page와 같은 형식"""
+    if response.get("status") != "ok":
+        return response
+    meta: Dict[str, str] = {}
+    if "text" in response:
+        records = list(iter_rent_records(_iter_chunks(response["text"]), meta))
+    else:
+        body = ((response.get("data") or {}).get("response") or {}).get("body") or {}
+        items = (body.get("items") or {}).get("item") or []
+        if isinstance(items, dict):  # 결과가 1건이면 리스트가 아니라 객체
+            items = [items]
+        meta["totalCount"] = str(body.get("totalCount") or len(items))
+        records = [to_rent_record(item) for item in items]
+    try:
+        _check_result_code(meta)
+    except RuntimeError as e:
+        return {"status": "error", "message": str(e), "source": "api"}
+    return {
+        "status": "ok",
+        "records": [r._asdict() for r in records],
+        "totalCount": _to_int(meta.get("totalCount")) or len(records),
+        "pageNo": max(1, int(pageNo)),
+        "numOfRows": max(1, int(numOfRows)),
+        "source": "api",
+        "note": f"{HOUSING_TYPES['apt']['label']} Rent Data (typed)",
+    }
+
+
+@mcp.tool()
+def getOfficeTrades(lawdcd: str, deal_ymd: str, pageNo: int = 1, numOfRows: int = 10):
+    """
+    [오피스텔 전월세 조회]
+    아파트와 같은 월 단위 아카이브/병렬 수집 경로로 오피스텔 전월세를 조회합니다.
+    aptNm 자리에는 오피스텔 단지명(offiNm)이 들어갑니다.
+
+    - lawdcd: 법정동코드 5자리 (예: 44790)
+    - deal_ymd: 계약년월 YYYYMM
+    """
+    try:
+        return _typed_rent_page("offi", lawdcd, deal_ymd, pageNo, numOfRows)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+def getRowHouseTrades(lawdcd: str, deal_ymd: str, pageNo: int = 1, numOfRows: int = 10):
+    """
+    [연립/다세대 전월세 조회]
+    아파트와 같은 월 단위 아카이브/병렬 수집 경로로 연립·다세대 전월세를 조회합니다.
+    aptNm 자리에는 연립다세대 건물명(mhouseNm)이 들어갑니다.
+
+    - lawdcd: 법정동코드 5자리 (예: 44790)
+    - deal_ymd: 계약년월 YYYYMM
+    """
+    try:
+        return _typed_rent_page("rh", lawdcd, deal_ymd, pageNo, numOfRows)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+def getHouseTrades(lawdcd: str, deal_ymd: str, pageNo: int = 1, numOfRows: int = 10):
+    """
+    [단독/다가구 전월세 조회] — 연립/다세대는 getRowHouseTrades
+    아파트와 같은 월 단위 아카이브/병렬 수집 경로로 단독·다가구 전월세를 조회합니다.
+    단지명이 없으므로 aptNm 자리에 주택유형(단독/다가구), excluUseAr 자리에 연면적이 들어갑니다.
+
+    - lawdcd: 법정동코드 5자리 (예: 44790)
+    - deal_ymd: 계약년월 YYYYMM
     """
-    return call_apt_rent_api(
-        lawdcd=lawdcd,
-        deal_ymd=deal_ymd,
-        page_no=pageNo,
-        num_rows=numOfRows,
-        filters=filters
+    try:
+        return _typed_rent_page("sh", lawdcd, deal_ymd, pageNo, numOfRows)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def _month_range(from_ymd: str, to_ymd: str) -> List[str]:
+    """YYYYMM ~ YYYYMM 사이의 모든 월 목록 (양 끝 포함)"""
+    for ymd in (from_ymd, to_ymd):
+        if len(str(ymd)) != 6 or not str(ymd).isdigit() or not 1 <= int(str(ymd)[4:]) <= 12:
+            raise ValueError(f"잘못된 계약년월 형식: {ymd} (YYYYMM)")
+    year, month = int(from_ymd[:4]), int(from_ymd[4:])
+    end = int(to_ymd)
+    months = []
+    while year * 100 + month <= end:
+        months.append(f"{year}{month:02d}")
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return months
+
+
+def _to_int(value: Any) -> int:
+    text = str(value or "").replace(",", "").strip()
+    try:
+        return int(float(text)) if text else 0
+    except ValueError:
+        return 0
+
+
+def _to_float(value: Any) -> float:
+    text = str(value or "").replace(",", "").strip()
+    try:
+        return float(text) if text else 0.0
+    except ValueError:
+        return 0.0
+
+
+class RentRecord(NamedTuple):
+    """전월세 거래 1건 — 수집 시점에 한 번만 타입 변환해 두는 compact 레코드"""
+    aptNm: str
+    umdNm: str
+    jibun: str
+    deposit: int        # 보증금 (만원)
+    monthlyRent: int    # 월세 (만원, 0이면 전세)
+    excluUseAr: float   # 전용면적 (㎡)
+    floor: int
+    buildYear: int
+    dealDate: int       # 계약일 YYYYMMDD
+    contractType: str
+
+
+def to_rent_record(item: Dict[str, Any], housing_type: str = "apt") -> RentRecord:
+    """API 원본 항목(문자열) → RentRecord (반복되는 단지명/동명은 intern으로 공유)"""
+    spec = HOUSING_TYPES[housing_type]
+    return RentRecord(
+        aptNm=sys.intern((item.get(spec["name_field"]) or "").strip()),
+        umdNm=sys.intern((item.get("umdNm") or "").strip()),
+        jibun=(item.get("jibun") or "").strip(),
+        deposit=_to_int(item.get("deposit")),
+        monthlyRent=_to_int(item.get("monthlyRent")),
+        excluUseAr=_to_float(item.get(spec["area_field"])),
+        floor=_to_int(item.get("floor")),
+        buildYear=_to_int(item.get("buildYear")),
+        dealDate=(
+            _to_int(item.get("dealYear")) * 10000
+            + _to_int(item.get("dealMonth")) * 100
+            + _to_int(item.get("dealDay"))
+        ),
+        contractType=sys.intern((item.get("contractType") or "").strip()),
     )
 
 
+# 응답 헤더/바디에서 따로 모아둘 태그 (정상 응답 + 공공데이터포털 인증 오류 응답)
+_META_TAGS = {"resultCode", "resultMsg", "totalCount", "returnReasonCode", "returnAuthMsg"}
+XML_CHUNK_SIZE = 64 * 1024
+
+
+class _RentXmlTarget:
+    """XMLParser 타깃 — Element 트리를 만들지 않고 <item> 단위로 필드만 모아 RentRecord 생성"""
+
+    def __init__(self, meta: Optional[Dict[str, str]], housing_type: str = "apt"):
+        self.meta = meta
+        self.housing_type = housing_type
+        self.records: List[RentRecord] = []
+        self._item: Optional[Dict[str, str]] = None
+        self._text: List[str] = []
+
+    def start(self, tag, attrib):
+        if tag == "item":
+            self._item = {}
+        self._text.clear()
+
+    def data(self, data):
+        self._text.append(data)
+
+    def end(self, tag):
+        if tag == "item":
+            self.records.append(to_rent_record(self._item or {}, self.housing_type))
+            self._item = None
+        elif self._item is not None:
+            self._item[tag] = "".join(self._text)
+        elif self.meta is not None and tag in _META_TAGS:
+            self.meta[tag] = "".join(self._text).strip()
+        self._text.clear()
+
+    def close(self):
+        return None
+
+
+def iter_rent_records(
+    chunks: Iterable[bytes], meta: Optional[Dict[str, str]] = None, housing_type: str = "apt"
+) -> Iterator[RentRecord]:
+    """
+    MOLIT 전월세 XML을 청크 단위로 읽으면서 RentRecord를 하나씩 생성.
+    DOM을 만들지 않으므로 메모리는 청크 크기 + 결과 레코드만큼만 사용합니다.
+    meta를 넘기면 resultCode / totalCount 등 헤더 값이 채워집니다.
+    """
+    target = _RentXmlTarget(meta, housing_type)
+    parser = ET.XMLParser(target=target)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if target.records:
+            yield from target.records
+            target.records.clear()
+    parser.close()
+    yield from target.records
+    target.records.clear()
+
+
+def _iter_chunks(data: Any, size: int = XML_CHUNK_SIZE) -> Iterator[bytes]:
+    raw = data.encode("utf-8") if isinstance(data, str) else bytes(data or b"")
+    for i in range(0, len(raw), size):
+        yield raw[i:i + size]
+
+
+def parse_rent_xml(xml_text: Any) -> List[Dict[str, Any]]:
+    """이미 받아 둔 XML 문자열을 타입 레코드(dict) 목록으로 변환"""
+    return [r._asdict() for r in iter_rent_records(_iter_chunks(xml_text))]
+
+
+def _check_result_code(meta: Dict[str, str]):
+    result_code = meta.get("resultCode", "")
+    # 03(NODATA)은 해당 월 거래가 없다는 뜻이므로 빈 결과로 취급
+    if result_code and result_code not in ("000", "00", "03"):
+        raise RuntimeError(f"MOLIT 오류 {result_code}: {meta.get('resultMsg', '')}")
+    if meta.get("returnReasonCode"):
+        raise RuntimeError(f"MOLIT 오류 {meta['returnReasonCode']}: {meta.get('returnAuthMsg', '')}")
+
+
+def _fetch_rent_page(
+    lawdcd: str, deal_ymd: str, page_no: int, num_rows: int, housing_type: str = "apt"
+) -> Tuple[int, List[RentRecord]]:
+    """한 (유형, 월, 페이지)를 스트리밍으로 받아 (totalCount, 레코드 목록) 반환"""
+    if not API_KEY:
+        raise RuntimeError("MOLIT_API_KEY is missing in .env")
+
+    def consume(chunks: Iterator[bytes]):
+        meta: Dict[str, str] = {}
+        records = list(iter_rent_records(chunks, meta, housing_type))
+        return meta, records
+
+    url = HOUSING_TYPES[housing_type]["url"]
+    api = f"molit_{housing_type}"
+    with span("molit.page", housing_type=housing_type, lawdcd=lawdcd, deal_ymd=deal_ymd, page_no=page_no) as sp:
+        with _fetch_slots:
+            started = time.perf_counter()
+            try:
+                _, (meta, records) = _try_stream(url, _rent_params(lawdcd, deal_ymd, page_no, num_rows), consume)
+            except httpx.HTTPStatusError as e:
+                metrics.UPSTREAM_ERRORS.inc(api=api, status=str(e.response.status_code))
+                raise
+            except Exception:
+                metrics.UPSTREAM_ERRORS.inc(api=api, status="exception")
+                raise
+            finally:
+                metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, api=api)
+        sp.set(rows=len(records), total_count=meta.get("totalCount"))
+        try:
+            _check_result_code(meta)
+        except RuntimeError:
+            metrics.UPSTREAM_ERRORS.inc(api=api, status=f"result_{meta.get('resultCode') or meta.get('returnReasonCode')}")
+            raise
+    return _to_int(meta.get("totalCount")), records
+
+
+def _fetch_months(lawdcd: str, months: List[str], num_rows: int, housing_type: str = "apt"):
+    """
+    여러 달의 모든 페이지를 제한된 동시성으로 조회.
+    1단계: 각 월 첫 페이지로 totalCount 확인 → 2단계: 나머지 (월, 페이지) 전부 동시 요청
+    """
+    records: Dict[str, List[RentRecord]] = {m: [] for m in months}
+    month_info: Dict[str, Dict[str, Any]] = {
+        m: {"total_count": 0, "pages": 0, "records": 0, "errors": []} for m in months
+    }
+
+    with ThreadPoolExecutor(max_workers=RANGE_MAX_CONCURRENCY) as pool:
+        first_pages = {m: pool.submit(wrap(_fetch_rent_page), lawdcd, m, 1, num_rows, housing_type) for m in months}
+        rest_pages = {}
+        for month, future in first_pages.items():
+            try:
+                total_count, page_records = future.result()
+            except Exception as e:
+                month_info[month]["errors"].append(f"page 1: {e}")
+                continue
+            pages = max(1, -(-total_count // num_rows))
+            month_info[month].update(total_count=total_count, pages=pages)
+            records[month].extend(page_records)
+            for page_no in range(2, pages + 1):
+                rest_pages[(month, page_no)] = pool.submit(
+                    wrap(_fetch_rent_page), lawdcd, month, page_no, num_rows, housing_type
+                )
+
+        for (month, page_no), future in rest_pages.items():
+            try:
+                _, page_records = future.result()
+            except Exception as e:
+                month_info[month]["errors"].append(f"page {page_no}: {e}")
+                continue
+            records[month].extend(page_records)
+
+    for month in months:
+        month_info[month]["records"] = len(records[month])
+    return records, month_info
+
+
+# ---------------------------------------------------------------------------
+# 과거 월 전월세 아카이브
+#   {ARCHIVE_DIR}/{apt_rent|offi_rent|rh_rent|sh_rent}/{LAWD_CD}/{YYYYMM}/ 아래에 컬럼별 바이너리 파일로 저장하고
+#   읽을 때는 요청된 컬럼 파일만 통째로 읽어 array로 올립니다 (파일 핸들을 열어 두지 않음).
+#   - 마감된 달(전전월 이전): 한 번 받으면 영구 보관
+#   - 이번 달 / 지난 달: 신고 지연으로 계속 바뀌므로 OPEN_MONTH_TTL마다 다시 받음
+# ---------------------------------------------------------------------------
+ARCHIVE_DIR = os.getenv("MOLIT_ARCHIVE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".molit_archive"
+)
+OPEN_MONTH_TTL = float(os.getenv("MOLIT_OPEN_MONTH_TTL") or 6 * 3600)
+ARCHIVE_VERSION = 1
+# 메모리에 올려 둘 파티션 수 상한 (LRU) — 여러 달/여러 지역 조회가 쌓여도 메모리가 무한히 늘지 않도록
+RENT_PARTITION_CACHE_SIZE = int(os.getenv("MOLIT_PARTITION_CACHE_SIZE") or 256)
+
+# 숫자 컬럼은 array 타입코드 그대로 저장 (i: int32, d: float64)
+_NUMERIC_COLUMNS = {
+    "deposit": "i",
+    "monthlyRent": "i",
+    "excluUseAr": "d",
+    "floor": "i",
+    "buildYear": "i",
+    "dealDate": "i",
+}
+# 문자열 컬럼은 UTF-8 blob(.str) + uint32 offset(.off) 쌍으로 저장
+_STRING_COLUMNS = ("aptNm", "umdNm", "jibun", "contractType")
+
+
+def _months_ago(n: int) -> str:
+    now = datetime.now()
+    index = now.year * 12 + (now.month - 1) - n
+    return f"{index // 12}{index % 12 + 1:02d}"
+
+
+def _is_closed_month(ymd: str) -> bool:
+    """이번 달/지난 달이 아니면 더 이상 바뀌지 않는 마감된 달"""
+    return ymd < _months_ago(1)
+
+
+def _partition_dir(lawdcd: str, ymd: str, housing_type: str = "apt") -> str:
+    return os.path.join(ARCHIVE_DIR, HOUSING_TYPES[housing_type]["dataset"], lawdcd, ymd)
+
+
+class RentPartition:
+    """
+    한 (지역, 계약월) 파티션 — 요청된 컬럼 파일만 읽어 복사본(array / str 리스트)으로 보관.
+    파일은 읽는 즉시 닫고 살아 있는 버퍼 뷰를 내주지 않으므로, 캐시에서 밀려나도
+    이미 받아 간 컬럼을 쓰는 다른 스레드에 영향이 없습니다.
+    """
+
+    def __init__(self, path: str, meta: Dict[str, Any]):
+        self.path = path
+        self.meta = meta
+        self.rows = int(meta.get("rows", 0))
+        self._columns: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _read(self, filename: str, typecode: str) -> array:
+        values = array(typecode)
+        with open(os.path.join(self.path, filename), "rb") as f:
+            values.frombytes(f.read())
+        return values
+
+    def column(self, name: str):
+        """숫자 컬럼은 array, 문자열 컬럼은 str 리스트"""
+        with self._lock:
+            if name in self._columns:
+                return self._columns[name]
+            if self.rows == 0:
+                values: Any = ()
+            elif name in _NUMERIC_COLUMNS:
+                values = self._read(f"{name}.col", _NUMERIC_COLUMNS[name])
+            elif name in _STRING_COLUMNS:
+                offsets = self._read(f"{name}.off", "I")
+                with open(os.path.join(self.path, f"{name}.str"), "rb") as f:
+                    blob = f.read()
+                values = [
+                    sys.intern(str(blob[offsets[i]:offsets[i + 1]], "utf-8"))
+                    for i in range(self.rows)
+                ]
+            else:
+                raise KeyError(name)
+            self._columns[name] = values
+            return values
+
+    def records(self) -> List[RentRecord]:
+        if self.rows == 0:
+            return []
+        columns = [self.column(field) for field in RentRecord._fields]
+        return [RentRecord(*row) for row in zip(*columns)]
+
+    def stats(self) -> Dict[str, Any]:
+        """수집 시점에 meta.json에 저장된 통계 (없으면 컬럼에서 한 번 계산해 보관)"""
+        if "stats" not in self.meta:
+            self.meta["stats"] = compute_rent_statistics(
+                self.column("deposit"), self.column("monthlyRent"), self.column("excluUseAr")
+            )
+        return self.meta["stats"]
+
+    def close(self):
+        with self._lock:
+            self._columns.clear()
+
+
+_partitions: "OrderedDict[Tuple[str, str, str], RentPartition]" = OrderedDict()  # LRU (최근 사용이 끝)
+_partitions_lock = threading.Lock()
+
+
+def _open_partition(lawdcd: str, ymd: str, housing_type: str = "apt") -> Optional[RentPartition]:
+    key = (housing_type, lawdcd, ymd)
+    with _partitions_lock:
+        part = _partitions.get(key)
+        if part is not None:
+            _partitions.move_to_end(key)
+            return part
+        path = _partition_dir(lawdcd, ymd, housing_type)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != ARCHIVE_VERSION:
+            return None
+        part = _partitions[key] = RentPartition(path, meta)
+        while len(_partitions) > RENT_PARTITION_CACHE_SIZE:
+            _partitions.popitem(last=False)[1].close()
+        return part
+
+
+def _close_partition(lawdcd: str, ymd: str, housing_type: str = "apt"):
+    with _partitions_lock:
+        part = _partitions.pop((housing_type, lawdcd, ymd), None)
+    if part is not None:
+        part.close()
+
+
+RENT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _summarize(values: List[float]) -> Dict[str, Any]:
+    """정렬 1회로 개수/평균/최소/최대/백분위수(선형 보간)를 함께 계산"""
+    ordered = sorted(values)
+    n = len(ordered)
+    if n == 0:
+        return {"count": 0}
+    summary: Dict[str, Any] = {
+        "count": n,
+        "mean": round(sum(ordered) / n, 2),
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+    for p in RENT_PERCENTILES:
+        k = (n - 1) * p / 100
+        lo = int(k)
+        hi = min(lo + 1, n - 1)
+        summary[f"p{p}"] = round(ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo), 2)
+    summary["median"] = summary["p50"]
+    return summary
+
+
+def compute_rent_statistics(deposit, monthly_rent, area) -> Dict[str, Any]:
+    """
+    한 (지역, 월)의 전월세 통계. 컬럼(보증금/월세/전용면적) 단위로 한 번에 계산합니다.
+    - 월세 0원은 전세, 그 외는 월세(반전세 포함)로 분류
+    - ㎡당 가격은 전세 보증금 / 월세 금액을 전용면적으로 나눈 값 (만원/㎡)
+    """
+    rows = list(zip(deposit, monthly_rent, area))
+    jeonse = [(d, a) for d, r, a in rows if r == 0]
+    wolse = [(d, r, a) for d, r, a in rows if r > 0]
+    count = len(rows)
+    return {
+        "count": count,
+        "jeonse_count": len(jeonse),
+        "wolse_count": len(wolse),
+        "jeonse_ratio": round(len(jeonse) / count, 3) if count else None,
+        "deposit": _summarize([d for d, _, _ in rows]),
+        "jeonse_deposit": _summarize([d for d, _ in jeonse]),
+        "wolse_deposit": _summarize([d for d, _, _ in wolse]),
+        "monthly_rent": _summarize([r for _, r, _ in wolse]),
+        "jeonse_deposit_per_m2": _summarize([d / a for d, a in jeonse if a > 0]),
+        "monthly_rent_per_m2": _summarize([r / a for _, r, a in wolse if a > 0]),
+        "area": _summarize([a for _, _, a in rows]),
+    }
+
+
+def _write_partition(lawdcd: str, ymd: str, records: List[RentRecord], closed: bool, housing_type: str = "apt"):
+    """임시 디렉터리에 컬럼 파일을 모두 쓴 뒤 교체 (읽는 쪽은 항상 완성된 파티션만 봄)"""
+    final_dir = _partition_dir(lawdcd, ymd, housing_type)
+    tmp_dir = f"{final_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    for name, typecode in _NUMERIC_COLUMNS.items():
+        with open(os.path.join(tmp_dir, f"{name}.col"), "wb") as f:
+            array(typecode, (getattr(r, name) for r in records)).tofile(f)
+    for name in _STRING_COLUMNS:
+        offsets = array("I", [0])
+        with open(os.path.join(tmp_dir, f"{name}.str"), "wb") as f:
+            for r in records:
+                encoded = getattr(r, name).encode("utf-8")
+                f.write(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+        with open(os.path.join(tmp_dir, f"{name}.off"), "wb") as f:
+            offsets.tofile(f)
+
+    meta = {
+        "version": ARCHIVE_VERSION,
+        "housing_type": housing_type,
+        "lawdcd": lawdcd,
+        "deal_ymd": ymd,
+        "rows": len(records),
+        "closed": closed,
+        "fetched_at": time.time(),
+        # 통계는 수집 시점에 미리 계산해 두고 조회 시에는 그대로 읽기만 함
+        "stats": compute_rent_statistics(
+            [r.deposit for r in records], [r.monthlyRent for r in records], [r.excluUseAr for r in records]
+        ),
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # 메모리에 올라온 이전 버전 컬럼은 버리고 다음 조회 때 새 파일에서 읽음
+    _close_partition(lawdcd, ymd, housing_type)
+    old_dir = None
+    if os.path.isdir(final_dir):
+        old_dir = f"{final_dir}.old-{os.getpid()}-{threading.get_ident()}"
+        os.replace(final_dir, old_dir)
+    os.replace(tmp_dir, final_dir)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _partition_is_fresh(part: RentPartition, ymd: str) -> bool:
+    if part.meta.get("closed"):
+        return True
+    # 열린 상태로 저장됐는데 지금은 마감된 달이면 최종본으로 한 번 더 받아야 함
+    return not _is_closed_month(ymd) and time.time() - part.meta.get("fetched_at", 0) < OPEN_MONTH_TTL
+
+
+def load_rent_months(lawdcd: str, months: List[str], num_rows: int = 1000, housing_type: str = "apt"):
+    """
+    월별 전월세 레코드 로드 (housing_type: HOUSING_TYPES 키) — 아카이브에 신선한 파티션이 있으면 디스크에서 읽고,
+    없거나 갱신이 필요한 달만 모아 네트워크에서 병렬 조회한 뒤 아카이브에 기록.
+    반환: ({월: [RentRecord]}, {월: 조회 정보})
+    """
+    current = _months_ago(0)
+    records: Dict[str, List[RentRecord]] = {}
+    month_info: Dict[str, Dict[str, Any]] = {}
+    stale: Dict[str, RentPartition] = {}
+    to_fetch: List[str] = []
+
+    for month in months:
+        if month > current:
+            records[month] = []
+            month_info[month] = {"source": "future", "total_count": 0, "pages": 0, "records": 0, "errors": []}
+            continue
+        part = _open_partition(lawdcd, month, housing_type)
+        if part is not None:
+            if _partition_is_fresh(part, month):
+                metrics.CACHE_REQUESTS.inc(cache="rent_archive", result="hit")
+                records[month] = part.records()
+                month_info[month] = {
+                    "source": "archive", "total_count": part.rows, "pages": 0,
+                    "records": part.rows, "errors": [],
+                }
+                continue
+            stale[month] = part
+        metrics.CACHE_REQUESTS.inc(cache="rent_archive", result="miss")
+        to_fetch.append(month)
+
+    if to_fetch:
+        fetched, fetch_info = _fetch_months(lawdcd, to_fetch, num_rows, housing_type)
+        for month in to_fetch:
+            info = fetch_info[month]
+            if not info["errors"]:
+                records[month] = fetched[month]
+                month_info[month] = {"source": "network", **info}
+                try:
+                    _write_partition(lawdcd, month, fetched[month], _is_closed_month(month), housing_type)
+                except OSError as e:
+                    print(f"⚠️ 아카이브 저장 실패 ({housing_type}/{lawdcd}/{month}): {e}", file=sys.stderr)
+            elif month in stale:
+                # 갱신 실패 시 이전에 저장해 둔 파티션으로 응답
+                records[month] = stale[month].records()
+                month_info[month] = {
+                    "source": "archive_stale", "total_count": stale[month].rows, "pages": 0,
+                    "records": stale[month].rows, "errors": info["errors"],
+                }
+            else:
+                records[month] = fetched[month]
+                month_info[month] = {"source": "network", **info}
+
+    return records, {month: month_info[month] for month in months}
+
+
+class RentBudgetIndex:
+    """
+    한 (지역, 월)의 (보증금 × 월세) 예산 질의 인덱스.
+    - records: 보증금 오름차순 정렬 → "보증금 ≤ X"는 이분 탐색으로 접두 구간이 됨
+    - 접두 구간을 펜윅 트리 노드(최대 log n개)로 나누고, 노드마다 월세 오름차순 위치 목록을 보관
+      → "보증금 ≤ X 그리고 월세 ≤ Y"는 노드별 이분 탐색 O(log² n) + 결과 크기
+    - pareto_front: 월세 수준별 최저 보증금 매물 (월세를 더 내면 보증금이 내려가는 선택지)
+    """
+
+    def __init__(self, records: Iterable[RentRecord]):
+        self.records: List[RentRecord] = sorted(records, key=lambda r: (r.deposit, r.monthlyRent))
+        self.deposits = array("i", (r.deposit for r in self.records))
+        rents = [r.monthlyRent for r in self.records]
+
+        # 노드 i(1부터)는 위치 [i - lowbit(i), i) 구간을 월세 순으로 정렬해 보관
+        self._node_rents: List[array] = [array("i")]
+        self._node_positions: List[array] = [array("I")]
+        for i in range(1, len(self.records) + 1):
+            positions = sorted(range(i - (i & -i), i), key=rents.__getitem__)
+            self._node_positions.append(array("I", positions))
+            self._node_rents.append(array("i", (rents[p] for p in positions)))
+
+        self.pareto_front = self._build_pareto_front()
+        self.fetched_at: Optional[float] = None
+
+    def _build_pareto_front(self) -> List[RentRecord]:
+        front: List[RentRecord] = []
+        for r in sorted(self.records, key=lambda r: (r.monthlyRent, r.deposit)):
+            if not front or r.deposit < front[-1].deposit:
+                front.append(r)
+        return front
+
+    def _prefix(self, max_deposit: Optional[int]) -> int:
+        if max_deposit is None:
+            return len(self.records)
+        return bisect_right(self.deposits, max_deposit)
+
+    def count(self, max_deposit: Optional[int] = None, max_rent: Optional[int] = None) -> int:
+        """조건에 맞는 매물 수 (결과를 만들지 않고 O(log² n))"""
+        i = self._prefix(max_deposit)
+        if max_rent is None:
+            return i
+        total = 0
+        while i > 0:
+            total += bisect_right(self._node_rents[i], max_rent)
+            i -= i & -i
+        return total
+
+    def query(self, max_deposit: Optional[int] = None, max_rent: Optional[int] = None) -> List[RentRecord]:
+        """보증금 ≤ max_deposit 그리고 월세 ≤ max_rent 인 매물 (보증금 오름차순, None은 제한 없음)"""
+        i = self._prefix(max_deposit)
+        if max_rent is None:
+            return self.records[:i]
+        positions: List[int] = []
+        while i > 0:
+            k = bisect_right(self._node_rents[i], max_rent)
+            positions.extend(self._node_positions[i][:k])
+            i -= i & -i
+        positions.sort()
+        return [self.records[p] for p in positions]
+
+
+# 파티션 캐시와 같은 크기의 LRU — 인덱스는 레코드 + O(n log n) 위치/월세 배열을 들고 있으므로 무한히 쌓지 않음
+_budget_indexes: "OrderedDict[Tuple[str, str, str], RentBudgetIndex]" = OrderedDict()
+_budget_indexes_lock = threading.Lock()
+
+
+def get_budget_index(lawdcd: str, deal_ymd: str, housing_type: str = "apt") -> Tuple[RentBudgetIndex, Dict[str, Any]]:
+    """
+    (지역, 월) 예산 인덱스 — 신선한 파티션에서 만든 인덱스는 메모리에 보관하고,
+    파티션이 다시 기록되면(fetched_at 변경) 새로 만듦.
+    반환: (인덱스, load_rent_months의 월 조회 정보)
+    """
+    key = (housing_type, lawdcd, deal_ymd)
+    part = _open_partition(lawdcd, deal_ymd, housing_type) if deal_ymd <= _months_ago(0) else None
+    if part is not None and _partition_is_fresh(part, deal_ymd):
+        with _budget_indexes_lock:
+            index = _budget_indexes.get(key)
+            if index is not None:
+                _budget_indexes.move_to_end(key)
+        if index is not None and index.fetched_at == part.meta.get("fetched_at"):
+            metrics.CACHE_REQUESTS.inc(cache="rent_budget_index", result="hit")
+            return index, {"source": "index", "total_count": part.rows, "pages": 0, "records": part.rows, "errors": []}
+    metrics.CACHE_REQUESTS.inc(cache="rent_budget_index", result="miss")
+
+    month_records, month_info = load_rent_months(lawdcd, [deal_ymd], housing_type=housing_type)
+    info = month_info[deal_ymd]
+    index = RentBudgetIndex(month_records[deal_ymd])
+    part = _open_partition(lawdcd, deal_ymd, housing_type)
+    if part is not None and info["source"] in ("archive", "network") and not info["errors"]:
+        index.fetched_at = part.meta.get("fetched_at")
+        with _budget_indexes_lock:
+            _budget_indexes[key] = index
+            _budget_indexes.move_to_end(key)
+            while len(_budget_indexes) > RENT_PARTITION_CACHE_SIZE:
+                _budget_indexes.popitem(last=False)
+    return index, info
+
+
+def _resolve_housing_types(housing_types: Optional[Iterable[str]]) -> List[str]:
+    if not housing_types:
+        return list(HOUSING_TYPES)
+    unknown = [t for t in housing_types if t not in HOUSING_TYPES]
+    if unknown:
+        raise ValueError(f"알 수 없는 주택 유형: {unknown} (가능: {list(HOUSING_TYPES)})")
+    return list(dict.fromkeys(housing_types))
+
+
+def _for_each_housing_type(housing_types: List[str], fn: Callable[[str], Any]) -> Dict[str, Any]:
+    """유형별 작업을 동시에 실행 — 실제 요청 수는 _fetch_slots가 프로세스 전체에서 제한"""
+    with ThreadPoolExecutor(max_workers=len(housing_types)) as pool:
+        futures = {t: pool.submit(wrap(fn), t) for t in housing_types}
+        return {t: future.result() for t, future in futures.items()}
+
+
+def _rental_dict(record: RentRecord, housing_type: str) -> Dict[str, Any]:
+    return {**record._asdict(), "housingType": housing_type, "housingLabel": HOUSING_TYPES[housing_type]["label"]}
+
+
+def load_all_rentals(lawdcd: str, deal_ymd: str, housing_types: Optional[Iterable[str]] = None):
+    """
+    한 달치 전월세를 주택 유형별로 동시에 로드.
+    반환: ({유형: [RentRecord]}, {유형: 조회 정보}) — 유형별 실패는 정보의 errors에 남고 나머지는 그대로 반환
+    """
+    types = _resolve_housing_types(housing_types)
+
+    def load(housing_type: str):
+        try:
+            month_records, month_info = load_rent_months(lawdcd, [deal_ymd], housing_type=housing_type)
+            return month_records[deal_ymd], month_info[deal_ymd]
+        except Exception as e:
+            return [], {"source": "network", "total_count": 0, "pages": 0, "records": 0, "errors": [str(e)]}
+
+    loaded = _for_each_housing_type(types, load)
+    return {t: loaded[t][0] for t in types}, {t: loaded[t][1] for t in types}
+
+
+@mcp.tool()
+def getApartmentRentsRange(
+    lawdcd: str,
+    from_ymd: str,
+    to_ymd: str,
+    numOfRows: int = 1000,
+):
+    """
+    [아파트 전월세 기간 조회]
+    from_ymd ~ to_ymd 의 월별 데이터를 하나의 타입 레코드 목록으로 합쳐 반환합니다.
+    아카이브에 있는 달은 디스크에서 읽고, 나머지 (월, 페이지)만 제한된 동시성으로 병렬 조회합니다.
+
+    - lawdcd: 법정동코드 5자리 (예: 44790)
+    - from_ymd, to_ymd: 계약년월 YYYYMM (양 끝 포함)
+    - numOfRows: 페이지당 행 수 (기본 1000)
+    """
+    started = time.perf_counter()
+    try:
+        months = _month_range(from_ymd, to_ymd)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    if not months:
+        return {"status": "error", "message": f"기간이 비어 있습니다: {from_ymd} ~ {to_ymd}"}
+    if len(months) > RANGE_MAX_MONTHS:
+        return {"status": "error", "message": f"최대 {RANGE_MAX_MONTHS}개월까지 조회할 수 있습니다."}
+
+    month_records, month_info = load_rent_months(lawdcd, months, max(1, int(numOfRows)))
+    records = [r for month in months for r in month_records[month]]
+    records.sort(key=lambda r: r.dealDate)
+
+    failed_months = [m for m, info in month_info.items() if info["errors"]]
+    if not failed_months:
+        status = "ok"
+    elif len(failed_months) < len(months) or records:
+        status = "partial"
+    else:
+        status = "error"
+
+    return {
+        "status": status,
+        "lawdcd": lawdcd,
+        "from_ymd": months[0],
+        "to_ymd": months[-1],
+        "count": len(records),
+        "records": [r._asdict() for r in records],
+        "months": month_info,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "note": "Apartment Rent Data (typed, merged)",
+    }
+
+
+@mcp.tool()
+def getRentStatistics(lawdcd: str, from_ymd: str, to_ymd: Optional[str] = None):
+    """
+    [아파트 전월세 통계]
+    지역/월별 보증금·월세 중앙값과 백분위수, ㎡당 가격, 전세/월세 비중과 건수를 반환합니다.
+    통계는 아카이브에 저장할 때 미리 계산되므로 이미 수집된 달은 즉시 응답합니다.
+
+    - lawdcd: 법정동코드 5자리 (예: 44790)
+    - from_ymd, to_ymd: 계약년월 YYYYMM (to_ymd 생략 시 한 달)
+    """
+    started = time.perf_counter()
+    try:
+        months = _month_range(from_ymd, to_ymd or from_ymd)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    if not months or len(months) > RANGE_MAX_MONTHS:
+        return {"status": "error", "message": f"1~{RANGE_MAX_MONTHS}개월 범위로 조회해주세요."}
+
+    current = _months_ago(0)
+    stats_by_month: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for month in months:
+        part = _open_partition(lawdcd, month) if month <= current else None
+        if month > current:
+            stats_by_month[month] = {"source": "future", **compute_rent_statistics([], [], [])}
+        elif part is not None and _partition_is_fresh(part, month):
+            stats_by_month[month] = {"source": "archive", **part.stats()}
+        else:
+            missing.append(month)
+
+    if missing:
+        month_records, month_info = load_rent_months(lawdcd, missing)
+        for month in missing:
+            info = month_info[month]
+            # 방금 기록된 파티션(또는 갱신 실패로 대신 쓴 이전 파티션)은 저장된 통계를 그대로 사용
+            part = _open_partition(lawdcd, month)
+            if part is not None and (_partition_is_fresh(part, month) or info["source"] == "archive_stale"):
+                stats = part.stats()
+            else:
+                records = month_records[month]
+                stats = compute_rent_statistics(
+                    [r.deposit for r in records], [r.monthlyRent for r in records], [r.excluUseAr for r in records]
+                )
+            stats_by_month[month] = {"source": info["source"], "errors": info["errors"], **stats}
+
+    failed = [m for m in months if stats_by_month[m].get("errors")]
+    return {
+        "status": "ok" if not failed else ("partial" if len(failed) < len(months) else "error"),
+        "lawdcd": lawdcd,
+        "months": [{"deal_ymd": m, **stats_by_month[m]} for m in months],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+@mcp.tool()
+def getAllRentals(lawdcd: str, deal_ymd: str, housingTypes: Optional[List[str]] = None):
+    """
+    [전체 주택 유형 전월세 조회]
+    아파트/오피스텔/연립다세대/단독다가구 전월세를 동시에 조회해 하나의 레코드 목록으로 반환합니다.
+    각 레코드에는 housingType(apt/offi/rh/sh)과 housingLabel이 붙고, 계약일 순으로 정렬됩니다.
+    아파트가 적은 군 지역에서도 실제 임대 물량을 보여주기 위한 도구입니다.
+
+    - lawdcd: 법정동코드 5자리 (예: 44790)
+    - deal_ymd: 계약년월 YYYYMM
+    - housingTypes: 조회할 유형 목록 (생략 시 전체)
+    """
+    started = time.perf_counter()
+    try:
+        _month_range(deal_ymd, deal_ymd)
+        types = _resolve_housing_types(housingTypes)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    records_by_type, info_by_type = load_all_rentals(lawdcd, deal_ymd, types)
+    rows = [(r, t) for t in types for r in records_by_type[t]]
+    rows.sort(key=lambda row: row[0].dealDate)
+
+    failed = [t for t in types if info_by_type[t]["errors"]]
+    if not failed:
+        status = "ok"
+    else:
+        status = "partial" if len(failed) < len(types) or rows else "error"
+
+    return {
+        "status": status,
+        "lawdcd": lawdcd,
+        "deal_ymd": deal_ymd,
+        "count": len(rows),
+        "records": [_rental_dict(r, t) for r, t in rows],
+        "by_type": {
+            t: {"label": HOUSING_TYPES[t]["label"], "count": len(records_by_type[t]), **info_by_type[t]}
+            for t in types
+        },
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+@mcp.tool()
+def searchRentalsByBudget(
+    lawdcd: str,
+    deal_ymd: str,
+    maxDeposit: Optional[int] = None,
+    maxMonthlyRent: Optional[int] = None,
+    limit: int = 50,
+    housingTypes: Optional[List[str]] = None,
+):
+    """
+    [전월세 예산 검색]
+    보증금 ≤ maxDeposit, 월세 ≤ maxMonthlyRent (만원, 생략 시 제한 없음) 인 매물을
+    (유형, 지역, 월) 예산 인덱스에서 바로 찾아 보증금 오름차순으로 반환합니다.
+    pareto_front는 월세 수준별 최저 보증금 매물 목록입니다 (UI 예산 슬라이더용).
+
+    - lawdcd: 법정동코드 5자리 (예: 44790)
+    - deal_ymd: 계약년월 YYYYMM
+    - limit: 반환할 최대 매물 수 (count는 전체 일치 건수)
+    - housingTypes: 검색할 주택 유형 (apt/offi/rh/sh, 생략 시 아파트만)
+    """
+    started = time.perf_counter()
+    try:
+        _month_range(deal_ymd, deal_ymd)
+        types = _resolve_housing_types(housingTypes or ["apt"])
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    loaded = _for_each_housing_type(types, lambda t: get_budget_index(lawdcd, deal_ymd, t))
+    # 유형별 결과는 이미 보증금 순이므로 병합만 하면 됨
+    matched = list(heapq.merge(
+        *[[(r, t) for r in loaded[t][0].query(maxDeposit, maxMonthlyRent)] for t in types],
+        key=lambda row: (row[0].deposit, row[0].monthlyRent),
+    ))
+    if len(types) == 1:
+        front = [(r, types[0]) for r in loaded[types[0]][0].pareto_front]
+    else:
+        front = []
+        candidates = [(r, t) for t in types for r in loaded[t][0].pareto_front]
+        for r, t in sorted(candidates, key=lambda row: (row[0].monthlyRent, row[0].deposit)):
+            if not front or r.deposit < front[-1][0].deposit:
+                front.append((r, t))
+
+    total = sum(len(loaded[t][0].records) for t in types)
+    failed = [t for t in types if loaded[t][1]["errors"]]
+    if not failed:
+        status = "ok"
+    else:
+        status = "partial" if len(failed) < len(types) or total else "error"
+
+    return {
+        "status": status,
+        "lawdcd": lawdcd,
+        "deal_ymd": deal_ymd,
+        "totalCount": total,
+        "count": len(matched),
+        "records": [_rental_dict(r, t) for r, t in matched[:max(0, int(limit))]],
+        "pareto_front": [_rental_dict(r, t) for r, t in front],
+        "source": loaded[types[0]][1]["source"] if len(types) == 1 else {t: loaded[t][1]["source"] for t in types},
+        "errors": [f"{t}: {e}" for t in failed for e in loaded[t][1]["errors"]],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
 @mcp.tool()
 def ping():
     """헬스체크"""
-    return {"status": "ok", "message": "Realestate (APT RENT ONLY) Server Pong"}
+    return {"status": "ok", "message": "Realestate (APT/OFFI/RH/SH RENT) Server Pong"}
 
 
 def main():
     try:
         names = [t.name for t in mcp._tools]
-        print("[REALESTATE SERVER - APT RENT] tools:", names, flush=True)
+        print("[REALESTATE SERVER - RENT] tools:", names, flush=True)
     except Exception:
         pass
+    if os.getenv("MCP_TRANSPORT") == "streamable-http":
+        # 네트워크 서빙 — 월별 아카이브는 이미 디스크 공유라 워커 간 캐시 연결은 필요 없음
+        from src.mcp_http import serve_http
+        serve_http("realestate")
+        return
     mcp.run()
 
 
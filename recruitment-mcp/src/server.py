@@ -1,12 +1,22 @@
 # server.py — MCP 서버 (자동 TLS 폴백: default → TLS1.2+SECLEVEL1 → verify=False)
 import os
 import ssl
-from typing import Any, Dict, Optional, Tuple, Iterable
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple, Iterable, List
 
 import httpx
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 
+try:
+    from src import metrics
+    from src.tracing import span, wrap
+except ImportError:  # python src/server.py 처럼 단독 스크립트로 실행한 경우
+    import metrics
+    from tracing import span, wrap
+
 load_dotenv()
 
 mcp = FastMCP("recruitment-mcp")
@@ -14,6 +24,11 @@ mcp = FastMCP("recruitment-mcp")
 BASE_URL = (os.getenv("BASE_URL") or "https://apis.data.go.kr/1051000/recruitment").rstrip("/")
 API_KEY = (os.getenv("DATA_GO_KR_KEY") or "").strip()
 
+# 상세 조회 캐시/동시성 설정 (공고 상세는 자주 바뀌지 않으므로 TTL 캐시로 재사용)
+DETAIL_CACHE_TTL = float(os.getenv("DETAIL_CACHE_TTL") or 600)
+DETAIL_MAX_CONCURRENCY = int(os.getenv("DETAIL_MAX_CONCURRENCY") or 5)
+DETAIL_RATE_LIMIT = float(os.getenv("DETAIL_RATE_LIMIT") or 5)  # 초당 최대 요청 수
+
 def _client_candidates() -> Iterable[Tuple[str, httpx.Client]]:
     """
     TLS/SSL 환경에 따라 순차적으로 시도할 httpx.Client 후보들.
@@ -47,13 +62,18 @@ def _try_get(url: str, params: Dict[str, Any]):
     """
     last_err: Optional[Exception] = None
     for mode, client in _client_candidates():
-        try:
-            with client as c:
-                resp = c.get(url, params=params)
-                return mode, resp
-        except Exception as e:
-            last_err = e
-            continue
+        with span("http.attempt", tls_mode=mode, url=url) as sp:
+            try:
+                with client as c:
+                    resp = c.get(url, params=params)
+                    sp.set(status_code=resp.status_code)
+                    metrics.TLS_ATTEMPTS.inc(server="recruitment", mode=mode, outcome="ok")
+                    return mode, resp
+            except Exception as e:
+                sp.set_error(e)
+                metrics.TLS_ATTEMPTS.inc(server="recruitment", mode=mode, outcome="error")
+                last_err = e
+                continue
     # 전부 실패
     if last_err:
         raise last_err
@@ -83,10 +103,14 @@ def call_api(
     if filters:
         params.update(filters)
 
+    started = time.perf_counter()
     try:
         mode, resp = _try_get(url, params)
+        metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, api="recruitment")
         req_url = str(resp.request.url)
         status_code = resp.status_code
+        if status_code >= 400:
+            metrics.UPSTREAM_ERRORS.inc(api="recruitment", status=str(status_code))
         resp.raise_for_status()
         try:
             return {
@@ -105,6 +129,10 @@ def call_api(
                 "text": resp.text,
             }
     except Exception as e:
+        if not isinstance(e, httpx.HTTPStatusError):
+            # 모든 TLS 모드에서 연결 실패 (응답 자체를 받지 못함) — HTTP 상태 오류는 위에서 집계
+            metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, api="recruitment")
+            metrics.UPSTREAM_ERRORS.inc(api="recruitment", status="exception")
         return {
             "status": "error",
             "message": str(e),
@@ -112,6 +140,70 @@ def call_api(
         }
 
 
+class _RateLimiter:
+    """초당 요청 수를 제한하는 간단한 스레드 안전 리미터 (요청 간 최소 간격 보장)"""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.interval
+        delay = start_at - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_detail_cache: Dict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]] = {}
+_detail_cache_lock = threading.Lock()
+_detail_rate_limiter = _RateLimiter(DETAIL_RATE_LIMIT)
+# 멀티 워커 HTTP 서빙 시 워커 간 공유 캐시 (src/mcp_http.py가 attach_shared_cache로 연결, 없으면 프로세스 메모리만 사용)
+_shared_cache = None
+
+
+def attach_shared_cache(cache):
+    global _shared_cache
+    _shared_cache = cache
+
+
+def _detail_cache_get(key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+    with _detail_cache_lock:
+        entry = _detail_cache.get(key)
+        if entry:
+            expires_at, value = entry
+            if expires_at >= time.monotonic():
+                return value
+            _detail_cache.pop(key, None)
+    if _shared_cache is None:
+        return None
+    value = _shared_cache.get("recruitment.detail", "|".join(key))
+    if value is not None:
+        with _detail_cache_lock:
+            _detail_cache[key] = (time.monotonic() + DETAIL_CACHE_TTL, value)
+    return value
+
+
+def _detail_cache_put(key: Tuple[str, str, str], value: Dict[str, Any]):
+    with _detail_cache_lock:
+        _detail_cache[key] = (time.monotonic() + DETAIL_CACHE_TTL, value)
+    if _shared_cache is not None:
+        _shared_cache.put("recruitment.detail", "|".join(key), value, DETAIL_CACHE_TTL)
+
+
+def _fetch_detail(path: str, id_param: str, item_id: str, filters: Optional[Dict[str, Any]]):
+    """레이트 리밋을 지키며 상세 1건 조회. (결과, 지연시간 ms) 반환"""
+    _detail_rate_limiter.wait()
+    started = time.perf_counter()
+    result = call_api(path=path, filters={**(filters or {}), id_param: item_id})
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+
 @mcp.tool()
 def listRecruitments(
     path: str = "list",
@@ -134,11 +226,80 @@ def getRecruitmentDetail(path: str, **params):
     상세 조회(엔드포인트/파라미터를 그대로 전달)
     예: path="detail", recruitSn="..." 등
     """
+    # MCP 클라이언트는 추가 파라미터를 'params' 필드 하나에 담아 보냄
+    params = {**(params.pop("params", None) or {}), **params}
     page_no = int(params.pop("pageNo", 1)) if "pageNo" in params else 1
     num_rows = int(params.pop("numOfRows", 10)) if "numOfRows" in params else 10
     return call_api(path=path, page_no=page_no, num_rows=num_rows, filters=params)
 
 
+@mcp.tool()
+def getRecruitmentDetails(
+    ids: List[str],
+    path: str = "detail",
+    id_param: str = "recruitSn",
+    filters: Optional[Dict[str, Any]] = None,
+):
+    """
+    채용공고 상세 일괄 조회 (TTL 캐시 + 동시 요청)
+    - ids: 공고 식별자 목록 (예: recruitSn 값들)
+    - path: 기본 'detail'
+    - id_param: 식별자 파라미터명 (기본 'recruitSn')
+    - filters: 모든 요청에 공통으로 붙일 추가 파라미터
+    캐시에 있는 항목은 바로 반환하고, 나머지만 레이트 리밋 안에서 동시에 조회합니다.
+    각 항목에는 cache_hit / latency_ms 메타데이터가 포함됩니다.
+    """
+    started = time.perf_counter()
+    unique_ids = list(dict.fromkeys(str(i).strip() for i in (ids or []) if str(i).strip()))
+    if not unique_ids:
+        return {"status": "error", "message": "ids is empty"}
+
+    # filters가 있으면 같은 id라도 결과가 달라질 수 있으므로 캐시는 공통 파라미터가 없을 때만 사용
+    cacheable = not filters
+    items: Dict[str, Dict[str, Any]] = {}
+    misses: List[str] = []
+    for item_id in unique_ids:
+        cached = _detail_cache_get((path, id_param, item_id)) if cacheable else None
+        if cacheable:
+            metrics.CACHE_REQUESTS.inc(cache="recruitment_detail", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            items[item_id] = {"id": item_id, "cache_hit": True, "latency_ms": 0.0, "result": cached}
+        else:
+            misses.append(item_id)
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=max(1, min(DETAIL_MAX_CONCURRENCY, len(misses)))) as pool:
+            futures = {
+                item_id: pool.submit(wrap(_fetch_detail), path, id_param, item_id, filters)
+                for item_id in misses
+            }
+            for item_id, future in futures.items():
+                result, latency_ms = future.result()
+                if cacheable and result.get("status") == "ok":
+                    _detail_cache_put((path, id_param, item_id), result)
+                items[item_id] = {"id": item_id, "cache_hit": False, "latency_ms": latency_ms, "result": result}
+
+    ordered = [items[item_id] for item_id in unique_ids]
+    errors = sum(1 for item in ordered if item["result"].get("status") != "ok")
+    if errors == 0:
+        status = "ok"
+    elif errors < len(ordered):
+        status = "partial"
+    else:
+        status = "error"
+    return {
+        "status": status,
+        "items": ordered,
+        "summary": {
+            "requested": len(unique_ids),
+            "cache_hits": len(unique_ids) - len(misses),
+            "fetched": len(misses),
+            "errors": errors,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+
+
 @mcp.tool()
 def ping():
     """헬스체크"""
@@ -152,6 +313,11 @@ def main():
         print("[SERVER] tools:", names, flush=True)
     except Exception:
         pass
+    if os.getenv("MCP_TRANSPORT") == "streamable-http":
+        # 네트워크 서빙 (워커 수/공유 캐시/정상 종료): python -m src.server 로 실행
+        from src.mcp_http import serve_http
+        serve_http("recruitment")
+        return
     mcp.run()
 
 
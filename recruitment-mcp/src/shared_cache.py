@@ -0,0 +1,167 @@
+# shared_cache.py — 여러 워커 프로세스가 함께 쓰는 SQLite TTL 캐시 + 리스(lease)
+#
+# streamable-HTTP 서빙(src/mcp_http.py)에서 워커를 여러 개 띄우면 프로세스마다 메모리 캐시가 따로 생깁니다.
+# 같은 머신의 워커들은 이 파일 하나(WAL 모드)를 공유해
+#   - get/put: 상세 조회처럼 비싼 업스트림 응답을 TTL 동안 함께 재사용하고
+#   - acquire_lease/release_lease: 정책 미러 갱신처럼 한 워커만 해야 하는 작업의 담당자를 정합니다.
+# 값은 JSON으로 저장하므로 JSON으로 직렬화 가능한 값만 넣을 수 있습니다.
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from . import metrics
+
+SHARED_CACHE_PATH = os.getenv("MCP_SHARED_CACHE_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".mcp_cache", "shared.sqlite3"
+)
+SHARED_CACHE_BUSY_TIMEOUT = float(os.getenv("MCP_SHARED_CACHE_BUSY_TIMEOUT") or 5)  # 잠금 대기(초)
+SHARED_CACHE_PURGE_EVERY = 500  # put 이 횟수마다 만료 항목 정리
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SharedTTLCache:
+    """프로세스 간 공유 TTL 캐시 — 스레드마다 연결을 따로 씀 (만료 시각은 벽시계 time.time() 기준)"""
+
+    def __init__(self, path: str = SHARED_CACHE_PATH):
+        self.path = path
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = {"hits": 0, "misses": 0, "puts": 0, "errors": 0}
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=SHARED_CACHE_BUSY_TIMEOUT, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    # --- TTL 캐시 ---
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            # 공유 캐시 장애는 캐시 미스로 취급 (요청은 업스트림으로 계속 진행)
+            self._count("errors")
+            print(f"⚠️ [SHARED-CACHE] 조회 실패: {e}")
+            return None
+        if row is None:
+            self._count("misses")
+            metrics.CACHE_REQUESTS.inc(cache=f"shared:{namespace}", result="miss")
+            return None
+        self._count("hits")
+        metrics.CACHE_REQUESTS.inc(cache=f"shared:{namespace}", result="hit")
+        return json.loads(row[0])
+
+    def put(self, namespace: str, key: str, value: Any, ttl: float):
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, payload, time.time() + ttl),
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self._count("errors")
+            print(f"⚠️ [SHARED-CACHE] 저장 실패: {e}")
+            return
+        self._count("puts")
+        if self.stats["puts"] % SHARED_CACHE_PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        try:
+            with self._connect() as conn:
+                return conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        except sqlite3.Error as e:
+            print(f"⚠️ [SHARED-CACHE] 만료 항목 정리 실패: {e}")
+            return 0
+
+    # --- 리스 (한 워커만 하는 작업) ---
+    def acquire_lease(self, name: str, ttl: float) -> bool:
+        """비어 있거나 만료됐거나 이미 내 것이면 ttl초 동안 차지 (내 것이면 연장)"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+                if row is not None and row[0] != self.owner and row[1] > now:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)",
+                    (name, self.owner, now + ttl),
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print(f"⚠️ [SHARED-CACHE] 리스 획득 실패 ({name}): {e}")
+            return False
+
+    def release_lease(self, name: str):
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner))
+        except sqlite3.Error as e:
+            print(f"⚠️ [SHARED-CACHE] 리스 반납 실패 ({name}): {e}")
+
+    def release_all(self):
+        """종료 시 이 프로세스가 가진 리스를 모두 반납 (다른 워커가 바로 이어받도록)"""
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM leases WHERE owner = ?", (self.owner,))
+        except sqlite3.Error as e:
+            print(f"⚠️ [SHARED-CACHE] 리스 반납 실패: {e}")
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        return {**stats, "path": self.path, "hit_rate": round(stats["hits"] / lookups, 3) if lookups else None}
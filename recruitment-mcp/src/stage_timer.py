@@ -0,0 +1,70 @@
+# stage_timer.py — 핸들러 단계별 소요 시간 측정 (Server-Timing 헤더 / 디버그 응답 / 메트릭 / span을 한 번에)
+#
+#   timer = StageTimer("region_detail")
+#   with timer.stage("fetch"):
+#       ...
+#   response.headers["Server-Timing"] = timer.server_timing()   # 브라우저 개발자 도구 Network → Timing 탭
+#   if debug:
+#       body = timer.attach(body)                                # 응답 JSON에 "timing" 추가
+# 같은 이름의 단계를 여러 번 열면 시간이 합산됩니다 (예: 일자리/정책 점수 계산을 모두 "score"로).
+# 각 단계는 ieum_stage_seconds 히스토그램(src/metrics.py)에 기록되고, 추적이 켜져 있으면 stage.<이름> span이 됩니다.
+# FastAPI에 의존하지 않으므로 web_api_handler/오케스트레이터 등 어느 핸들러에서도 쓸 수 있습니다.
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from . import metrics
+from .tracing import span
+
+_TOKEN = re.compile(r"[^A-Za-z0-9_.-]")  # Server-Timing 메트릭 이름은 HTTP token 문자만 허용
+
+
+class StageTimer:
+    """요청 1건의 단계별 소요 시간 (단계 순서는 처음 연 순서)"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.stages: "OrderedDict[str, float]" = OrderedDict()  # 단계 → 누적 초
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, **attributes) -> Iterator[Any]:
+        """블록 실행 시간을 name 단계에 더함 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            with span(f"stage.{name}", endpoint=self.endpoint, **attributes) as sp:
+                yield sp
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        """다른 곳에서 잰 시간을 단계로 추가"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        metrics.STAGE_SECONDS.observe(seconds, endpoint=self.endpoint, stage=name)
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 — 'fetch;dur=812.4, encode;dur=95.1, ..., total;dur=1203.7'"""
+        entries = [f"{_TOKEN.sub('_', name)};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.total_ms():.1f}")
+        return ", ".join(entries)
+
+    def breakdown(self) -> Dict[str, Any]:
+        stages = {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+        total = round(self.total_ms(), 1)
+        return {
+            "endpoint": self.endpoint,
+            "total_ms": total,
+            "stages_ms": stages,
+            "untracked_ms": round(max(0.0, total - sum(stages.values())), 1),  # 단계로 감싸지 않은 구간
+        }
+
+    def attach(self, body: Any, key: str = "timing", list_key: str = "items") -> Dict[str, Any]:
+        """응답 본문에 단계별 시간을 붙임 (리스트 응답은 {list_key: 리스트, key: ...}로 감쌈)"""
+        if isinstance(body, dict):
+            return {**body, key: self.breakdown()}
+        return {list_key: body, key: self.breakdown()}
@@ -0,0 +1,284 @@
+# tool_registry.py — 오케스트레이터 도구 레지스트리 (도구별 캐시/제한 시간/동시성/재시도 정책)
+#
+# 도구마다 ToolSpec 한 줄로 정책을 선언하면 ToolRegistry가 모든 호출에 똑같이 적용합니다.
+#   - cache_ttl / cache_key: 같은 인자의 성공 결과를 TTL 동안 재사용 (cache_key가 None을 돌려주면 캐시 안 함)
+#   - timeout: 호출 1건의 제한 시간 (초과 시 오류 응답, 실행 중인 스레드는 끝까지 돌고 버려짐)
+#   - max_concurrency: 같은 도구의 동시 실행 수 제한 (업스트림 API 보호)
+#   - retries / retry_backoff: 예외 또는 업스트림 오류 응답 시 재시도
+# 도구별 호출 수, 캐시 적중률, 지연시간(p50/p95)은 stats()로 확인합니다.
+import asyncio
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import metrics
+from .tracing import is_enabled as tracing_enabled, span, wrap
+
+# ⏱️ 도구 호출 1건당 기본 제한 시간 (초)
+TOOL_TIMEOUT = float(os.getenv("ORCHESTRATOR_TOOL_TIMEOUT", "20"))
+# 동기 도구를 실행할 전용 스레드 풀 — 기본 executor를 쓰면 asyncio.run()이 종료 시
+# 시간 초과된 호출이 끝날 때까지 기다리므로 분리
+# ⚠️ 시간 초과는 응답만 먼저 돌려줄 뿐 실행 중인 _invoke를 멈추지 못합니다. 끝날 때까지 이 풀의 스레드 1개와
+#    (max_concurrency가 있으면) 그 도구의 동시성 슬롯 1개를 계속 잡고 있으므로, 업스트림이 멈추면 같은 도구의
+#    다음 호출은 슬롯을 기다리다 시간 초과되고 풀도 줄어듭니다. 워커 수는 "정상 동시 호출 수 +
+#    제한 시간 동안 쌓일 수 있는 시간 초과 호출 수" 기준으로 잡습니다 (업스트림 HTTP 클라이언트 제한 시간이 상한).
+TOOL_WORKERS = int(os.getenv("ORCHESTRATOR_TOOL_WORKERS", "16"))
+TOOL_CACHE_SIZE = int(os.getenv("ORCHESTRATOR_TOOL_CACHE_SIZE", "1024"))
+TOOL_LATENCY_WINDOW = 512  # 백분위수 계산에 쓰는 최근 호출 수
+
+_tool_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="orchestrator-tool")
+
+
+def default_cache_key(arguments: Dict[str, Any]) -> Optional[str]:
+    return json.dumps(arguments, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def is_error_result(result: Any) -> bool:
+    """도구는 실행됐지만 업스트림 API가 실패한 응답 ({"status": "error", ...})"""
+    return isinstance(result, dict) and result.get("status") == "error"
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """도구 1개의 호출 정책"""
+    server: str
+    name: str
+    description: str = ""
+    cache_ttl: float = 0                      # 0이면 캐시하지 않음
+    cache_key: Callable[[Dict[str, Any]], Optional[str]] = default_cache_key
+    timeout: Optional[float] = None           # None이면 TOOL_TIMEOUT
+    max_concurrency: int = 0                  # 0이면 제한 없음
+    retries: int = 0
+    retry_backoff: float = 0.5                # n번째 재시도 전 retry_backoff * n초 대기
+    # 도구 함수에 넘기기 전 인자 변환 (기본값 채우기 등)
+    adapt_arguments: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+class ToolStats:
+    """도구별 호출 통계 — 적중/오류/시간 초과 수와 최근 지연시간"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=TOOL_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float, outcome: str):
+        with self._lock:
+            self.calls += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self._recent.append(elapsed_ms)
+            if outcome == "hit":
+                self.cache_hits += 1
+            elif outcome == "timeout":
+                self.timeouts += 1
+            elif outcome == "error":
+                self.errors += 1
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            calls = self.calls
+
+            def pct(p):
+                return round(recent[min(len(recent) - 1, int(len(recent) * p / 100))], 1) if recent else None
+
+            return {
+                "calls": calls,
+                "cache_hits": self.cache_hits,
+                "hit_rate": round(self.cache_hits / calls, 3) if calls else None,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "retries": self.retries,
+                "avg_ms": round(self.total_ms / calls, 1) if calls else None,
+                "p50_ms": pct(50),
+                "p95_ms": pct(95),
+                "max_ms": round(self.max_ms, 1),
+            }
+
+
+class ToolRegistry:
+    """
+    (서버, 도구명) → ToolSpec. 도구 함수는 호출 시점에 서버 모듈에서 이름으로 찾습니다.
+    call()/acall()은 기존 오케스트레이터와 같은 응답 봉투를 돌려줍니다:
+      {"status": "success", "server", "tool", "result"} / {"status": "error", "server", "tool", "message"}
+    """
+
+    def __init__(self, servers: Dict[str, Any]):
+        self.servers = servers
+        self.specs: Dict[Tuple[str, str], ToolSpec] = {}
+        self._stats: Dict[Tuple[str, str], ToolStats] = {}
+        self._slots: Dict[Tuple[str, str], threading.BoundedSemaphore] = {}
+        self._cache: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def register(self, spec: ToolSpec):
+        key = (spec.server, spec.name)
+        self.specs[key] = spec
+        self._stats[key] = ToolStats()
+        if spec.max_concurrency > 0:
+            self._slots[key] = threading.BoundedSemaphore(spec.max_concurrency)
+
+    def tools(self) -> Dict[str, List[Dict[str, str]]]:
+        """서버별 도구 목록 (등록 순서)"""
+        listing: Dict[str, List[Dict[str, str]]] = {}
+        for spec in self.specs.values():
+            listing.setdefault(spec.server, []).append({'name': spec.name, 'description': spec.description})
+        return listing
+
+    # --- 캐시 ---
+    def _cache_get(self, key) -> Tuple[bool, Any]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return False, None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._cache[key]
+                return False, None
+            self._cache.move_to_end(key)
+        # 호출자가 결과를 고쳐 쓰는 경우가 있으므로 (표시용 필드 추가 등) 사본을 돌려줌
+        return True, copy.deepcopy(result)
+
+    def _cache_put(self, key, result: Any, ttl: float):
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+            self._cache.move_to_end(key)
+            while len(self._cache) > TOOL_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    # --- 실행 ---
+    def _envelope(self, server: str, tool_name: str, **fields) -> Dict[str, Any]:
+        status = fields.pop("status", "success")
+        return {"status": status, "server": server, "tool": tool_name, **fields}
+
+    def _invoke(self, spec: ToolSpec, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """캐시 확인 → 동시성 슬롯 → 재시도 정책으로 도구 실행 (스레드 풀에서 실행)"""
+        key = (spec.server, spec.name)
+        cache_key = None
+        if spec.cache_ttl > 0:
+            arg_key = spec.cache_key(arguments)
+            if arg_key is not None:
+                cache_key = (spec.server, spec.name, arg_key)
+                hit, result = self._cache_get(cache_key)
+                metrics.CACHE_REQUESTS.inc(cache="tool_registry", result="hit" if hit else "miss")
+                if hit:
+                    return self._envelope(spec.server, spec.name, result=result, cached=True)
+
+        func = getattr(self.servers[spec.server], spec.name)
+        call_args = spec.adapt_arguments(dict(arguments)) if spec.adapt_arguments else arguments
+        slot = self._slots.get(key)
+        if slot is not None:
+            slot.acquire()
+        try:
+            for attempt in range(spec.retries + 1):
+                if attempt:
+                    self._stats[key].add_retry()
+                    time.sleep(spec.retry_backoff * attempt)
+                try:
+                    result = func(**call_args)
+                except Exception as e:
+                    if attempt < spec.retries:
+                        continue
+                    return self._envelope(spec.server, spec.name, status="error", message=str(e))
+                if is_error_result(result) and attempt < spec.retries:
+                    continue
+                break
+        finally:
+            if slot is not None:
+                slot.release()
+
+        if cache_key is not None and not is_error_result(result):
+            self._cache_put(cache_key, result, spec.cache_ttl)
+        return self._envelope(spec.server, spec.name, result=result)
+
+    def _finish(self, spec: ToolSpec, started: float, response: Dict[str, Any], sp) -> Dict[str, Any]:
+        if response.get("cached"):
+            outcome = "hit"
+        elif response.get("timed_out"):
+            outcome = "timeout"
+        elif response["status"] != "success" or is_error_result(response.get("result")):
+            outcome = "error"
+        else:
+            outcome = "ok"
+        elapsed = time.perf_counter() - started
+        self._stats[(spec.server, spec.name)].record(elapsed * 1000, outcome)
+        metrics.TOOL_SECONDS.observe(elapsed, server=spec.server, tool=spec.name, outcome=outcome)
+        sp.set(outcome=outcome)
+        if outcome in ("timeout", "error"):
+            sp.set_error(response.get("message") or (response.get("result") or {}).get("message") or outcome)
+        return response
+
+    def _timeout_response(self, spec: ToolSpec, timeout: float) -> Dict[str, Any]:
+        return self._envelope(spec.server, spec.name, status="error",
+                              message=f"시간 초과 ({timeout:g}초)", timed_out=True)
+
+    @staticmethod
+    def _span_arguments(arguments: Optional[Dict[str, Any]]) -> Optional[str]:
+        """span 속성용 인자 직렬화 — 프롬프트/자격요건 dict까지 직렬화하므로 추적이 꺼져 있으면 건너뜀"""
+        return default_cache_key(arguments or {}) if tracing_enabled() else None
+
+    def _lookup(self, server: str, tool_name: str) -> Optional[ToolSpec]:
+        return self.specs.get((server, tool_name))
+
+    def call(self, server: str, tool_name: str, arguments: Dict[str, Any],
+             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """동기 호출 — 스레드 풀에서 실행하고 제한 시간까지 기다림"""
+        spec = self._lookup(server, tool_name)
+        if spec is None:
+            return self._envelope(server, tool_name, status="error", message=f"알 수 없는 도구: {tool_name}")
+        timeout = timeout if timeout is not None else (spec.timeout or TOOL_TIMEOUT)
+        started = time.perf_counter()
+        with span(f"tool.{server}.{tool_name}", timeout=timeout, arguments=self._span_arguments(arguments)) as sp:
+            future = _tool_pool.submit(wrap(self._invoke), spec, arguments or {})
+            try:
+                response = future.result(timeout=timeout)
+            except FuturesTimeout:
+                response = self._timeout_response(spec, timeout)
+            return self._finish(spec, started, response, sp)
+
+    async def acall(self, server: str, tool_name: str, arguments: Dict[str, Any],
+                    timeout: Optional[float] = None) -> Dict[str, Any]:
+        """비동기 호출 — 이벤트 루프를 막지 않고 스레드 풀에서 실행"""
+        spec = self._lookup(server, tool_name)
+        if spec is None:
+            return self._envelope(server, tool_name, status="error", message=f"알 수 없는 도구: {tool_name}")
+        timeout = timeout if timeout is not None else (spec.timeout or TOOL_TIMEOUT)
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        with span(f"tool.{server}.{tool_name}", timeout=timeout, arguments=self._span_arguments(arguments)) as sp:
+            try:
+                response = await asyncio.wait_for(
+                    loop.run_in_executor(_tool_pool, wrap(self._invoke), spec, arguments or {}), timeout
+                )
+            except asyncio.TimeoutError:
+                response = self._timeout_response(spec, timeout)
+            return self._finish(spec, started, response, sp)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """도구별 통계 {"server.tool": {...}} (호출된 도구만)"""
+        return {
+            f"{server}.{name}": stats.snapshot()
+            for (server, name), stats in self._stats.items()
+            if stats.calls
+        }
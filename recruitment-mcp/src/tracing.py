@@ -0,0 +1,307 @@
+# tracing.py — 요청 단위 span 추적 (외부 수집기 없이 JSON-lines 파일로 내보내고 터미널 워터폴로 확인)
+#
+# 핸들러 → 오케스트레이터/플래너 → 도구 호출 → HTTP 시도(TLS 모드별) → LLM 호출이 부모-자식 span으로 이어집니다.
+#   with span("policy.region_filter", before=len(policies)) as sp:
+#       ...
+#       sp.set(after=len(filtered))
+# 현재 span은 contextvars로 전달되므로 asyncio.gather의 태스크에는 자동으로 이어지고,
+# 스레드 풀/다른 이벤트 루프로 넘길 때만 wrap()/propagate()로 감싸면 됩니다.
+# TRACE_ENABLED=1일 때만 기록하며(기본 꺼짐, 꺼져 있으면 span()은 아무것도 하지 않음) 끝난 span은
+# TRACE_EXPORT_PATH에 한 줄씩 추가됩니다.
+#
+# 보기:
+#   recruitment-mcp> python -m src.tracing list              # 최근 trace 목록 (소요 시간, span 수, 오류 수)
+#   recruitment-mcp> python -m src.tracing show last         # 마지막 trace 워터폴 (trace_id / slowest도 가능)
+import argparse
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "0").lower() in ("1", "true", "yes")
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".traces", "spans.jsonl"
+)
+TRACE_ATTR_MAX_LEN = 200  # 속성 문자열 최대 길이 (질문 원문 등이 길게 들어가지 않도록)
+
+
+class Span:
+    """진행 중이거나 끝난 span 1개"""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes",
+                 "start_time", "duration_ms", "status", "error", "_started")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(8)
+        self.span_id = secrets.token_hex(4)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes: Dict[str, Any] = {}
+        self.start_time = time.time()
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+        self.set(**attributes)
+
+    def set(self, **attributes):
+        for key, value in attributes.items():
+            if value is None or isinstance(value, (bool, int, float)):
+                self.attributes[key] = value
+            else:
+                self.attributes[key] = str(value)[:TRACE_ATTR_MAX_LEN]
+
+    def set_error(self, error: Any):
+        self.status = "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+        self.error = (f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error))[:TRACE_ATTR_MAX_LEN]
+
+    def end(self):
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "start": self.start_time, "duration_ms": self.duration_ms,
+            "status": self.status, "error": self.error, "attributes": self.attributes,
+            "pid": os.getpid(), "thread": threading.current_thread().name,
+        }
+
+
+class _NoopSpan:
+    """추적이 꺼져 있을 때 돌려주는 span (속성 설정은 무시)"""
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+    def set_error(self, error: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class JsonlExporter:
+    """끝난 span을 JSON 한 줄씩 파일에 추가 (워커 여러 개가 같은 파일에 써도 줄 단위로 섞임)"""
+
+    def __init__(self, path: str = TRACE_EXPORT_PATH):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(line)
+                self._file.flush()
+            except OSError as e:
+                print(f"⚠️ [TRACE] span 기록 실패: {e}", file=sys.stderr)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_exporter: Optional[Any] = None
+
+
+def set_exporter(exporter: Any):
+    """export(record) 메서드가 있는 객체로 교체 (테스트/다른 저장소용)"""
+    global _exporter
+    _exporter = exporter
+
+
+def _export(sp: Span):
+    global _exporter
+    if _exporter is None:
+        _exporter = JsonlExporter()
+    _exporter.export(sp.to_dict())
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def is_enabled() -> bool:
+    """span()이 실제로 기록하는지 — 속성 값 계산이 비쌀 때 미리 확인"""
+    return TRACE_ENABLED
+
+
+def current_trace_id() -> Optional[str]:
+    sp = _current.get()
+    return sp.trace_id if sp else None
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """현재 span의 자식 span (현재 span이 없으면 새 trace의 루트)"""
+    if not TRACE_ENABLED:
+        yield NOOP_SPAN
+        return
+    sp = Span(name, _current.get(), attributes)
+    token = _current.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.set_error(e)
+        raise
+    finally:
+        sp.end()
+        _current.reset(token)
+        _export(sp)
+
+
+def traced(name: Optional[str] = None, **attributes):
+    """함수 전체를 span 하나로 감싸는 데코레이터 (동기/비동기 모두)"""
+    def decorator(func: Callable):
+        span_name = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def wrap(func: Callable) -> Callable:
+    """스레드 풀에 넘길 함수 — 현재 span을 실행 스레드로 가져감 (submit 1건마다 새로 감쌀 것)"""
+    if not TRACE_ENABLED:
+        return func
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, func)
+
+
+def propagate(coro):
+    """다른 스레드의 이벤트 루프(run_coroutine_threadsafe)로 넘길 코루틴 — 현재 span을 부모로 이어줌"""
+    parent = _current.get()
+    if not TRACE_ENABLED or parent is None:
+        return coro
+
+    async def run_with_parent():
+        token = _current.set(parent)
+        try:
+            return await coro
+        finally:
+            _current.reset(token)
+
+    return run_with_parent()
+
+
+# --- 워터폴 보기 ---
+def load_traces(path: str = TRACE_EXPORT_PATH) -> "OrderedDict[str, List[Dict[str, Any]]]":
+    """trace_id → span 목록 (파일에 처음 나타난 순서, 아직 기록이 없으면 빈 dict)"""
+    traces: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+    if not os.path.exists(path):
+        return traces
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 기록 도중 끊긴 줄
+            traces.setdefault(record["trace_id"], []).append(record)
+    return traces
+
+
+def _trace_bounds(spans: List[Dict[str, Any]]):
+    start = min(s["start"] for s in spans)
+    end = max(s["start"] + (s["duration_ms"] or 0) / 1000 for s in spans)
+    return start, (end - start) * 1000
+
+
+def _roots(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    ids = {s["span_id"] for s in spans}
+    return [s for s in spans if s["parent_id"] not in ids]
+
+
+def render_waterfall(spans: List[Dict[str, Any]], width: int = 48) -> str:
+    """부모-자식 순서로 한 줄에 span 하나: 시작 오프셋, 소요 시간, 이름, 막대, 주요 속성"""
+    start, total_ms = _trace_bounds(spans)
+    total_ms = total_ms or 1.0
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for s in spans:
+        children.setdefault(s["parent_id"], []).append(s)
+    for group in children.values():
+        group.sort(key=lambda s: s["start"])
+
+    lines = [f"trace {spans[0]['trace_id']} — {total_ms:.1f}ms, span {len(spans)}개"]
+
+    def walk(s, depth):
+        offset = (s["start"] - start) * 1000
+        duration = s["duration_ms"] or 0
+        col = min(width - 1, int(offset / total_ms * width))
+        bar_len = max(1, min(width - col, round(duration / total_ms * width)))
+        bar = " " * col + "█" * bar_len + " " * (width - col - bar_len)
+        mark = "" if s["status"] == "ok" else f" ❌ {s['status']}: {s['error']}"
+        attrs = " ".join(f"{k}={v}" for k, v in s["attributes"].items())
+        label = ("  " * depth + s["name"])[:44]
+        lines.append(f"{offset:>9.1f} {duration:>9.1f}ms  {label:<44} |{bar}| {attrs}{mark}")
+        for child in children.get(s["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in sorted(_roots(spans), key=lambda s: s["start"]):
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="span 기록(JSON-lines) 보기")
+    parser.add_argument("--path", default=TRACE_EXPORT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    list_parser = sub.add_parser("list")
+    list_parser.add_argument("--limit", type=int, default=20)
+    show_parser = sub.add_parser("show")
+    show_parser.add_argument("trace", help="trace_id, last, slowest")
+    show_parser.add_argument("--width", type=int, default=48)
+    args = parser.parse_args()
+
+    traces = load_traces(args.path)
+    if not traces:
+        print("기록된 trace가 없습니다")
+        return
+    if args.command == "list":
+        print(f"{'trace_id':<16} {'ms':>9} {'spans':>5} {'errors':>6}  root")
+        for trace_id, spans in list(traces.items())[-args.limit:]:
+            _, total_ms = _trace_bounds(spans)
+            errors = sum(1 for s in spans if s["status"] != "ok")
+            root = ", ".join(s["name"] for s in _roots(spans))
+            print(f"{trace_id:<16} {total_ms:>9.1f} {len(spans):>5} {errors:>6}  {root}")
+        return
+
+    if args.trace == "last":
+        spans = next(reversed(traces.values()))
+    elif args.trace == "slowest":
+        spans = max(traces.values(), key=lambda group: _trace_bounds(group)[1])
+    elif args.trace in traces:
+        spans = traces[args.trace]
+    else:
+        print(f"trace를 찾을 수 없습니다: {args.trace}")
+        return
+    print(render_waterfall(spans, args.width))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,23 @@
 # src/web_api_handler.py - 수정된 버전
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import asyncio
+import os
 
 # 상대 import 방식으로 변경
 from .enhanced_orchestrator import EnhancedOrchestrator
 from .final_chatbot import PerfectChatbot
+from .query_planner import QueryPlanner
+from .tracing import traced
 
 import re
 
+# 신청 마감이 이 일수 이내로 남은 정책을 '마감 임박'으로 표시
+URGENT_POLICY_DAYS = 14
+# 부동산 페이지의 6개월 가격 분석 대기 시간(초) — 아카이브가 비어 있으면 전 페이지 수집이 필요해
+# 이 시간 안에 못 받으면 '데이터 부족'으로 응답하고, 수집은 백그라운드에서 끝나 다음 요청부터 아카이브에서 읽음
+PRICE_ANALYSIS_TIMEOUT = float(os.getenv("PRICE_ANALYSIS_TIMEOUT") or 3)
+
 class WebAPIHandler:
     def __init__(self):
         self.orchestrator = EnhancedOrchestrator()
@@ -68,6 +78,19 @@ class WebAPIHandler:
         - 자차 보유: {'있음' if profile.car == 'yes' else '없음'}
         """
 
+    def _profile_to_eligibility(self, profile) -> Optional[Dict[str, Any]]:
+        """프로필 → 정책 자격요건 사전 필터 조건 (나이 + 프로필에 있으면 소득/취업상태/혼인)"""
+        if not profile:
+            return None
+        eligibility = {
+            "age": getattr(profile, "age", None),
+            "income": getattr(profile, "income", None),
+            "employment": getattr(profile, "employment", None),
+            "marital": getattr(profile, "marital", None),
+        }
+        eligibility = {k: v for k, v in eligibility.items() if v not in (None, "")}
+        return eligibility or None
+
     def format_education_requirement(self, code_str):
         """학력 코드를 한글로 변환 - 개선된 로직"""
         if not code_str:
@@ -202,8 +225,10 @@ class WebAPIHandler:
         else:
             return "기타"
     
-    async def search_comprehensive(self, query: str, region_code: str = "44790", max_price: Optional[int] = None, user_profile: Any = None) -> Dict[str, Any]:
-        """요약 페이지용 - 전체 데이터 통합"""
+    @traced("handler.search_comprehensive")
+    async def search_comprehensive(self, query: str, region_code: str = "44790", max_price: Optional[int] = None, user_profile: Any = None,
+                                   planner: Optional[QueryPlanner] = None) -> Dict[str, Any]:
+        """요약 페이지용 - 전체 데이터 통합 (planner: 같은 요청의 다른 페이지와 공유할 호출 계획)"""
         try:
             # 자연어 의도 분석
             intent = self.chatbot.analyze_user_intent(query)
@@ -231,7 +256,7 @@ class WebAPIHandler:
             intent["search_policies"] = True
             
             # 각 영역별 데이터 수집
-            raw_data = await self._get_raw_data(intent)
+            raw_data = await self._get_raw_data(intent, planner)
             
             # 요약 정보 생성
             summary = self._generate_summary(raw_data, region_code)
@@ -257,12 +282,32 @@ class WebAPIHandler:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    async def search_jobs_only(self, region_code: str, filters: Dict = None, user_profile: Any = None) -> Dict[str, Any]:
+    @traced("handler.search_region_pages")
+    async def search_region_pages(self, query: str, region_code: str = "44790", filters: Dict = None,
+                                  deal_ymd: str = "202506", max_price: Optional[int] = None,
+                                  user_profile: Any = None) -> Dict[str, Any]:
+        """
+        지역 화면 전체(요약/일자리/부동산/정책 페이지)를 한 요청으로 — 페이지 핸들러들이 플래너 하나를 공유하므로
+        같은 엔드포인트 호출(요약과 일자리 페이지의 채용 목록 등)은 한 번만 실행하고 페이지마다 잘라서 나눠 줌
+        """
+        planner = QueryPlanner(self.orchestrator)
+        summary, jobs, realestate, policies = await asyncio.gather(
+            self.search_comprehensive(query, region_code, max_price, user_profile, planner=planner),
+            self.search_jobs_only(region_code, filters, user_profile, planner=planner),
+            self.search_realestate_only(region_code, deal_ymd, max_price, user_profile, planner=planner),
+            self.search_policies_only(region_code, user_query=query, user_profile=user_profile, planner=planner),
+        )
+        return {"summary": summary, "jobs": jobs, "realestate": realestate, "policies": policies}
+
+    @traced("handler.search_jobs_only")
+    async def search_jobs_only(self, region_code: str, filters: Dict = None, user_profile: Any = None,
+                               planner: Optional[QueryPlanner] = None) -> Dict[str, Any]:
         """일자리 페이지용 - final_chatbot.py와 동일한 로직 사용"""
         try:
             # 🎯 final_chatbot.py와 정확히 같은 방식으로 채용정보 검색
-            job_result = self.orchestrator.call_recruitment_tool(
-                'listRecruitments',
+            planner = planner or QueryPlanner(self.orchestrator)
+            job_result = await planner.call(
+                'recruitment', 'listRecruitments',
                 {
                     'pageNo': 1,
                     'numOfRows': 50,  # final_chatbot.py와 동일
@@ -474,7 +519,9 @@ class WebAPIHandler:
             print(f"⚠️ 금액 파싱 중 에러 발생('{value_str}'): {e}")
             return 9999999999
 
-    async def search_realestate_only(self, region_code: str, deal_ymd: str = "202506", max_price: Optional[int] = None, user_profile: Any = None) -> Dict[str, Any]:
+    @traced("handler.search_realestate_only")
+    async def search_realestate_only(self, region_code: str, deal_ymd: str = "202506", max_price: Optional[int] = None, user_profile: Any = None,
+                                     planner: Optional[QueryPlanner] = None) -> Dict[str, Any]:
         """부동산 페이지용 - 아파트 전월세 실거래가 조회"""
         try:
             print(f"🏠 [DEBUG] Realestate API 호출: {region_code} (전월세)")
@@ -485,83 +532,54 @@ class WebAPIHandler:
             else:
                 print("👤 [DEBUG] 프로필 정보가 없습니다 (None)")
 
-            # API 호출
-            apt_result = self.orchestrator.call_realestate_tool(
-                'getApartmentTrades',
+            # ---------------------------------------------------------
+            # 🚀 전월세 예산 필터링 — (지역, 월) 예산 인덱스에서 바로 조회
+            # ---------------------------------------------------------
+            user_deposit_limit = None
+            user_rent_limit = None
+
+            if user_profile:
+                if user_profile.budget:
+                    user_deposit_limit = self._parse_korean_money_to_int(user_profile.budget)
+                if user_profile.rent_budget:
+                    user_rent_limit = self._parse_korean_money_to_int(user_profile.rent_budget)
+
+            print(f"💰 [DEBUG] 최종 필터 기준: 보증금 {user_deposit_limit}만원, 월세 {user_rent_limit}만원")
+
+            planner = planner or QueryPlanner(self.orchestrator)
+            apt_result = await planner.call(
+                'realestate', 'searchRentalsByBudget',
                 {
                     'lawdcd': region_code,
                     'deal_ymd': deal_ymd,
-                    'pageNo': 1,
-                    'numOfRows': 50
+                    'maxDeposit': user_deposit_limit,
+                    'maxMonthlyRent': user_rent_limit,
+                    'limit': 50,
+                    # 아파트가 적은 군 지역도 오피스텔/연립/단독 매물까지 함께 검색
+                    'housingTypes': list(self.orchestrator.realestate_server.HOUSING_TYPES)
                 }
             )
-            
+
             properties = []
+            budget_frontier = []
+            matched_count = 0
             if apt_result["status"] == "success":
                 server_response = apt_result.get("result", {})
-                xml_text = server_response.get("text", "")
-                raw_data = server_response.get("data", {})
+                properties = server_response.get("records", [])
+                budget_frontier = server_response.get("pareto_front", [])
+                matched_count = server_response.get("count", len(properties))
+
+                for prop in properties + budget_frontier:
+                    prop_deposit = prop['deposit']
+                    prop_rent = prop['monthlyRent']
+                    if prop_rent == 0:
+                        prop['dealAmount'] = f"전세 {prop_deposit:,}만원"
+                    elif prop_deposit == 0:
+                        prop['dealAmount'] = f"월세 {prop_rent:,}만원"
+                    else:
+                        prop['dealAmount'] = f"보증금 {prop_deposit:,} / 월세 {prop_rent:,}만원"
 
-                if xml_text:
-                    properties = self.chatbot.parse_apartment_xml(xml_text)
-                else:
-                    items = []
-                    if isinstance(raw_data, dict):
-                        body = raw_data.get('response', {}).get('body', {})
-                        items = body.get('items', {}).get('item', [])
-                    if isinstance(items, dict):
-                        items = [items]
-                    properties = items or []
-
-                print(f"🏠 [DEBUG] 조회된 전체 매물 수: {len(properties)}")
-
-                # ---------------------------------------------------------
-                # 🚀 전월세 예산 필터링
-                # ---------------------------------------------------------
-                filtered_properties = []
-                
-                user_deposit_limit = 9999999999
-                user_rent_limit = 9999999999
-                
-                if user_profile:
-                    if user_profile.budget:
-                        user_deposit_limit = self._parse_korean_money_to_int(user_profile.budget)
-                    if user_profile.rent_budget:
-                        user_rent_limit = self._parse_korean_money_to_int(user_profile.rent_budget)
-
-                print(f"💰 [DEBUG] 최종 필터 기준: 보증금 {user_deposit_limit}만원, 월세 {user_rent_limit}만원")
-
-                for prop in properties:
-                    try:
-                        # 데이터 파싱 ('deposit', 'monthlyRent')
-                        deposit_raw = (prop.get('deposit') or prop.get('보증금액') or prop.get('depositAmount') or '0')
-                        rent_raw = (prop.get('monthlyRent') or prop.get('월세금액') or prop.get('monthlyAmount') or '0')
-
-                        deposit_str = str(deposit_raw).replace(',', '').strip()
-                        rent_str = str(rent_raw).replace(',', '').strip()
-                        
-                        prop_deposit = int(deposit_str) if deposit_str.isdigit() else 0
-                        prop_rent = int(rent_str) if rent_str.isdigit() else 0
-
-                        # 가격 정보가 없는(0원) 데이터는 제외할지 여부 결정 (일단 제외하지 않음)
-                        # if prop_deposit == 0 and prop_rent == 0: continue
-
-                        # 필터링 조건
-                        if prop_deposit <= user_deposit_limit and prop_rent <= user_rent_limit:
-                            if prop_rent == 0:
-                                prop['dealAmount'] = f"전세 {int(deposit_str):,}만원"
-                            elif prop_deposit == 0:
-                                prop['dealAmount'] = f"월세 {int(rent_str):,}만원"
-                            else:
-                                prop['dealAmount'] = f"보증금 {int(deposit_str):,} / 월세 {int(rent_str):,}만원"
-                                
-                            filtered_properties.append(prop)
-                            
-                    except Exception as e:
-                        continue
-                
-                properties = filtered_properties
-                print(f"🏠 [DEBUG] 필터링 후 매물 수: {len(properties)}")
+                print(f"🏠 [DEBUG] 전체 {server_response.get('totalCount', 0)}건 중 예산 내 매물 {matched_count}건")
             
             # --- (이하 나머지 코드는 동일) ---
             REGION_COORDS = {
@@ -573,15 +591,13 @@ class WebAPIHandler:
             }
             lat, lng = REGION_COORDS.get(region_code, (37.5665, 126.9780))
             
-            price_analysis = {
-                "trend": "데이터 분석 중", 
-                "price_range": "전세/월세 혼합", 
-                "sample_count": len(properties)
-            }
+            price_analysis = await self._build_price_analysis(region_code, deal_ymd, matched_count)
 
             return {
                 "success": True,
                 "properties": properties,
+                "matched_count": matched_count,
+                "budget_frontier": budget_frontier,
                 "price_analysis": price_analysis,
                 "deal_period": deal_ymd,
                 "region_info": {
@@ -598,9 +614,57 @@ class WebAPIHandler:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    
+    def _shift_ymd(self, ymd: str, months: int) -> str:
+        """YYYYMM 문자열을 months개월 이동"""
+        index = int(ymd[:4]) * 12 + int(ymd[4:]) - 1 + months
+        return f"{index // 12}{index % 12 + 1:02d}"
+
+    async def _build_price_analysis(self, region_code: str, deal_ymd: str, sample_count: int) -> Dict[str, Any]:
+        """최근 6개월 지역 전월세 통계(수집 시 미리 계산된 값)로 가격 분석 생성 (시간 초과 시 '데이터 부족')"""
+        stats_result = await self.orchestrator.acall_realestate_tool(
+            'getRentStatistics',
+            {'lawdcd': region_code, 'from_ymd': self._shift_ymd(deal_ymd, -5), 'to_ymd': deal_ymd},
+            timeout=PRICE_ANALYSIS_TIMEOUT,
+        )
+        months = []
+        if stats_result["status"] == "success":
+            months = [m for m in stats_result["result"].get("months", []) if m.get("count")]
+        if not months:
+            return {"trend": "데이터 부족", "price_range": "확인 불가", "sample_count": sample_count}
+
+        latest = months[-1]
+        first_median = months[0]["deposit"]["median"]
+        change = (latest["deposit"]["median"] - first_median) / first_median * 100 if first_median else 0.0
+        if change >= 3:
+            trend = "상승세"
+        elif change <= -3:
+            trend = "하락세"
+        else:
+            trend = "안정세"
+
+        deposit = latest["deposit"]
+        return {
+            "trend": trend,
+            "trend_change_pct": round(change, 1),
+            "price_range": f"{deposit['p25']:,.0f}만원 ~ {deposit['p75']:,.0f}만원 (보증금 중간 50%)",
+            "sample_count": sample_count,
+            "statistics": latest,
+            "monthly_series": [
+                {
+                    "deal_ymd": m["deal_ymd"],
+                    "count": m["count"],
+                    "median_deposit": m["deposit"].get("median"),
+                    "median_monthly_rent": m["monthly_rent"].get("median"),
+                    "jeonse_ratio": m["jeonse_ratio"],
+                }
+                for m in months
+            ],
+        }
+
     # ✅ [수정] search_policies_only 함수
-    async def search_policies_only(self, region_code: str, keywords: str = None, user_query: str = None, user_profile: Any = None) -> Dict[str, Any]:
+    @traced("handler.search_policies_only")
+    async def search_policies_only(self, region_code: str, keywords: str = None, user_query: str = None, user_profile: Any = None,
+                                   planner: Optional[QueryPlanner] = None) -> Dict[str, Any]:
         
         print(f"🤖 [DEBUG] search_policies_only 호출")
         print(f"📍 [DEBUG] region_code: {region_code}")
@@ -618,6 +682,7 @@ class WebAPIHandler:
         policies = []
         ai_analysis = None
         ai_insights = None
+        eligibility_excluded = 0
 
         target_category = None
         if user_profile and user_profile.policy:
@@ -628,14 +693,16 @@ class WebAPIHandler:
 
         try:
             # 🎯 오케스트레이터 호출 (여기서 user_query 대신 augmented_query를 전달!)
-            policy_result = self.orchestrator.call_youth_policy_tool(
-                'searchPoliciesByRegion',
+            planner = planner or QueryPlanner(self.orchestrator)
+            policy_result = await planner.call(
+                'youth_policy', 'searchPoliciesByRegion',
                 {
                     'regionCode': region_code,
                     'pageNum': 1,
                     'pageSize': 30,
                     'categories': target_category,
-                    'user_query': augmented_query  # 👈 핵심 변경 사항
+                    'user_query': augmented_query,  # 👈 핵심 변경 사항
+                    'eligibility': self._profile_to_eligibility(user_profile)  # 자격 안 되는 정책은 AI 분석 전에 제외
                 }
             )
             
@@ -644,6 +711,7 @@ class WebAPIHandler:
 
                 ai_analysis = policy_result["result"].get("ai_analysis")
                 ai_insights = policy_result["result"].get("ai_insights")
+                eligibility_excluded = policy_result["result"].get("eligibility_excluded", 0)
                 
                 # 디버깅 로그
                 if ai_analysis:
@@ -696,6 +764,9 @@ class WebAPIHandler:
                 apply_period = policy.get("aplyYmd", "")
                 formatted_apply_period = format_apply_period(apply_period) if apply_period else ""
                 
+                # 신청 마감까지 남은 일수 (날짜 색인 기준, 상시접수면 None)
+                apply_days_left = self.orchestrator.youth_policy_server.days_until_close(policy)
+
                 # 상세 링크
                 policy_no = policy.get("plcyNo", "")
                 detail_url = f"https://www.youthcenter.go.kr/youthPolicy/ythPlcyTotalSearch/ythPlcyDetail/{policy_no}" if policy_no else ""
@@ -715,6 +786,8 @@ class WebAPIHandler:
                     "support_content_display": policy.get('plcySprtCn', ''),
                     "business_period_display": business_period,
                     "apply_period_display": formatted_apply_period if formatted_apply_period else "상시접수",
+                    "apply_days_left": apply_days_left,
+                    "is_urgent": self._is_urgent_policy(policy),
                     "support_scale_display": f"{policy.get('sprtSclCnt', '0')}명" if policy.get('sprtSclCnt') != "0" else "",
                     "apply_method_display": policy.get('plcyAplyMthdCn', ''),
                     "additional_conditions_display": policy.get('addAplyQlfcCndCn', ''),
@@ -729,6 +802,7 @@ class WebAPIHandler:
                 "policies": formatted_policies,
                 "categories": self._group_policies_by_category(policies),
                 "total_count": len(policies),
+                "eligibility_excluded": eligibility_excluded,
                 "keywords_used": keywords,
                 "region_info": {
                     "code": region_code,
@@ -740,18 +814,74 @@ class WebAPIHandler:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    async def _get_raw_data(self, intent: Dict[str, Any]) -> Dict[str, Any]:
+    @traced("handler.compare_regions")
+    async def compare_regions(self, region_codes: Optional[List[str]] = None, deal_ymd: Optional[str] = None) -> Dict[str, Any]:
+        """지역 비교용 - 여러 지역을 한 번에 분석 (채용공고는 1회 조회 후 지역별 분할)"""
+        try:
+            batch = await self.orchestrator.aanalyze_regions(region_codes, deal_ymd)
+
+            regions = []
+            for code, result in batch["regions"].items():
+                # 전월세 통계 (해당 월)
+                rent = {}
+                stats = result.get("rent_statistics", {})
+                if stats.get("status") == "success":
+                    months = stats["result"].get("months", [])
+                    rent = months[0] if months else {}
+
+                policies = result.get("youth_policies", {})
+                policy_count = policies["result"].get("total_count", 0) if policies.get("status") == "success" else 0
+                specific = result.get("youth_specific_policies", {})
+                specific_count = len(specific["result"].get("policies", [])) if specific.get("status") == "success" else 0
+
+                regions.append({
+                    "code": code,
+                    "name": self.chatbot.get_region_name(code),
+                    "job_count": result["job_count"],
+                    "top_jobs": [job.get("recrutPbancTtl", "") for job in result["jobs"][:3]],
+                    "rent_count": rent.get("count", 0),
+                    "median_deposit": rent.get("deposit", {}).get("median"),
+                    "median_monthly_rent": rent.get("monthly_rent", {}).get("median"),
+                    "jeonse_ratio": rent.get("jeonse_ratio"),
+                    "policy_count": policy_count,
+                    "youth_specific_policy_count": specific_count,
+                    "failed_sections": result["analysis_meta"]["failed_sections"],
+                })
+
+            return {
+                "success": True,
+                "deal_ymd": batch["deal_ymd"],
+                "regions": regions,
+                "recruitment_total": batch["shared"]["recruitment_total"],
+                "partial": batch["analysis_meta"]["partial"],
+                "elapsed_ms": batch["analysis_meta"]["elapsed_ms"]
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def _get_raw_data(self, intent: Dict[str, Any], planner: Optional[QueryPlanner] = None) -> Dict[str, Any]:
         """원시 데이터 수집"""
         region_code = intent.get("region_mentioned", "44790")
         max_price = intent.get("max_price")
         results = {"jobs": [], "realestate": [], "policies": []}
+
+        # 필요한 호출을 동시에 실행 (공유 플래너면 다른 페이지의 같은 엔드포인트 호출과 합쳐짐)
+        planner = planner or QueryPlanner(self.orchestrator)
+        calls = {}
+        if intent["search_jobs"]:
+            calls['jobs'] = planner.call('recruitment', 'listRecruitments',
+                                         {'pageNo': 1, 'numOfRows': 50, 'filters': intent.get("filters", {})})  #rows : 종합 분석 란에 보일 개수
+        if intent["search_realestate"]:
+            calls['realestate'] = planner.call('realestate', 'getApartmentTrades',
+                                               {'lawdcd': region_code, 'deal_ymd': "202506", 'pageNo': 1, 'numOfRows': 15})
+        if intent["search_policies"]:
+            calls['policies'] = planner.call('youth_policy', 'searchPoliciesByRegion',
+                                             {'regionCode': region_code, 'pageNum': 1, 'pageSize': 20})
+        planned = dict(zip(calls, await asyncio.gather(*calls.values())))
         
         # 채용정보
         if intent["search_jobs"]:
-            job_result = self.orchestrator.call_recruitment_tool(
-                'listRecruitments',
-                {'pageNo': 1, 'numOfRows': 50, 'filters': intent.get("filters", {})} #rows : 종합 분석 란에 보일 개수
-            )
+            job_result = planned['jobs']
             if job_result["status"] == "success":
                 raw_jobs = job_result["result"].get("data", {}).get("result", [])
 
@@ -768,13 +898,9 @@ class WebAPIHandler:
         
         # 부동산
         if intent["search_realestate"]:
-            apt_result = self.orchestrator.call_realestate_tool(
-                'getApartmentTrades',
-                {'lawdcd': region_code, 'deal_ymd': "202506", 'pageNo': 1, 'numOfRows': 15}
-            )
+            apt_result = planned['realestate']
             if apt_result["status"] == "success":
-                apt_text = apt_result["result"].get("text", "")
-                properties = self.chatbot.parse_apartment_xml(apt_text)
+                properties = self.chatbot.extract_rent_records(apt_result["result"])
 
                 print(f"🏠 필터링 전 매물 수: {len(properties)}")  # 추가
                 print(f"🏠 필터링할 최대가격: {max_price}")  # 추가
@@ -783,19 +909,13 @@ class WebAPIHandler:
                 intent_max_price = intent.get("max_price")  # 변수명 변경
                 if intent_max_price and intent_max_price > 0:  # 변수명 변경
                     original_count = len(properties)
-                    properties = [
-                        prop for prop in properties
-                        if int(prop.get("dealAmount", "0").replace(",", "")) <= intent_max_price
-                    ]
+                    properties = [prop for prop in properties if prop["deposit"] <= intent_max_price]
                     print(f"🏠 필터링 후 매물 수: {len(properties)}")
                 results["realestate"] = properties
         
         # 정책
         if intent["search_policies"]:
-            policy_result = self.orchestrator.call_youth_policy_tool(
-                'searchPoliciesByRegion',
-                {'regionCode': region_code, 'pageNum': 1, 'pageSize': 20}
-            )
+            policy_result = planned['policies']
             if policy_result["status"] == "success":
                 policies = policy_result["result"].get("policies", [])
                 active_policies = self.chatbot.filter_active_policies(policies)
@@ -816,15 +936,11 @@ class WebAPIHandler:
         }
     
     def _calculate_avg_price(self, properties: List[Dict]) -> str:
-        """평균 매매가 계산"""
+        """평균 보증금 계산"""
         if not properties:
             return "데이터 없음"
         
-        prices = []
-        for prop in properties:
-            price_str = prop.get("dealAmount", "").replace(",", "")
-            if price_str.isdigit():
-                prices.append(int(price_str))
+        prices = [prop["deposit"] for prop in properties if prop.get("deposit")]
         
         if prices:
             avg = sum(prices) // len(prices)
@@ -849,11 +965,7 @@ class WebAPIHandler:
         if not properties:
             return {"trend": "데이터 부족", "price_range": "확인 불가"}
         
-        prices = []
-        for prop in properties:
-            price_str = prop.get("dealAmount", "").replace(",", "")
-            if price_str.isdigit():
-                prices.append(int(price_str))
+        prices = [prop["deposit"] for prop in properties if prop.get("deposit")]
         
         if prices:
             min_price = min(prices)
@@ -875,6 +987,9 @@ class WebAPIHandler:
         return categories
     
     def _is_urgent_policy(self, policy: Dict) -> bool:
-        """긴급 정책 여부 판단 (마감 임박)"""
+        """긴급 정책 여부 판단 (신청 마감 URGENT_POLICY_DAYS일 이내)"""
+        days_left = self.orchestrator.youth_policy_server.days_until_close(policy)
+        if days_left is not None and 0 <= days_left <= URGENT_POLICY_DAYS:
+            return True
         apply_period = policy.get("aplyYmd", "")
         return "마감" in apply_period or "긴급" in policy.get("plcyNm", "")
\ No newline at end of file
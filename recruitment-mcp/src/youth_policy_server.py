@@ -2,15 +2,32 @@
 import os
 import ssl
 import json
-from typing import Any, Dict, Optional, Tuple, Iterable, List
+import time
+import asyncio
+import hashlib
+import math
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, TimeoutError as FuturesTimeout
+from typing import Any, Dict, Optional, Tuple, Iterable, List, Set, FrozenSet, NamedTuple
 
 import httpx
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 
+try:
+    from src import metrics
+    from src.tracing import span, wrap, propagate
+except ImportError:  # python src/youth_policy_server.py 처럼 단독 스크립트로 실행한 경우
+    import metrics
+    from tracing import span, wrap, propagate
+
 # 🤖 AI 라이브러리 추가
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     AI_AVAILABLE = True
 except ImportError:
     AI_AVAILABLE = False
@@ -24,18 +41,49 @@ mcp = FastMCP("youth-policy-mcp")
 BASE_URL = (os.getenv("YOUTH_BASE_URL") or "https://www.youthcenter.go.kr/go/ythip/getPlcy").rstrip("/")
 API_KEY = (os.getenv("YOUTH_API_KEY") or "55930c52-9e2e-42ba-9aec-f562fc10cd09").strip()
 
+# 🚀 검색 시도(search_attempts) 동시 실행 설정
+YOUTH_MAX_CONCURRENCY = int(os.getenv("YOUTH_MAX_CONCURRENCY") or 4)  # 동시에 보낼 최대 요청 수
+YOUTH_DEADLINE = float(os.getenv("YOUTH_DEADLINE") or 20)             # 전체 검색 마감 시간(초)
+
+# 📦 정책 전체 로컬 미러 설정 (하루에 한 번 정도 바뀌는 수천 건 규모 피드)
+YOUTH_MIRROR_TTL = float(os.getenv("YOUTH_MIRROR_TTL") or 6 * 3600)     # 갱신 주기(초)
+YOUTH_MIRROR_RETRY = float(os.getenv("YOUTH_MIRROR_RETRY") or 300)      # 갱신 실패 시 재시도 간격(초)
+YOUTH_MIRROR_PAGE_SIZE = int(os.getenv("YOUTH_MIRROR_PAGE_SIZE") or 100)
+YOUTH_MIRROR_FOLLOW_INTERVAL = 30.0  # 다른 워커가 갱신 중일 때 디스크를 다시 확인하는 간격(초)
+YOUTH_REFRESH_LEASE_TTL = 1800.0     # 갱신 담당 리스 유효 시간(초) — 담당 워커가 죽으면 이 시간 뒤 다른 워커가 이어받음
+YOUTH_MIRROR_PATH = os.getenv("YOUTH_MIRROR_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".youth_mirror", "policies.json"
+)
+
+# 🤖 AI 호출 설정 — 요청당 마감 시간 + 서버 전체 동시 호출 상한
+AI_DEADLINE = float(os.getenv("YOUTH_AI_DEADLINE") or 12)
+AI_MAX_CONCURRENCY = int(os.getenv("YOUTH_AI_MAX_CONCURRENCY") or 4)
+AI_BATCH_DEADLINE = float(os.getenv("YOUTH_AI_BATCH_DEADLINE") or 120)  # 지역 인사이트 일괄 생성 마감(초)
+
+# 🧠 맞춤 분석 의미 캐시 설정 (비슷한 질문이면 LLM을 다시 부르지 않음)
+SEMANTIC_CACHE_SIZE = int(os.getenv("YOUTH_SEMANTIC_CACHE_SIZE") or 512)          # 0이면 비활성화
+SEMANTIC_CACHE_TTL = float(os.getenv("YOUTH_SEMANTIC_CACHE_TTL") or 6 * 3600)     # 항목 유효 시간(초)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("YOUTH_SEMANTIC_CACHE_THRESHOLD") or 0.92)  # 코사인 유사도 기준
+EMBEDDING_MODEL = os.getenv("YOUTH_EMBEDDING_MODEL") or "text-embedding-3-small"
+YOUTH_INSIGHTS_PATH = os.getenv("YOUTH_INSIGHTS_PATH") or os.path.join(
+    os.path.dirname(YOUTH_MIRROR_PATH), "region_insights.json"
+)
+
 # 🤖 AI 클라이언트 초기화
 openai_client = None
+async_openai_client = None
 if AI_AVAILABLE and os.getenv("OPENAI_API_KEY"):
     try:
         openai_client = OpenAI(
             api_key=os.getenv("OPENAI_API_KEY"),
             timeout=30.0  # OpenAI 클라이언트 타임아웃 설정
         )
+        async_openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=AI_DEADLINE)
         print("✅ AI 분석 모드 활성화")
     except Exception as e:
         print(f"⚠️ AI 초기화 실패: {e}")
         openai_client = None
+        async_openai_client = None
 
 # 기존 지역 매핑 그대로 유지
 REGION_MAPPING = {
@@ -76,35 +124,897 @@ def _client_candidates() -> Iterable[Tuple[str, httpx.Client]]:
 def _try_get(url: str, params: Dict[str, Any]):
     last_err: Optional[Exception] = None
     for mode, client in _client_candidates():
-        try:
-            with client as c: return c.get(url, params=params)
-        except Exception as e: last_err = e
+        with span("http.attempt", tls_mode=mode, url=url) as sp:
+            try:
+                with client as c:
+                    resp = c.get(url, params=params)
+                    sp.set(status_code=resp.status_code)
+                    metrics.TLS_ATTEMPTS.inc(server="youth_policy", mode=mode, outcome="ok")
+                    return resp
+            except Exception as e:
+                sp.set_error(e)
+                metrics.TLS_ATTEMPTS.inc(server="youth_policy", mode=mode, outcome="error")
+                last_err = e
     if last_err: raise last_err
     raise RuntimeError("No HTTP client candidates available")
 
-# 기존 API 호출 함수 그대로 유지
-def call_youth_api_enhanced(page_num: int = 1, page_size: int = 100, search_attempts: List[str] = None):
-    if not API_KEY: return {"status": "error", "message": "YOUTH_API_KEY is missing"}
-    all_policies = []
-    for filters in (search_attempts or [{}]):
-        params = {"apiKeyNm": API_KEY, "pageNum": page_num, "pageSize": page_size, "rtnType": "json", **(filters or {})}
+def _request_policies(page_num: int, page_size: int, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """API 1회 호출 → 응답의 result (youthPolicyList / pagging). API 오류는 예외로 올림"""
+    params = {"apiKeyNm": API_KEY, "pageNum": page_num, "pageSize": page_size, "rtnType": "json", **(filters or {})}
+    with span("youth.api", page_num=page_num, page_size=page_size, filters=json.dumps(filters or {}, ensure_ascii=False)) as sp:
+        started = time.perf_counter()
         try:
             resp = _try_get(BASE_URL, params)
-            resp.raise_for_status()
-            json_data = resp.json()
-            if json_data.get("resultCode") == 200:
-                policies = json_data.get("result", {}).get("youthPolicyList", [])
-                if policies: all_policies.extend(policies)
-        except Exception as e:
-            print(f"API 호출 오류: {e}")
-    unique_policies = {p['plcyNo']: p for p in all_policies if p.get('plcyNo')}
+        except Exception:
+            metrics.UPSTREAM_ERRORS.inc(api="youth_policy", status="exception")
+            raise
+        finally:
+            metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, api="youth_policy")
+        if resp.status_code >= 400:
+            metrics.UPSTREAM_ERRORS.inc(api="youth_policy", status=str(resp.status_code))
+        resp.raise_for_status()
+        json_data = resp.json()
+        if json_data.get("resultCode") != 200:
+            metrics.UPSTREAM_ERRORS.inc(api="youth_policy", status=f"result_{json_data.get('resultCode')}")
+            raise RuntimeError(f"resultCode {json_data.get('resultCode')}: {json_data.get('resultMessage', '')}")
+        result = json_data.get("result", {}) or {}
+        sp.set(rows=len(result.get("youthPolicyList") or []))
+    return result
+
+def _fetch_attempt(page_num: int, page_size: int, filters: Optional[Dict[str, Any]]) -> List[Dict]:
+    """검색 시도 1건 호출 → 정책 목록 (API 오류는 예외로 올려 시도별로 기록)"""
+    return _request_policies(page_num, page_size, filters).get("youthPolicyList", []) or []
+
+def call_youth_api_enhanced(page_num: int = 1, page_size: int = 100, search_attempts: List[Dict] = None,
+                            deadline: Optional[float] = None):
+    """
+    검색 시도들을 제한된 동시성으로 한꺼번에 보내고, 도착하는 순서대로 plcyNo 기준 병합.
+    전체 마감(deadline, 기본 YOUTH_DEADLINE초)을 넘긴 시도는 timeout으로 기록하고 그때까지의 결과를 반환.
+    """
+    if not API_KEY: return {"status": "error", "message": "YOUTH_API_KEY is missing"}
+    started = time.perf_counter()
+    attempts = list(search_attempts or [{}])
+    attempt_info = [{"filters": filters or {}, "status": "timeout", "count": 0} for filters in attempts]
+    unique_policies: Dict[str, Dict] = {}
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(YOUTH_MAX_CONCURRENCY, len(attempts))))
+    futures = {pool.submit(wrap(_fetch_attempt), page_num, page_size, filters): i for i, filters in enumerate(attempts)}
+    try:
+        for future in as_completed(futures, timeout=deadline or YOUTH_DEADLINE):
+            info = attempt_info[futures[future]]
+            info["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            try:
+                policies = future.result()
+            except Exception as e:
+                print(f"API 호출 오류 ({info['filters']}): {e}")
+                info.update(status="error", error=str(e))
+                continue
+            info.update(status="ok", count=len(policies))
+            for policy in policies:
+                if policy.get("plcyNo"): unique_policies.setdefault(policy["plcyNo"], policy)
+    except FuturesTimeout:
+        pending = [info["filters"] for info in attempt_info if info["status"] == "timeout"]
+        print(f"⏱️ 청년정책 검색 마감 초과 - 미완료 시도 {len(pending)}건: {pending}")
+    finally:
+        # 마감을 넘긴 요청은 기다리지 않음 (아직 시작 안 한 시도는 취소)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    final_policies = list(unique_policies.values())
+    failed = [info for info in attempt_info if info["status"] != "ok"]
+    if final_policies: status = "ok"
+    elif failed and len(failed) == len(attempts): status = "error"
+    else: status = "no_results"
+
+    result = {
+        "status": status,
+        "policies": final_policies,
+        "partial": bool(failed),
+        "attempts": attempt_info,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    if status == "error":
+        result["message"] = f"모든 검색 시도 실패 ({len(attempts)}건)"
+    return result
+
+# 📦 정책 로컬 미러 — 전체 피드를 주기적으로 받아 역색인을 만들어 두고 검색은 메모리에서 처리
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+def _split_tokens(value: Any) -> List[str]:
+    return [t.strip() for t in str(value or "").split(",") if t.strip()]
+
+class _SubstringIndex:
+    """문자 2-gram 역색인 — 부분 문자열 검색(API의 LIKE 검색과 같은 결과)을 후보 교집합 + 확인으로 처리"""
+
+    def __init__(self, values: List[str]):
+        self.values = values
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        for i, value in enumerate(values):
+            for gram in _bigrams(value):
+                self.postings[gram].add(i)
+
+    def find(self, query: str) -> Set[int]:
+        query = str(query or "").strip()
+        if not query:
+            return set(range(len(self.values)))
+        if len(query) == 1:
+            return {i for i, value in enumerate(self.values) if query in value}
+        grams = sorted(_bigrams(query), key=lambda g: len(self.postings.get(g, ())))
+        candidates = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates &= self.postings.get(gram, set())
+        return {i for i in candidates if query in self.values[i]}
+
+class _TokenIndex:
+    """쉼표로 구분된 값(키워드/분류/법정동코드)을 토큰 단위로 색인 — 질의 토큰 중 하나라도 일치하면 포함"""
+
+    def __init__(self, values: List[Any]):
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        for i, value in enumerate(values):
+            for token in _split_tokens(value):
+                self.postings[token].add(i)
+
+    def find(self, query: str) -> Set[int]:
+        found: Set[int] = set()
+        for token in _split_tokens(query):
+            found |= self.postings.get(token, set())
+        return found
+
+# 🔎 지역 키워드 매처 — REGION_MAPPING의 지역/도/인접 시군 키워드를 Aho-Corasick 오토마톤 하나로 컴파일
+class KeywordMatcher:
+    """여러 키워드를 텍스트 한 번 훑기로 모두 찾는 Aho-Corasick 오토마톤 (겹치는 키워드도 모두 보고)"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[FrozenSet[str]] = [frozenset()]
+        for keyword in sorted(set(k for k in keywords if k)):
+            state = 0
+            for ch in keyword:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = self.goto[state][ch] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(frozenset())
+                state = nxt
+            self.out[state] = self.out[state] | {keyword}
+
+        # BFS로 실패 링크를 잇고(깊이 1은 루트), 실패 링크 쪽 출력(접미사 키워드)을 미리 합쳐 둠
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] | self.out[self.fail[nxt]]
+
+    def find(self, text: str) -> FrozenSet[str]:
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        hits: Set[str] = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return frozenset(hits)
+
+REGION_MATCHER = KeywordMatcher(
+    keyword
+    for info in REGION_MAPPING.values()
+    for keyword in info["keywords"] + info["province_keywords"] + info.get("sibling_city_keywords", [])
+)
+
+def _region_text(policy: Dict) -> str:
+    return " ".join(filter(None, [
+        policy.get("plcyNm", ""),
+        policy.get("plcyExplnCn", ""),
+        policy.get("cnsgNmor", ""),
+    ]))
+
+def region_keyword_hits(policy: Dict) -> FrozenSet[str]:
+    """정책 텍스트에 나오는 지역 키워드 집합 — 미러 스냅샷의 정책이면 수집 시점에 계산해 둔 값을 사용"""
+    snapshot = policy_mirror.snapshot
+    if snapshot is not None:
+        i = snapshot.by_id.get(policy.get("plcyNo"))
+        if i is not None and snapshot.policies[i] is policy:
+            return snapshot.region_hits[i]
+    return REGION_MATCHER.find(_region_text(policy))
+
+def filter_policies_for_region(policies: List[Dict], region_code: str) -> List[Dict]:
+    """대상 지역 키워드가 있으면 포함, 없이 다른 시군 키워드만 있으면 제외, 둘 다 없으면(전국/도 단위) 포함"""
+    region_info = REGION_MAPPING[region_code]
+    target_keyword = region_info["keywords"][0]
+    sibling_keywords = frozenset(region_info.get("sibling_city_keywords", []))
+    filtered = []
+    for policy in policies:
+        hits = region_keyword_hits(policy)
+        if target_keyword in hits or not (hits & sibling_keywords):
+            filtered.append(policy)
+    return filtered
+
+# 📅 정책 날짜 색인 — 사업기간/신청기간 문자열을 스냅샷 수집 시 한 번만 일(day) 번호로 바꿔 두고
+#    "D일 기준 유효한 정책"은 날짜가 바뀔 때만 정렬 배열 이분 탐색으로 다시 계산 (요청마다는 plcyNo 조회만)
+_YMD_RANGE = re.compile(r"(\d{8})\s*~\s*(\d{8})")
+
+def ymd_to_day(value: Any) -> Optional[int]:
+    """YYYYMMDD → 일 번호(date.toordinal), 형식이 아니거나 00000000 같은 값이면 None"""
+    text = str(value or "").strip()
+    if len(text) != 8 or not text.isdigit():
+        return None
+    try:
+        return date(int(text[:4]), int(text[4:6]), int(text[6:])).toordinal()
+    except ValueError:
+        return None
+
+def day_to_ymd(day: Optional[int]) -> str:
+    return date.fromordinal(day).strftime("%Y%m%d") if day else ""
+
+def today_day() -> int:
+    return date.today().toordinal()
+
+class PolicyDates(NamedTuple):
+    """정책 1건의 날짜 (일 번호, 없으면 None) — active_until: 사업 종료일/신청 마감일 중 빠른 날"""
+    biz_start: Optional[int]
+    biz_end: Optional[int]
+    apply_start: Optional[int]
+    apply_end: Optional[int]
+    active_until: Optional[int]
+
+def parse_policy_dates(policy: Dict) -> PolicyDates:
+    biz_start = ymd_to_day(policy.get("bizPrdBgngYmd"))
+    biz_end = ymd_to_day(policy.get("bizPrdEndYmd"))
+    apply_text = str(policy.get("aplyYmd") or "")
+    pairs = [(ymd_to_day(a), ymd_to_day(b)) for a, b in _YMD_RANGE.findall(apply_text)]
+    pairs = [(a, b) for a, b in pairs if b is not None]
+    if pairs:
+        # 신청기간이 여러 개면 가장 이른 시작 ~ 가장 늦은 마감
+        starts = [a for a, _ in pairs if a is not None]
+        apply_start, apply_end = (min(starts) if starts else None), max(b for _, b in pairs)
+    else:
+        apply_start, apply_end = None, ymd_to_day(apply_text)
+    ends = [d for d in (biz_end, apply_end) if d is not None]
+    return PolicyDates(biz_start, biz_end, apply_start, apply_end, min(ends) if ends else None)
+
+_DATE_FIELDS = ("bizPrdBgngYmd", "bizPrdEndYmd", "aplyYmd")
+
+class PolicyDateIndex:
+    """
+    스냅샷 정책의 날짜 색인 (스냅샷마다 1개).
+    active_positions(day): active_until ≥ day 이거나 날짜 정보가 없는(상시) 정책 위치 — 하루 동안 재사용
+    """
+
+    def __init__(self, policies: List[Dict]):
+        self.dates = [parse_policy_dates(p) for p in policies]
+        self._open_ended = [i for i, d in enumerate(self.dates) if d.active_until is None]
+        until = sorted((d.active_until, i) for i, d in enumerate(self.dates) if d.active_until is not None)
+        self._until_days = [day for day, _ in until]
+        self._until_pos = [i for _, i in until]
+        self._active: Tuple[Optional[int], FrozenSet[int]] = (None, frozenset())
+
+    def active_positions(self, day: int) -> FrozenSet[int]:
+        cached_day, positions = self._active
+        if cached_day != day:
+            positions = frozenset(self._open_ended + self._until_pos[bisect_left(self._until_days, day):])
+            self._active = (day, positions)  # 튜플 통째로 교체하므로 잠금 없이 읽어도 됨
+        return positions
+
+def _snapshot_position(snapshot: Optional["PolicySnapshot"], policy: Dict, fields: Tuple[str, ...]) -> Optional[int]:
+    """
+    스냅샷에 같은 정책(plcyNo + fields 원문이 같음)이 있으면 그 위치.
+    레지스트리 캐시의 사본이나 원격 응답처럼 객체가 달라도 재사용하되, 원문이 바뀐 정책은 다시 파싱하도록 비교
+    """
+    if snapshot is None:
+        return None
+    i = snapshot.by_id.get(policy.get("plcyNo"))
+    if i is None:
+        return None
+    original = snapshot.policies[i]
+    if original is not policy and any(original.get(f) != policy.get(f) for f in fields):
+        return None
+    return i
+
+def policy_dates(policy: Dict) -> PolicyDates:
+    """정책 1건의 날짜 — 현재 미러 스냅샷에 있는 정책이면 파싱 없이 색인에서 조회"""
+    snapshot = policy_mirror.snapshot
+    i = _snapshot_position(snapshot, policy, _DATE_FIELDS)
+    if i is not None:
+        return snapshot.date_index.dates[i]
+    return parse_policy_dates(policy)
+
+def filter_active_policies(policies: List[Dict], day: Optional[int] = None) -> List[Dict]:
+    """
+    day(기본 오늘) 기준으로 유효한 정책만 (사업 종료일/신청 마감일 중 빠른 날이 지나지 않았거나 날짜 정보 없음).
+    스냅샷 정책은 미리 계산된 유효 위치 집합과 plcyNo로 대조하고, 스냅샷에 없는 정책만 날짜를 파싱. 입력 순서 유지.
+    """
+    day = today_day() if day is None else day
+    snapshot = policy_mirror.snapshot
+    active = snapshot.date_index.active_positions(day) if snapshot is not None else frozenset()
+    filtered = []
+    for policy in policies:
+        i = _snapshot_position(snapshot, policy, _DATE_FIELDS)
+        if i is not None:
+            if i in active:
+                filtered.append(policy)
+            continue
+        active_until = parse_policy_dates(policy).active_until
+        if active_until is None or active_until >= day:
+            filtered.append(policy)
+    return filtered
+
+def days_until_close(policy: Dict, day: Optional[int] = None) -> Optional[int]:
+    """신청 마감까지 남은 일수 (마감일 정보가 없으면 None, 이미 지났으면 음수)"""
+    apply_end = policy_dates(policy).apply_end
+    if apply_end is None:
+        return None
+    return apply_end - (today_day() if day is None else day)
+
+# 🎯 자격요건 색인 — 나이/소득/취업상태/혼인 조건을 수집 시 구조화해 두고
+#    프로필이 절대 해당될 수 없는 정책은 랭킹·LLM 단계 전에 결정적으로 제외
+#    (조건을 알 수 없거나 '제한없음'이면 제외하지 않음)
+INCOME_ANNUAL = "0043002"  # 소득조건 구분: 연소득 (0043001 무관, 0043003 기타)
+JOB_CODE_NAMES = {
+    "0013001": "재직자", "0013002": "자영업자", "0013003": "미취업자", "0013004": "프리랜서",
+    "0013005": "일용근로자", "0013006": "(예비)창업자", "0013007": "단기근로자", "0013008": "영농종사자",
+    "0013009": "기타", "0013010": "제한없음",
+}
+JOB_UNRESTRICTED = "0013010"
+MARRIAGE_CODE_NAMES = {"0055001": "기혼", "0055002": "미혼", "0055003": "제한없음"}
+MARRIAGE_UNRESTRICTED = "0055003"
+_ELIGIBILITY_FIELDS = ("sprtTrgtMinAge", "sprtTrgtMaxAge", "earnCndSeCd", "earnMinAmt", "earnMaxAmt", "jobCd", "mrgSttsCd")
+ELIGIBILITY_CACHE_SIZE = 256  # 스냅샷 색인당 기억해 둘 (조건 → 제외 위치) 개수
+
+def _positive_int(value: Any) -> Optional[int]:
+    text = str(value or "").replace(",", "").strip()
+    return int(text) if text.isdigit() and int(text) > 0 else None
+
+def _code_set(value: Any, unrestricted: str) -> FrozenSet[str]:
+    """쉼표 구분 코드 → 집합 (비어 있거나 '제한없음'이 포함되면 빈 집합 = 제한 없음)"""
+    codes = frozenset(c.strip() for c in str(value or "").split(",") if c.strip())
+    return frozenset() if unrestricted in codes else codes
+
+class PolicyEligibility(NamedTuple):
+    """정책 1건의 자격요건 — None/빈 집합이면 해당 조건 제한 없음 (소득 단위는 피드와 같은 만원)"""
+    min_age: Optional[int]
+    max_age: Optional[int]
+    income_min: Optional[int]
+    income_max: Optional[int]
+    job_codes: FrozenSet[str]
+    marriage_codes: FrozenSet[str]
+
+def parse_policy_eligibility(policy: Dict) -> PolicyEligibility:
+    # sprtTrgtAgeLmtYn 값은 피드마다 일관되지 않아 실제 나이 값(0 = 제한 없음)으로 판단
+    annual = str(policy.get("earnCndSeCd") or "").strip() == INCOME_ANNUAL
+    return PolicyEligibility(
+        min_age=_positive_int(policy.get("sprtTrgtMinAge")),
+        max_age=_positive_int(policy.get("sprtTrgtMaxAge")),
+        income_min=_positive_int(policy.get("earnMinAmt")) if annual else None,
+        income_max=_positive_int(policy.get("earnMaxAmt")) if annual else None,
+        job_codes=_code_set(policy.get("jobCd"), JOB_UNRESTRICTED),
+        marriage_codes=_code_set(policy.get("mrgSttsCd"), MARRIAGE_UNRESTRICTED),
+    )
+
+class _BoundIndex:
+    """정책별 (하한, 상한) 구간 — value를 포함하는 정책 위치 집합을 정렬 배열 이분 탐색으로 계산"""
+
+    def __init__(self, bounds: List[Tuple[Optional[int], Optional[int]]]):
+        self.size = len(bounds)
+        lows = sorted((lo, i) for i, (lo, _) in enumerate(bounds) if lo is not None)
+        highs = sorted((hi, i) for i, (_, hi) in enumerate(bounds) if hi is not None)
+        self._low_values, self._low_pos = [v for v, _ in lows], [i for _, i in lows]
+        self._high_values, self._high_pos = [v for v, _ in highs], [i for _, i in highs]
+
+    def excluding(self, value: int) -> Set[int]:
+        """value가 구간 밖인 정책 (하한 > value 또는 상한 < value)"""
+        too_low = self._low_pos[bisect_right(self._low_values, value):]
+        too_high = self._high_pos[:bisect_left(self._high_values, value)]
+        return set(too_low).union(too_high)
+
+class _CodeIndex:
+    """정책별 허용 코드 집합 — 해당 코드가 허용되지 않는 정책 위치"""
+
+    def __init__(self, code_sets: List[FrozenSet[str]]):
+        self._restricted: Set[int] = {i for i, codes in enumerate(code_sets) if codes}
+        self._allows: Dict[str, Set[int]] = defaultdict(set)
+        for i, codes in enumerate(code_sets):
+            for code in codes:
+                self._allows[code].add(i)
+
+    def excluding(self, codes: Iterable[str]) -> Set[int]:
+        """사용자 코드(여러 개면 하나라도 허용되면 통과) 중 어느 것도 허용하지 않는 제한 정책"""
+        allowed: Set[int] = set()
+        for code in codes:
+            allowed |= self._allows.get(code, set())
+        return self._restricted - allowed
+
+class EligibilityIndex:
+    """
+    스냅샷 정책의 자격요건 색인 (스냅샷마다 1개).
+    excluded(age, income, job_codes, marriage_code)는 주어진 조건으로 제외되는 정책 위치 집합이며
+    같은 조건의 반복 요청은 캐시에서 바로 돌려줍니다. 값이 없는 조건(None)은 건너뜁니다.
+    """
+
+    def __init__(self, policies: List[Dict]):
+        self.rules = [parse_policy_eligibility(p) for p in policies]
+        self._age = _BoundIndex([(r.min_age, r.max_age) for r in self.rules])
+        self._income = _BoundIndex([(r.income_min, r.income_max) for r in self.rules])
+        self._job = _CodeIndex([r.job_codes for r in self.rules])
+        self._marriage = _CodeIndex([r.marriage_codes for r in self.rules])
+        self._cache: Dict[Tuple, FrozenSet[int]] = {}
+
+    def excluded(self, age: Optional[int] = None, income: Optional[int] = None,
+                 job_codes: Optional[Iterable[str]] = None, marriage_code: Optional[str] = None) -> FrozenSet[int]:
+        job_codes = tuple(sorted(job_codes or ()))
+        key = (age, income, job_codes, marriage_code)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        excluded: Set[int] = set()
+        if age is not None:
+            excluded |= self._age.excluding(age)
+        if income is not None:
+            excluded |= self._income.excluding(income)
+        if job_codes:
+            excluded |= self._job.excluding(job_codes)
+        if marriage_code:
+            excluded |= self._marriage.excluding([marriage_code])
+        if len(self._cache) >= ELIGIBILITY_CACHE_SIZE:
+            self._cache.clear()
+        result = self._cache[key] = frozenset(excluded)
+        return result
+
+def eligibility_allows(rule: PolicyEligibility, age: Optional[int] = None, income: Optional[int] = None,
+                       job_codes: Optional[Iterable[str]] = None, marriage_code: Optional[str] = None) -> bool:
+    """정책 1건이 조건을 만족할 수 있는지 (스냅샷에 없는 정책용 — EligibilityIndex.excluded와 같은 규칙)"""
+    if age is not None and ((rule.min_age is not None and rule.min_age > age)
+                            or (rule.max_age is not None and rule.max_age < age)):
+        return False
+    if income is not None and ((rule.income_min is not None and rule.income_min > income)
+                               or (rule.income_max is not None and rule.income_max < income)):
+        return False
+    if job_codes and rule.job_codes and not rule.job_codes.intersection(job_codes):
+        return False
+    if marriage_code and rule.marriage_codes and marriage_code not in rule.marriage_codes:
+        return False
+    return True
+
+def normalize_eligibility(eligibility: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    도구 인자(eligibility) → EligibilityIndex.excluded / eligibility_allows 조건
+    허용 키: age, income(연소득, 만원), employment(코드 또는 이름, 쉼표/목록), marital(코드 또는 이름)
+    """
+    if not eligibility:
+        return {}
+    names_to_job = {name: code for code, name in JOB_CODE_NAMES.items()}
+    names_to_marriage = {name: code for code, name in MARRIAGE_CODE_NAMES.items()}
+    conditions: Dict[str, Any] = {}
+    age = _positive_int(eligibility.get("age"))
+    if age is not None:
+        conditions["age"] = age
+    income = _positive_int(eligibility.get("income"))
+    if income is not None:
+        conditions["income"] = income
+    employment = eligibility.get("employment")
+    if isinstance(employment, str):
+        employment = employment.split(",")
+    job_codes = [names_to_job.get(str(e).strip(), str(e).strip()) for e in employment or [] if str(e).strip()]
+    if job_codes:
+        conditions["job_codes"] = [c for c in job_codes if c in JOB_CODE_NAMES]
+    marital = str(eligibility.get("marital") or "").strip()
+    if marital:
+        marital = names_to_marriage.get(marital, marital)
+        if marital in MARRIAGE_CODE_NAMES:
+            conditions["marriage_code"] = marital
+    return conditions
+
+def filter_policies_by_eligibility(policies: List[Dict], eligibility: Optional[Dict[str, Any]]) -> List[Dict]:
+    """
+    프로필이 해당될 수 없는 정책 제외 (입력 순서 유지).
+    스냅샷 정책은 스냅샷 색인의 제외 집합과 plcyNo로 대조하고, 스냅샷에 없는 정책만 자격요건을 파싱해 판단
+    """
+    conditions = normalize_eligibility(eligibility)
+    if not conditions or not policies:
+        return policies
+    snapshot = policy_mirror.snapshot
+    excluded = snapshot.eligibility.excluded(**conditions) if snapshot is not None else frozenset()
+    filtered = []
+    for policy in policies:
+        i = _snapshot_position(snapshot, policy, _ELIGIBILITY_FIELDS)
+        if i is not None:
+            if i not in excluded:
+                filtered.append(policy)
+        elif eligibility_allows(parse_policy_eligibility(policy), **conditions):
+            filtered.append(policy)
+    return filtered
+
+class PolicySnapshot:
+    """한 시점의 정책 전체 + 역색인 (만들어진 뒤에는 바뀌지 않으므로 잠금 없이 읽음)"""
+
+    SUBSTRING_FIELDS = ("plcyNm", "sprvsnInstCdNm")
+    TOKEN_FIELDS = ("plcyKywdNm", "lclsfNm", "mclsfNm", "zipCd")
+
+    def __init__(self, policies: List[Dict], fetched_at: float, version: Optional[str] = None):
+        unique = {p["plcyNo"]: p for p in policies if p.get("plcyNo")}
+        self.policies: List[Dict] = list(unique.values())
+        self.fetched_at = fetched_at
+        self.version = version or hashlib.sha1(
+            json.dumps(self.policies, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:12]
+        self.by_id: Dict[str, int] = {p["plcyNo"]: i for i, p in enumerate(self.policies)}
+        self.indexes: Dict[str, Any] = {}
+        for field in self.SUBSTRING_FIELDS:
+            self.indexes[field] = _SubstringIndex([str(p.get(field) or "") for p in self.policies])
+        for field in self.TOKEN_FIELDS:
+            self.indexes[field] = _TokenIndex([p.get(field) for p in self.policies])
+        # 지역 키워드 태그는 수집 시 한 번만 계산 (요청 시 지역 필터는 집합 연산)
+        self.region_hits: List[FrozenSet[str]] = [REGION_MATCHER.find(_region_text(p)) for p in self.policies]
+        # 사업/신청 기간도 수집 시 한 번만 파싱
+        self.date_index = PolicyDateIndex(self.policies)
+        # 자격요건(나이/소득/취업상태/혼인)도 수집 시 구조화
+        self.eligibility = EligibilityIndex(self.policies)
+
+    def supports(self, filters: Dict[str, Any]) -> bool:
+        return all(key == "plcyNo" or key in self.indexes for key in filters)
+
+    def search(self, filters: Dict[str, Any]) -> List[Dict]:
+        """모든 필터를 만족하는 정책 (스냅샷 순서 유지)"""
+        matched: Optional[Set[int]] = None
+        for key, value in filters.items():
+            if key == "plcyNo":
+                ids = {self.by_id[value]} if value in self.by_id else set()
+            else:
+                ids = self.indexes[key].find(value)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+        if matched is None:
+            return list(self.policies)
+        return [self.policies[i] for i in sorted(matched)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": self.version, "fetched_at": self.fetched_at, "policies": self.policies}
+
+class YouthPolicyMirror:
+    """정책 미러 — 백그라운드 스레드가 YOUTH_MIRROR_TTL마다 전체 피드를 받아 스냅샷을 통째로 교체"""
+
+    def __init__(self, path: str = YOUTH_MIRROR_PATH):
+        self.path = path
+        self.snapshot: Optional[PolicySnapshot] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._started = False
+        self._shared_cache = None  # 멀티 워커 서빙 시 갱신 담당 워커를 정하는 공유 캐시 (attach_shared_cache)
+        self._load_from_disk()
+
+    def _load_from_disk(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.snapshot = PolicySnapshot(data["policies"], data["fetched_at"], data.get("version"))
+            print(f"📦 정책 미러 로드: {len(self.snapshot.policies)}건 (version {self.snapshot.version})")
+        except (OSError, ValueError, KeyError):
+            self.snapshot = None
+
+    def _save_to_disk(self, snapshot: PolicySnapshot):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _fetch_all(self) -> List[Dict]:
+        """전체 피드 수집 — 첫 페이지로 totCount 확인 후 나머지 페이지를 동시에 요청 (하나라도 실패하면 예외)"""
+        page_size = YOUTH_MIRROR_PAGE_SIZE
+        first = _request_policies(1, page_size, None)
+        policies = list(first.get("youthPolicyList", []) or [])
+        total = int((first.get("pagging") or {}).get("totCount") or 0)
+        if total:
+            pages = -(-total // page_size)
+            with ThreadPoolExecutor(max_workers=YOUTH_MAX_CONCURRENCY) as pool:
+                rest = [pool.submit(wrap(_fetch_attempt), page, page_size, None) for page in range(2, pages + 1)]
+                for future in rest:
+                    policies.extend(future.result())
+        else:
+            # totCount를 주지 않는 응답이면 빈/짧은 페이지가 나올 때까지 순차 조회
+            page, batch = 1, policies
+            while len(batch) == page_size:
+                page += 1
+                batch = _fetch_attempt(page, page_size, None)
+                policies.extend(batch)
+        return policies
+
+    def refresh(self) -> PolicySnapshot:
+        started = time.perf_counter()
+        with span("youth.mirror_refresh") as sp:
+            policies = self._fetch_all()
+            sp.set(rows=len(policies))
+        if not policies:
+            raise RuntimeError("빈 정책 피드 (기존 스냅샷 유지)")
+        snapshot = PolicySnapshot(policies, time.time())
+        previous = self.snapshot
+        self.snapshot = snapshot
+        self.last_error = None
+        try:
+            self._save_to_disk(snapshot)
+        except OSError as e:
+            print(f"⚠️ 정책 미러 저장 실패: {e}")
+        changed = "변경 없음" if previous and previous.version == snapshot.version else "갱신됨"
+        print(f"📦 정책 미러 {changed}: {len(snapshot.policies)}건 (version {snapshot.version}, "
+              f"{(time.perf_counter() - started):.1f}s)")
+        return snapshot
+
+    def _refresh_loop(self):
+        while True:
+            snapshot = self.snapshot
+            # 스냅샷이 바뀌었으면(또는 기동 직후) 지역 인사이트를 새 버전으로 일괄 생성
+            try:
+                region_insights.ensure_for(snapshot)
+            except Exception as e:
+                print(f"⚠️ 지역 인사이트 일괄 생성 실패: {e}")
+            wait = 0.0 if snapshot is None else snapshot.fetched_at + YOUTH_MIRROR_TTL - time.time()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            cache = self._shared_cache
+            if cache is not None and not cache.acquire_lease("youth.mirror", YOUTH_REFRESH_LEASE_TTL):
+                # 다른 워커가 갱신 담당 → 그 워커가 저장한 스냅샷을 디스크에서 읽어 따라감
+                time.sleep(YOUTH_MIRROR_FOLLOW_INTERVAL)
+                self._load_from_disk()
+                continue
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ 정책 미러 갱신 실패 (기존 스냅샷 유지, {YOUTH_MIRROR_RETRY:.0f}초 후 재시도): {e}")
+                time.sleep(YOUTH_MIRROR_RETRY)
+            finally:
+                if cache is not None:
+                    cache.release_lease("youth.mirror")
+
+    def ensure_started(self):
+        with self._lock:
+            if self._started or not API_KEY:
+                return
+            self._started = True
+        threading.Thread(target=self._refresh_loop, name="youth-policy-mirror", daemon=True).start()
+
+    def get(self) -> Optional[PolicySnapshot]:
+        """현재 스냅샷 (처음 호출 시 갱신 스레드 시작, 아직 없으면 None)"""
+        self.ensure_started()
+        return self.snapshot
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "ready": snapshot is not None,
+            "version": snapshot.version if snapshot else None,
+            "policies": len(snapshot.policies) if snapshot else 0,
+            "fetched_at": snapshot.fetched_at if snapshot else None,
+            "last_error": self.last_error,
+        }
+
+policy_mirror = YouthPolicyMirror()
+
+def query_policies(page_num: int = 1, page_size: int = 100, search_attempts: List[Dict] = None) -> Dict[str, Any]:
+    """
+    call_youth_api_enhanced와 같은 결과 형식으로 정책 검색.
+    미러 스냅샷이 준비돼 있고 모든 필터를 색인으로 처리할 수 있으면 메모리에서 답하고,
+    아니면(첫 기동 직후, 지원하지 않는 필터) 실시간 API로 대체합니다.
+    """
+    attempts = [dict(filters or {}) for filters in (search_attempts or [{}])]
+    snapshot = policy_mirror.get()
+    if snapshot is None or not all(snapshot.supports(filters) for filters in attempts):
+        return call_youth_api_enhanced(page_num=page_num, page_size=page_size, search_attempts=attempts)
+
+    started = time.perf_counter()
+    start = (max(1, int(page_num)) - 1) * int(page_size)
+    unique_policies: Dict[str, Dict] = {}
+    attempt_info = []
+    for filters in attempts:
+        # API와 같은 의미: 시도별로 pageNum 페이지만 가져와 병합
+        page = snapshot.search(filters)[start:start + int(page_size)]
+        attempt_info.append({"filters": filters, "status": "ok", "count": len(page)})
+        for policy in page:
+            unique_policies.setdefault(policy["plcyNo"], policy)
+
     final_policies = list(unique_policies.values())
-    return {"status": "ok" if final_policies else "no_results", "policies": final_policies}
+    return {
+        "status": "ok" if final_policies else "no_results",
+        "policies": final_policies,
+        "partial": False,
+        "attempts": attempt_info,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "source": "mirror",
+        "snapshot_version": snapshot.version,
+    }
+
+# 🤖 AI 호출 전용 이벤트 루프 — 백그라운드 스레드 하나에서 AsyncOpenAI 호출을 동시에 처리
+_ai_loop: Optional[asyncio.AbstractEventLoop] = None
+_ai_loop_lock = threading.Lock()
+_ai_semaphore = asyncio.Semaphore(AI_MAX_CONCURRENCY)  # 처음 사용하는 루프(_ai_loop)에 묶임
+
+def _get_ai_loop() -> asyncio.AbstractEventLoop:
+    global _ai_loop
+    with _ai_loop_lock:
+        if _ai_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="youth-ai-loop", daemon=True).start()
+            _ai_loop = loop
+        return _ai_loop
+
+def run_ai_tasks(coros: Dict[str, Any], deadline: float = AI_DEADLINE) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    AI 코루틴들을 전용 루프에서 동시에 실행하고 deadline(초)까지 끝난 결과만 반환.
+    마감을 넘긴 작업은 취소하고 상태에 timeout으로 남깁니다. 반환: (결과, 상태)
+    """
+    loop = _get_ai_loop()
+    futures = {name: asyncio.run_coroutine_threadsafe(propagate(coro), loop) for name, coro in coros.items()}
+    done, _ = wait(list(futures.values()), timeout=deadline)
+    results: Dict[str, Any] = {}
+    status: Dict[str, str] = {}
+    for name, future in futures.items():
+        if future not in done:
+            future.cancel()
+            status[name] = "timeout"
+            continue
+        try:
+            results[name] = future.result()
+            status[name] = "ok"
+        except Exception as e:
+            status[name] = f"error: {e}"
+    return results, status
+
+async def _chat_completion(prompt: str, temperature: float, max_tokens: int):
+    """전역 동시 호출 상한 안에서 gpt-3.5-turbo 호출"""
+    async with _ai_semaphore:
+        with span("llm.chat", model="gpt-3.5-turbo", max_tokens=max_tokens, prompt_chars=len(prompt)) as sp:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                response = await async_openai_client.chat.completions.create(
+                    model="gpt-3.5-turbo",  # gpt-4 → gpt-3.5-turbo로 변경 (더 빠름)
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                outcome = "ok"
+            finally:
+                metrics.LLM_SECONDS.observe(time.perf_counter() - started, model="gpt-3.5-turbo", outcome=outcome)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                sp.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+            return response
+
+# 🧠 의미 캐시 — (지역, 분석 대상 정책 ID 집합)별로 질문 임베딩과 분석 결과를 보관하고
+#    새 질문의 임베딩과 코사인 유사도가 기준 이상이면 저장된 분석을 그대로 반환
+class SemanticCache:
+    """LRU + TTL 의미 캐시 (벡터는 정규화해서 저장하므로 코사인 유사도 = 내적)"""
+
+    def __init__(self, max_entries: int, ttl: float, threshold: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, Tuple[Any, List[float], Any, float]]" = OrderedDict()
+        self._buckets: Dict[Any, Set[int]] = defaultdict(set)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    @staticmethod
+    def normalize(vector: List[float]) -> List[float]:
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _drop(self, entry_id: int):
+        bucket_key = self._entries.pop(entry_id)[0]
+        self._buckets[bucket_key].discard(entry_id)
+        if not self._buckets[bucket_key]:
+            del self._buckets[bucket_key]
+
+    def lookup(self, bucket_key: Any, vector: List[float]) -> Optional[Tuple[Any, float]]:
+        """가장 비슷한 유효 항목이 기준 이상이면 (값, 유사도), 아니면 None"""
+        now = time.time()
+        with self._lock:
+            self.stats["lookups"] += 1
+            best_id, best_sim = None, -1.0
+            for entry_id in list(self._buckets.get(bucket_key, ())):
+                _, stored, _, created_at = self._entries[entry_id]
+                if now - created_at > self.ttl:
+                    self._drop(entry_id)
+                    self.stats["expired"] += 1
+                    continue
+                sim = sum(a * b for a, b in zip(stored, vector))
+                if sim > best_sim:
+                    best_id, best_sim = entry_id, sim
+            if best_id is None or best_sim < self.threshold:
+                self.stats["misses"] += 1
+                metrics.CACHE_REQUESTS.inc(cache="youth_semantic", result="miss")
+                return None
+            self._entries.move_to_end(best_id)
+            self.stats["hits"] += 1
+            metrics.CACHE_REQUESTS.inc(cache="youth_semantic", result="hit")
+            return self._entries[best_id][2], best_sim
+
+    def store(self, bucket_key: Any, vector: List[float], value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (bucket_key, vector, value, time.time())
+            self._buckets[bucket_key].add(entry_id)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["lookups"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+                "threshold": self.threshold,
+            }
+
+analysis_cache = SemanticCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL, SEMANTIC_CACHE_THRESHOLD)
+_query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()  # 같은 문장은 임베딩도 다시 요청하지 않음
+
+async def _embed_query(text: str) -> List[float]:
+    key = " ".join(text.split())
+    vector = _query_embeddings.get(key)
+    if vector is None:
+        async with _ai_semaphore:
+            with span("llm.embedding", model=EMBEDDING_MODEL, chars=len(key)):
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    response = await async_openai_client.embeddings.create(model=EMBEDDING_MODEL, input=key)
+                    outcome = "ok"
+                finally:
+                    metrics.LLM_SECONDS.observe(time.perf_counter() - started, model=EMBEDDING_MODEL, outcome=outcome)
+        vector = SemanticCache.normalize(response.data[0].embedding)
+        _query_embeddings[key] = vector
+        if len(_query_embeddings) > max(SEMANTIC_CACHE_SIZE, 1) * 2:
+            _query_embeddings.popitem(last=False)
+    else:
+        _query_embeddings.move_to_end(key)
+    return vector
 
 # 🤖 AI 분석 함수들 - 최적화 버전
-def ai_analyze_policies_for_user(user_query: str, policies: List[Dict], region_code: str) -> Dict[str, Any]:
+async def ai_analyze_policies_for_user_async(user_query: str, policies: List[Dict], region_code: str) -> Dict[str, Any]:
+    """맞춤 분석 - 의미 캐시에 비슷한 질문의 분석이 있으면 LLM 호출 없이 반환"""
+    if not async_openai_client or not policies or SEMANTIC_CACHE_SIZE <= 0:
+        return await _ai_analyze_policies_llm(user_query, policies, region_code)
+
+    # 분석 프롬프트에 들어가는 정책(상위 5개) 기준으로 버킷을 나눔
+    bucket_key = (region_code, frozenset(p.get("plcyNo") for p in policies[:5]))
+    vector = None
+    try:
+        vector = await _embed_query(user_query)
+        cached = analysis_cache.lookup(bucket_key, vector)
+        if cached is not None:
+            value, similarity = cached
+            print(f"🧠 [AI-CACHE] 의미 캐시 적중 (유사도 {similarity:.3f})")
+            return {**value, "cache": {"hit": True, "similarity": round(similarity, 4)}}
+    except Exception as e:
+        print(f"🧠 [AI-CACHE] 임베딩 실패, 캐시 없이 분석: {e}")
+
+    result = await _ai_analyze_policies_llm(user_query, policies, region_code)
+    if vector is not None and result.get("ai_enhanced") and not result.get("fallback"):
+        analysis_cache.store(bucket_key, vector, result)
+    return {**result, "cache": {"hit": False}}
+
+async def _ai_analyze_policies_llm(user_query: str, policies: List[Dict], region_code: str) -> Dict[str, Any]:
     """AI를 활용한 정책 맞춤 분석 - 최적화 버전"""
-    if not openai_client or not policies:
+    if not async_openai_client or not policies:
         return {"ai_enhanced": False, "reason": "AI 비활성화 또는 정책 없음"}
     
     try:
@@ -146,14 +1056,8 @@ JSON만 답변:
 
         print(f"🤖 [AI-DEBUG] OpenAI API 호출 시작")
         
-        # 🚀 더 빠른 모델 사용 + 짧은 응답
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",  # gpt-4 → gpt-3.5-turbo로 변경 (더 빠름)
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.5,  # 0.7 → 0.5로 줄임
-            max_tokens=600,   # 1500 → 600으로 줄임
-            timeout=25        # 25초 타임아웃 설정
-        )
+        # 🚀 더 빠른 모델 사용 + 짧은 응답 (마감은 run_ai_tasks의 deadline이 관리)
+        response = await _chat_completion(prompt, temperature=0.5, max_tokens=600)
         
         print(f"🤖 [AI-DEBUG] OpenAI API 응답 완료")
         
@@ -170,9 +1074,10 @@ JSON만 답변:
         
     except Exception as e:
         print(f"🤖 [AI-ERROR] AI 분석 오류: {e}")
-        # 🚀 오류 시 기본 추천 반환 (AI 없이도 유용한 정보 제공)
+        # 🚀 오류 시 기본 추천 반환 (AI 없이도 유용한 정보 제공, 의미 캐시에는 저장하지 않음)
         return {
             "ai_enhanced": True,
+            "fallback": True,
             "analysis": {
                 "맞춤_추천": [
                     {
@@ -190,9 +1095,9 @@ JSON만 답변:
             "confidence": "기본 추천 (AI 오류로 인한 대체)"
         }
 
-def ai_generate_policy_insights(policies: List[Dict], region_code: str) -> Dict[str, Any]:
+async def ai_generate_policy_insights_async(policies: List[Dict], region_code: str) -> Dict[str, Any]:
     """정책 현황에 대한 AI 인사이트 생성 - 간소화 버전"""
-    if not openai_client or not policies:
+    if not async_openai_client or not policies:
         return {"insights_available": False}
     
     try:
@@ -224,13 +1129,7 @@ JSON만:
         print(f"🤖 [AI-DEBUG] 인사이트 OpenAI API 호출")
         
         # 🚀 빠른 모델 + 짧은 응답
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": stats_prompt}],
-            temperature=0.3,
-            max_tokens=300,
-            timeout=20  # 20초 타임아웃
-        )
+        response = await _chat_completion(stats_prompt, temperature=0.3, max_tokens=300)
         
         print(f"🤖 [AI-DEBUG] 인사이트 생성 완료")
         
@@ -247,9 +1146,10 @@ JSON만:
         
     except Exception as e:
         print(f"🤖 [AI-ERROR] 인사이트 생성 오류: {e}")
-        # 🚀 오류 시 기본 인사이트 반환
+        # 🚀 오류 시 기본 인사이트 반환 (fallback 표시 - 일괄 생성 캐시에는 저장하지 않음)
         return {
             "insights_available": True,
+            "fallback": True,
             "insights": {
                 "지역_특징": f"{region_name}의 청년정책 현황",
                 "강점": "다양한 분야의 정책 지원",
@@ -264,27 +1164,143 @@ JSON만:
             }
         }
 
+def ai_analyze_policies_for_user(user_query: str, policies: List[Dict], region_code: str) -> Dict[str, Any]:
+    """동기 호출용 - 마감 안에 끝나지 않으면 AI 결과 없이 반환"""
+    results, status = run_ai_tasks({"analysis": ai_analyze_policies_for_user_async(user_query, policies, region_code)})
+    return results.get("analysis") or {"ai_enhanced": False, "reason": f"AI 분석 {status['analysis']}"}
+
+def ai_generate_policy_insights(policies: List[Dict], region_code: str) -> Dict[str, Any]:
+    """동기 호출용 - 마감 안에 끝나지 않으면 인사이트 없이 반환"""
+    results, status = run_ai_tasks({"insights": ai_generate_policy_insights_async(policies, region_code)})
+    return results.get("insights") or {"insights_available": False, "reason": f"AI 인사이트 {status['insights']}"}
+
+# 📊 지역 인사이트 사전 계산 — 인사이트는 지역과 정책 목록에만 의존하므로
+#    스냅샷 버전마다 REGION_MAPPING 전체를 한 번에 생성해 두고 요청에서는 캐시만 읽음
+def _region_search_attempts(region_code: str, categories: Optional[str] = None) -> List[Dict[str, Any]]:
+    region_info = REGION_MAPPING[region_code]
+    search_attempts = []
+    for keyword in dict.fromkeys(region_info["keywords"] + region_info["province_keywords"]):
+        base_filter = {"plcyNm": keyword}
+        if categories: base_filter["lclsfNm"] = categories
+        search_attempts.append(base_filter)
+    return search_attempts
+
+def _region_policies_from_snapshot(snapshot: PolicySnapshot, region_code: str) -> List[Dict]:
+    """searchPoliciesByRegion과 같은 검색 + 지역 필터를 스냅샷 전체(페이지 제한 없음)에 적용"""
+    unique: Dict[str, Dict] = {}
+    for filters in _region_search_attempts(region_code):
+        for policy in snapshot.search(filters):
+            unique.setdefault(policy["plcyNo"], policy)
+    return filter_policies_for_region(list(unique.values()), region_code)
+
+class RegionInsightsCache:
+    """스냅샷 버전별 지역 인사이트 (디스크에 함께 저장해 재시작 후에도 바로 사용)"""
+
+    def __init__(self, path: str = YOUTH_INSIGHTS_PATH):
+        self.path = path
+        self.version: Optional[str] = None
+        self.regions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._shared_cache = None
+        self._checked_disk_at = 0.0
+        self._load_from_disk()
+
+    def _load_from_disk(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.version, self.regions = data["version"], data["regions"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, region_code: str) -> Optional[Dict[str, Any]]:
+        """현재 미러 스냅샷 버전으로 만든 인사이트만 반환"""
+        snapshot = policy_mirror.snapshot
+        if snapshot is None:
+            return None
+        if snapshot.version != self.version and self._shared_cache is not None:
+            # 멀티 워커: 담당 워커가 새 버전을 저장했을 수 있으므로 가끔 디스크를 다시 읽음
+            now = time.time()
+            if now - self._checked_disk_at > YOUTH_MIRROR_FOLLOW_INTERVAL:
+                self._checked_disk_at = now
+                self._load_from_disk()
+        if snapshot.version != self.version:
+            return None
+        return self.regions.get(region_code)
+
+    def ensure_for(self, snapshot: Optional[PolicySnapshot]):
+        if snapshot is None or not async_openai_client:
+            return
+        if snapshot.version == self.version:
+            return  # 이 버전에서 생성하지 못한 지역은 요청 시 실시간 생성으로 대체
+        cache = self._shared_cache
+        if cache is not None:
+            self._load_from_disk()
+            if snapshot.version == self.version:
+                return  # 다른 워커가 이미 생성해 저장함
+            if not cache.acquire_lease("youth.insights", YOUTH_REFRESH_LEASE_TTL):
+                return  # 다른 워커가 생성 중 (get()이 디스크에서 이어받음)
+        if not self._lock.acquire(blocking=False):
+            return  # 이미 생성 중
+        try:
+            self.rebuild(snapshot)
+        finally:
+            self._lock.release()
+            if cache is not None:
+                cache.release_lease("youth.insights")
+
+    def rebuild(self, snapshot: PolicySnapshot):
+        started = time.perf_counter()
+        coros = {
+            code: ai_generate_policy_insights_async(_region_policies_from_snapshot(snapshot, code), code)
+            for code in REGION_MAPPING
+        }
+        results, status = run_ai_tasks(coros, deadline=AI_BATCH_DEADLINE)
+        regions = {}
+        for code, insights in results.items():
+            # AI 오류로 대체된 기본 인사이트는 저장하지 않음 (요청 시 실시간 생성으로 대체)
+            if insights.get("insights_available") and not insights.get("fallback"):
+                regions[code] = {**insights, "snapshot_version": snapshot.version, "generated_at": time.time()}
+        self.version, self.regions = snapshot.version, regions
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp-{os.getpid()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "regions": self.regions}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 지역 인사이트 저장 실패: {e}")
+        print(f"📊 지역 인사이트 생성: {len(regions)}/{len(REGION_MAPPING)}개 지역 "
+              f"(version {snapshot.version}, {time.perf_counter() - started:.1f}s, 상태 {status})")
+
+    def status(self) -> Dict[str, Any]:
+        return {"version": self.version, "regions": sorted(self.regions)}
+
+region_insights = RegionInsightsCache()
+
+def attach_shared_cache(cache):
+    """멀티 워커 HTTP 서빙(src/mcp_http.py) — 미러 갱신과 지역 인사이트 생성을 한 워커만 하도록 연결"""
+    policy_mirror._shared_cache = cache
+    region_insights._shared_cache = cache
+
 # 🔄 기존 MCP 도구들 - 인터페이스 100% 유지하면서 AI 기능 추가
 @mcp.tool()
 def searchPoliciesByRegion(regionCode: str, pageNum: int = 1, pageSize: int = 50, 
                           categories: Optional[str] = None, 
-                          user_query: Optional[str] = None, **kwargs):
+                          user_query: Optional[str] = None,
+                          eligibility: Optional[Dict[str, Any]] = None, **kwargs):
     """
     지역별 청소년정책 검색 - AI 분석 추가 (기존 인터페이스 100% 호환)
     
     🆕 새로운 매개변수:
     - user_query: 사용자 질문 (AI 분석용, 선택사항)
+    - eligibility: 프로필 자격 조건 {age, income, employment, marital} (선택사항)
+      → 해당될 수 없는 정책은 AI 분석 전에 제외
     """
     if regionCode not in REGION_MAPPING:
         return {"status": "error", "message": f"지원하지 않는 지역코드: {regionCode}."}
 
-    region_info = REGION_MAPPING[regionCode]
-    search_attempts = []
-    search_keywords = region_info["keywords"] + region_info["province_keywords"]
-    for keyword in set(search_keywords):
-        base_filter = {"plcyNm": keyword}
-        if categories: base_filter["lclsfNm"] = categories
-        search_attempts.append(base_filter)
+    search_attempts = _region_search_attempts(regionCode, categories)
 
     print(f"🤖 [AI-DEBUG] searchPoliciesByRegion 호출됨")
     print(f"📍 [AI-DEBUG] regionCode: {regionCode}")
@@ -292,64 +1308,66 @@ def searchPoliciesByRegion(regionCode: str, pageNum: int = 1, pageSize: int = 50
     print(f"🔑 [AI-DEBUG] openai_client 상태: {openai_client is not None}")
 
     # 기존 API 호출 로직 그대로 유지
-    api_result = call_youth_api_enhanced(page_num=pageNum, page_size=pageSize, search_attempts=search_attempts)
+    with span("policy.query", attempts=len(search_attempts)) as sp:
+        api_result = query_policies(page_num=pageNum, page_size=pageSize, search_attempts=search_attempts)
+        sp.set(source=api_result.get("source", "api"), status=api_result["status"],
+               rows=len(api_result.get("policies") or []))
 
     if api_result["status"] == "ok":
         original_policies = api_result["policies"]
         
-        # 기존 필터링 로직 그대로 유지
-        target_keyword = region_info["keywords"][0]
-        sibling_keywords = set(region_info.get("sibling_city_keywords", []))
-
-        filtered_policies = []
-        for policy in original_policies:
-            full_text = " ".join(filter(None, [
-                policy.get("plcyNm", ""),
-                policy.get("plcyExplnCn", ""),
-                policy.get("cnsgNmor", ""),
-            ]))
-
-            if target_keyword in full_text:
-                filtered_policies.append(policy)
-                continue
+        # 지역 필터 - 정책별 지역 키워드 태그(수집 시 계산)와 집합 연산
+        with span("policy.region_filter", before=len(original_policies)) as sp:
+            filtered_policies = filter_policies_for_region(original_policies, regionCode)
+            sp.set(after=len(filtered_policies))
 
-            if any(sibling in full_text for sibling in sibling_keywords):
-                continue
-            
-            filtered_policies.append(policy)
+        # 자격요건 사전 필터 - 프로필이 해당될 수 없는 정책은 LLM에 보내지 않음
+        region_count = len(filtered_policies)
+        with span("policy.eligibility_filter", before=region_count, enabled=bool(eligibility)) as sp:
+            filtered_policies = filter_policies_by_eligibility(filtered_policies, eligibility)
+            sp.set(after=len(filtered_policies))
+        if eligibility:
+            print(f"🎯 [AI-DEBUG] 자격요건 필터: {region_count}개 → {len(filtered_policies)}개")
 
         # 🤖 AI 분석 추가 (사용자 쿼리가 있을 때만)
         ai_analysis = None
         ai_insights = None
+        ai_status = None
 
         print(f"🤖 [AI-DEBUG] AI 분석 시도 시작")
         print(f"🤖 [AI-DEBUG] user_query 존재: {user_query is not None}")
         print(f"🤖 [AI-DEBUG] filtered_policies 개수: {len(filtered_policies)}")
         
-        # 🚀 AI 분석을 별도 처리 (에러가 발생해도 정책 목록은 반환)
-        if user_query and filtered_policies and openai_client:
-            try:
-                print(f"🤖 [AI-DEBUG] AI 분석 실행 중...")
-                ai_analysis = ai_analyze_policies_for_user(user_query, filtered_policies, regionCode)
-                print(f"🤖 [AI-DEBUG] AI 분석 완료")
-            except Exception as e:
-                print(f"🤖 [AI-ERROR] AI 분석 중 오류: {e}")
-                ai_analysis = None
-            
-            try:
-                print(f"🤖 [AI-DEBUG] AI 인사이트 실행 중...")
-                ai_insights = ai_generate_policy_insights(filtered_policies, regionCode)
-                print(f"🤖 [AI-DEBUG] AI 인사이트 완료")
-            except Exception as e:
-                print(f"🤖 [AI-ERROR] AI 인사이트 중 오류: {e}")
-                ai_insights = None
+        # 🚀 AI 분석 + 인사이트를 동시에 실행하고, 마감(AI_DEADLINE) 안에 끝난 것만 포함
+        #    (에러가 발생하거나 늦어져도 정책 목록은 바로 반환)
+        #    인사이트는 스냅샷 버전별로 미리 생성해 둔 것이 있으면 LLM을 호출하지 않음
+        if user_query and filtered_policies and async_openai_client:
+            ai_insights = region_insights.get(regionCode)
+            ai_tasks = {"analysis": ai_analyze_policies_for_user_async(user_query, filtered_policies, regionCode)}
+            if ai_insights is None:
+                ai_tasks["insights"] = ai_generate_policy_insights_async(filtered_policies, regionCode)
+            print(f"🤖 [AI-DEBUG] AI 작업 {list(ai_tasks)} 동시 실행 중... (마감 {AI_DEADLINE:.0f}초)")
+            with span("policy.ai", tasks=",".join(ai_tasks), policies=len(filtered_policies)) as sp:
+                ai_results, ai_status = run_ai_tasks(ai_tasks)
+                sp.set(**{f"status_{name}": state for name, state in ai_status.items()})
+            ai_analysis = ai_results.get("analysis")
+            if ai_insights is None:
+                ai_insights = ai_results.get("insights")
+            else:
+                ai_status["insights"] = "cached"
+            print(f"🤖 [AI-DEBUG] AI 작업 상태: {ai_status}")
 
         # 기존 응답 구조 유지하면서 AI 결과 추가
         result = {
             "status": "ok" if filtered_policies else "no_results",
             "policies": filtered_policies,
             "total_count": len(filtered_policies),
-            "search_summary": f"API 검색 결과 {len(original_policies)}개 중, 최종 필터링 후 {len(filtered_policies)}개 발견"
+            "search_summary": f"API 검색 결과 {len(original_policies)}개 중, 최종 필터링 후 {len(filtered_policies)}개 발견",
+            # 일부 검색 시도가 실패/마감 초과해도 받은 결과는 반환하고 시도별 상태를 함께 전달
+            "partial": api_result.get("partial", False),
+            "search_attempts": api_result.get("attempts", []),
+            "source": api_result.get("source", "api"),
+            "eligibility_excluded": region_count - len(filtered_policies),
         }
         
         # 🤖 AI 결과가 있으면 추가 (기존 코드와 100% 호환)
@@ -361,6 +1379,9 @@ def searchPoliciesByRegion(regionCode: str, pageNum: int = 1, pageSize: int = 50
             result["ai_insights"] = ai_insights
             print(f"🤖 [AI-SUCCESS] AI 인사이트 결과 포함됨")
 
+        if ai_status:
+            result["ai_status"] = ai_status
+
         return result
 
     return api_result
@@ -371,8 +1392,10 @@ def searchYouthPolicies(pageNum: int = 1, pageSize: int = 20,
     """
     일반 청소년정책 검색 - AI 추천 기능 추가 (기존 인터페이스 호환)
     """
+    # MCP 클라이언트는 추가 검색 조건을 'kwargs' 필드 하나에 담아 보냄
+    kwargs = {**(kwargs.pop("kwargs", None) or {}), **kwargs}
     filters = {k: v for k, v in kwargs.items() if v is not None}
-    api_result = call_youth_api_enhanced(page_num=pageNum, page_size=pageSize, search_attempts=[filters])
+    api_result = query_policies(page_num=pageNum, page_size=pageSize, search_attempts=[filters])
     
     # 🤖 AI 분석 추가 (사용자 쿼리가 있을 때만)
     if user_query and api_result.get("status") == "ok" and api_result.get("policies"):
@@ -392,8 +1415,8 @@ def searchYouthPolicies(pageNum: int = 1, pageSize: int = 20,
 
 @mcp.tool()
 def getYouthPolicyDetail(policyNumber: str, **kwargs):
-    """기존 정책 상세 조회 - 변경 없음"""
-    return call_youth_api_enhanced(search_attempts=[{"plcyNo": policyNumber}])
+    """정책 상세 조회 - 로컬 미러에서 plcyNo로 바로 조회 (미러가 없으면 실시간 API)"""
+    return query_policies(search_attempts=[{"plcyNo": policyNumber}])
 
 @mcp.tool()
 def searchPoliciesByKeywords(keywords: str, regionCode: Optional[str] = None, 
@@ -406,7 +1429,7 @@ def searchPoliciesByKeywords(keywords: str, regionCode: Optional[str] = None,
     if regionCode:
         search_filters["sprvsnInstCdNm"] = REGION_MAPPING.get(regionCode, {}).get("name", "")
     
-    api_result = call_youth_api_enhanced(
+    api_result = query_policies(
         page_num=pageNum, 
         page_size=pageSize, 
         search_attempts=[search_filters]
@@ -443,7 +1466,10 @@ def ping():
         "message": f"Youth policy server (AI {ai_status}) pong",
         "ai_available": openai_client is not None,
         "openai_configured": bool(api_key),
-        "api_key_length": len(api_key) if api_key else 0
+        "api_key_length": len(api_key) if api_key else 0,
+        "policy_mirror": policy_mirror.status(),
+        "region_insights": region_insights.status(),
+        "analysis_cache": analysis_cache.metrics()
     }
 
 def main():
@@ -452,6 +1478,11 @@ def main():
         ai_status = "AI 활성화" if openai_client else "기본 모드"
         print(f"[YOUTH POLICY SERVER - {ai_status}] tools: {names}", flush=True)
     except Exception: pass
+    if os.getenv("MCP_TRANSPORT") == "streamable-http":
+        # 네트워크 서빙 (워커 수/공유 캐시/정상 종료): python -m src.youth_policy_server 로 실행
+        from src.mcp_http import serve_http
+        serve_http("youth_policy")
+        return
     mcp.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# recruitment-mcp> python -m pytest  — 테스트에서 src 패키지를 그대로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,131 @@
+# MCP 전송 시 도구 인자 왕복 — 오케스트레이터가 넘긴 인자가 in-process 호출과 같은 모양으로 도구에 도착하는지
+import asyncio
+import functools
+import inspect
+import json
+from typing import Any, Dict
+
+import pytest
+
+pytest.importorskip("mcp")
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+orchestrator = pytest.importorskip("src.enhanced_orchestrator")
+from src import server as recruitment_server
+from src import youth_policy_server
+from src.mcp_client_pool import pack_arguments
+
+SERVER_MODULES = {
+    "recruitment": orchestrator.server,
+    "realestate": orchestrator.realestate_server,
+    "youth_policy": orchestrator.youth_policy_server,
+}
+EXTRA_ARGUMENT = {"extraFilter": "R1050"}  # 가변 키워드 인자를 받는 도구에 함께 보내는 추가 인자
+
+
+def _sample_value(annotation):
+    if annotation is int:
+        return 1
+    if annotation is str:
+        return "11110"
+    return ["11110"]  # List[str]
+
+
+def sample_arguments(func) -> Dict[str, Any]:
+    """필수 매개변수는 타입에 맞는 값으로, 가변 키워드 인자를 받으면 추가 인자도 하나"""
+    arguments = {}
+    for name, param in inspect.signature(func).parameters.items():
+        if param.kind is inspect.Parameter.VAR_KEYWORD:
+            arguments.update(EXTRA_ARGUMENT)
+        elif param.default is inspect.Parameter.empty:
+            arguments[name] = _sample_value(param.annotation)
+    return arguments
+
+
+def var_keyword_name(func):
+    return next((name for name, p in inspect.signature(func).parameters.items()
+                 if p.kind is inspect.Parameter.VAR_KEYWORD), None)
+
+
+async def call_over_mcp(mcp_server, tool_name: str, arguments: Dict[str, Any]):
+    async with create_connected_server_and_client_session(mcp_server) as session:
+        return await session.call_tool(tool_name, arguments)
+
+
+@pytest.mark.parametrize(
+    "spec", orchestrator.TOOL_SPECS, ids=lambda spec: f"{spec.server}.{spec.name}"
+)
+def test_packed_arguments_pass_tool_schema(spec):
+    """도구와 같은 시그니처의 기록용 도구를 메모리 세션으로 호출 — 스키마 검증 통과 + 인자 보존"""
+    local_func = getattr(SERVER_MODULES[spec.server], spec.name)
+    received = []
+
+    @functools.wraps(local_func)
+    def recorder(**kwargs):
+        received.append(kwargs)
+        return {"status": "ok"}
+
+    test_server = FastMCP("argument-roundtrip")
+    test_server.add_tool(recorder, name=spec.name)
+    arguments = sample_arguments(local_func)
+
+    result = asyncio.run(call_over_mcp(test_server, spec.name, pack_arguments(local_func, arguments)))
+
+    assert not result.isError, result.content
+    (got,) = received
+    var_keyword = var_keyword_name(local_func)
+    for name, value in arguments.items():
+        if var_keyword is not None and name in EXTRA_ARGUMENT:
+            continue
+        assert got[name] == value
+    if var_keyword is not None:
+        assert got[var_keyword] == EXTRA_ARGUMENT
+
+
+def test_pack_arguments_uses_the_real_var_keyword_name():
+    packed = pack_arguments(recruitment_server.getRecruitmentDetail, {"path": "detail", "recruitSn": "R1"})
+    assert packed == {"path": "detail", "params": {"recruitSn": "R1"}}
+    # 이미 담아 보낸 인자는 한 번만 감쌈
+    assert pack_arguments(recruitment_server.getRecruitmentDetail, packed) == packed
+    # 가변 키워드 인자가 없는 도구는 그대로
+    assert pack_arguments(recruitment_server.listRecruitments, {"pageNo": 2}) == {"pageNo": 2}
+
+
+def test_get_recruitment_detail_sees_flat_params_over_mcp(monkeypatch):
+    calls = []
+
+    def fake_call_api(path, page_no=1, num_rows=10, filters=None):
+        calls.append({"path": path, "page_no": page_no, "num_rows": num_rows, "filters": filters})
+        return {"status": "success", "data": {}}
+
+    monkeypatch.setattr(recruitment_server, "call_api", fake_call_api)
+    arguments = {"path": "detail", "recruitSn": "R1", "numOfRows": 5}
+
+    recruitment_server.getRecruitmentDetail(**arguments)
+    packed = pack_arguments(recruitment_server.getRecruitmentDetail, arguments)
+    result = asyncio.run(call_over_mcp(recruitment_server.mcp, "getRecruitmentDetail", packed))
+
+    assert not result.isError, result.content
+    local, remote = calls
+    assert local == remote == {"path": "detail", "page_no": 1, "num_rows": 5, "filters": {"recruitSn": "R1"}}
+
+
+def test_search_youth_policies_sees_flat_filters_over_mcp(monkeypatch):
+    calls = []
+
+    def fake_query_policies(page_num=1, page_size=10, search_attempts=None, **kwargs):
+        calls.append({"page_num": page_num, "page_size": page_size, "search_attempts": search_attempts})
+        return {"status": "ok", "policies": []}
+
+    monkeypatch.setattr(youth_policy_server, "query_policies", fake_query_policies)
+    arguments = {"pageSize": 5, "plcyKywdNm": "주거"}
+
+    youth_policy_server.searchYouthPolicies(**arguments)
+    packed = pack_arguments(youth_policy_server.searchYouthPolicies, arguments)
+    result = asyncio.run(call_over_mcp(youth_policy_server.mcp, "searchYouthPolicies", packed))
+
+    assert not result.isError, result.content
+    local, remote = calls
+    assert local == remote
+    assert json.dumps(remote["search_attempts"], ensure_ascii=False) == '[{"plcyKywdNm": "주거"}]'
@@ -0,0 +1,19 @@
+# MCP HTTP 워커 앱 — MCP 엔드포인트 옆에 이 프로세스의 /metrics가 함께 노출되는지
+import pytest
+
+pytest.importorskip("mcp")
+testclient = pytest.importorskip("starlette.testclient")
+
+from src import metrics, mcp_http
+
+
+def test_metrics_route_is_mounted(monkeypatch, tmp_path):
+    monkeypatch.setenv("MCP_SERVE_SERVER", "youth_policy")
+    monkeypatch.setenv("MCP_SHARED_CACHE_PATH", str(tmp_path / "shared_cache.sqlite"))
+    metrics.CACHE_REQUESTS.inc(cache="tool_registry", result="hit")
+
+    response = testclient.TestClient(mcp_http.create_app()).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert 'cache="tool_registry",result="hit"' in response.text
@@ -0,0 +1,148 @@
+# QueryPlanner — 한 요청의 소비자들이 같은 엔드포인트를 부르면 한 번만 실행하고 소비자별로 잘라서 전달
+import asyncio
+
+import pytest
+
+from src.query_planner import QueryPlanner, plan_calls
+
+
+class FakeRegistry:
+    """acall 인자를 기록하고, 요청한 행 수만큼 채용 목록을 돌려주는 가짜 레지스트리"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def acall(self, server, tool, arguments, timeout=None):
+        self.calls.append((server, tool, dict(arguments)))
+        await asyncio.sleep(0)
+        if tool == "broken":
+            raise RuntimeError("connection reset")
+        rows = [{"id": i} for i in range(arguments.get("numOfRows", 0))]
+        return {"status": "success", "server": server, "tool": tool,
+                "result": {"numOfRows": arguments.get("numOfRows"), "data": {"result": rows}}}
+
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.registry = FakeRegistry()
+
+
+def listing(rows, page_no=1, **filters):
+    return {"pageNo": page_no, "numOfRows": rows, "filters": filters}
+
+
+def run(*coroutines):
+    async def main():
+        return await asyncio.gather(*coroutines)
+    return asyncio.run(main())
+
+
+def test_two_consumers_are_merged_and_sliced():
+    orchestrator = FakeOrchestrator()
+    planner = QueryPlanner(orchestrator)
+
+    summary, page = run(
+        planner.call("recruitment", "listRecruitments", listing(50)),
+        planner.call("recruitment", "listRecruitments", listing(20)),
+    )
+
+    assert orchestrator.registry.calls == [("recruitment", "listRecruitments", listing(50))]
+    assert len(summary["result"]["data"]["result"]) == 50
+    assert page["result"]["data"]["result"] == [{"id": i} for i in range(20)]
+    assert page["result"]["numOfRows"] == 20
+
+
+def test_consumers_in_different_handlers_share_one_call():
+    """핸들러가 각자 await해도 같은 차례에 들어온 호출은 함께 계획됨"""
+    orchestrator = FakeOrchestrator()
+    planner = QueryPlanner(orchestrator)
+
+    async def summary_handler():
+        jobs, rents = await asyncio.gather(
+            planner.call("recruitment", "listRecruitments", listing(50)),
+            planner.call("realestate", "getApartmentTrades", {"lawdcd": "44790", "pageNo": 1, "numOfRows": 15}),
+        )
+        return len(jobs["result"]["data"]["result"])
+
+    async def jobs_page_handler():
+        jobs = await planner.call("recruitment", "listRecruitments", listing(30))
+        return len(jobs["result"]["data"]["result"])
+
+    assert run(summary_handler(), jobs_page_handler()) == [50, 30]
+    assert [tool for _, tool, _ in orchestrator.registry.calls] == ["listRecruitments", "getApartmentTrades"]
+
+
+def test_merged_consumers_get_independent_results():
+    planner = QueryPlanner(FakeOrchestrator())
+    first, second = run(
+        planner.call("recruitment", "listRecruitments", listing(5)),
+        planner.call("recruitment", "listRecruitments", listing(5)),
+    )
+    first["result"]["data"]["result"].clear()
+    assert len(second["result"]["data"]["result"]) == 5
+
+
+def test_calls_that_cannot_be_merged_keep_their_arguments():
+    planned = plan_calls([
+        ("a", "recruitment", "listRecruitments", listing(50)),
+        ("b", "recruitment", "listRecruitments", listing(20, ncsCdLst="R600006")),  # 필터가 다름
+        ("c", "recruitment", "listRecruitments", listing(20, page_no=2)),          # 2페이지는 앞부분이 아님
+        ("d", "youth_policy", "searchPoliciesByRegion", {"regionCode": "44790", "pageNum": 1, "pageSize": 20}),
+        ("e", "youth_policy", "searchPoliciesByRegion", {"regionCode": "44790", "pageNum": 1, "pageSize": 30}),
+    ])
+    assert [p.consumers[0][0] for p in planned] == ["a", "b", "c", "d", "e"]
+    assert [p.arguments for p in planned][1:3] == [listing(20, ncsCdLst="R600006"), listing(20, page_no=2)]
+    # 지역 필터를 페이지 뒤에 적용하는 도구는 페이지 크기가 다르면 합치지 않음
+    assert [p.arguments["pageSize"] for p in planned[3:]] == [20, 30]
+
+
+def test_later_batch_is_planned_separately():
+    orchestrator = FakeOrchestrator()
+    planner = QueryPlanner(orchestrator)
+
+    async def sequential():
+        await planner.call("recruitment", "listRecruitments", listing(10))
+        return await planner.call("recruitment", "listRecruitments", listing(10))
+
+    asyncio.run(sequential())
+    assert len(orchestrator.registry.calls) == 2
+
+
+def test_exception_reaches_every_consumer():
+    planner = QueryPlanner(FakeOrchestrator())
+
+    async def both():
+        return await asyncio.gather(
+            planner.call("recruitment", "broken", {}),
+            planner.call("recruitment", "broken", {}),
+            return_exceptions=True,
+        )
+
+    errors = asyncio.run(both())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    web_api_handler = pytest.importorskip("src.web_api_handler")
+    handler = web_api_handler.WebAPIHandler()
+    registry = FakeRegistry()
+
+    async def acall(server, tool, arguments, timeout=None):
+        response = await registry.acall(server, tool, arguments, timeout)
+        if tool != "listRecruitments":
+            response["result"] = {"records": [], "policies": [], "months": [], "count": 0}
+        return response
+
+    monkeypatch.setattr(handler.orchestrator.registry, "acall", acall)
+    handler.registry_calls = registry.calls
+    return handler
+
+
+def test_region_pages_fetch_shared_job_listing_once(handler):
+    pages = asyncio.run(handler.search_region_pages("일자리", "44790"))
+
+    tools = [tool for _, tool, _ in handler.registry_calls]
+    assert tools.count("listRecruitments") == 1
+    assert pages["summary"]["success"] and pages["jobs"]["success"]
+    assert pages["realestate"]["success"] and pages["policies"]["success"]
@@ -0,0 +1,114 @@
+# 전월세 MCP 서버 — 도구 응답 형식, 예산 인덱스
+import random
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip("mcp")
+from src import realestate_server
+
+RENT_XML = (
+    "<response><header><resultCode>000</resultCode></header><body><items>"
+    "<item><aptNm>한빛</aptNm><deposit>1,000</deposit><monthlyRent>50</monthlyRent>"
+    "<dealYear>2025</dealYear><dealMonth>6</dealMonth><dealDay>3</dealDay></item>"
+    "</items><totalCount>41</totalCount></body></response>"
+)
+
+
+@pytest.fixture
+def archive_page(monkeypatch):
+    record = realestate_server.RentRecord("한빛", "", "", 1000, 50, 0.0, 0, 0, 20250603, "")
+    monkeypatch.setattr(
+        realestate_server, "load_rent_months",
+        lambda lawdcd, months, housing_type="apt": (
+            {months[0]: [record]}, {months[0]: {"source": "archive", "errors": []}}
+        ),
+    )
+    return realestate_server.getApartmentTrades("11110", "202506")
+
+
+@pytest.mark.parametrize("raw", [
+    {"status": "ok", "text": RENT_XML},
+    {"status": "ok", "data": {"response": {"body": {
+        "items": {"item": {"aptNm": "한빛", "deposit": "1,000", "monthlyRent": "50",
+                           "dealYear": "2025", "dealMonth": "6", "dealDay": "3"}},
+        "totalCount": 41,
+    }}}},
+], ids=["xml", "json"])
+def test_get_apartment_trades_api_path_matches_archive_schema(monkeypatch, archive_page, raw):
+    monkeypatch.setattr(realestate_server, "call_apt_rent_api", lambda **kwargs: raw)
+
+    response = realestate_server.getApartmentTrades("11110", "202506", filters={"aptNm": "한빛"})
+
+    assert set(response) == set(archive_page)
+    assert response["records"] == archive_page["records"]
+    assert response["totalCount"] == 41
+    assert response["source"] == "api"
+
+
+def test_get_apartment_trades_api_error_code_is_error(monkeypatch):
+    error_xml = "<response><header><resultCode>30</resultCode><resultMsg>KEY</resultMsg></header></response>"
+    monkeypatch.setattr(realestate_server, "call_apt_rent_api", lambda **kwargs: {"status": "ok", "text": error_xml})
+    response = realestate_server.getApartmentTrades("11110", "202506", filters={"aptNm": "한빛"})
+    assert response["status"] == "error"
+
+
+def _random_records(rng, n):
+    return [
+        realestate_server.RentRecord(
+            f"단지{i}", "", "", rng.choice(range(0, 50001, 500)), rng.choice(range(0, 201, 5)),
+            0.0, 0, 0, 20250600 + i % 28 + 1, "",
+        )
+        for i in range(n)
+    ]
+
+
+def test_budget_index_matches_linear_scan():
+    rng = random.Random(31)
+    for _ in range(100):
+        records = _random_records(rng, rng.randint(0, 120))
+        index = realestate_server.RentBudgetIndex(records)
+        for _ in range(10):
+            max_deposit = rng.choice([None, rng.randint(-1, 51000)])
+            max_rent = rng.choice([None, rng.randint(-1, 210)])
+            expected = sorted(
+                (r for r in records
+                 if (max_deposit is None or r.deposit <= max_deposit)
+                 and (max_rent is None or r.monthlyRent <= max_rent)),
+                key=lambda r: (r.deposit, r.monthlyRent),
+            )
+            got = index.query(max_deposit, max_rent)
+            assert sorted(got, key=lambda r: (r.deposit, r.monthlyRent, r.aptNm)) == \
+                sorted(expected, key=lambda r: (r.deposit, r.monthlyRent, r.aptNm))
+            assert [r.deposit for r in got] == sorted(r.deposit for r in got)
+            assert index.count(max_deposit, max_rent) == len(expected)
+
+
+def test_budget_index_pareto_front():
+    rng = random.Random(7)
+    for _ in range(100):
+        records = _random_records(rng, rng.randint(0, 80))
+        front = realestate_server.RentBudgetIndex(records).pareto_front
+        pairs = {(r.deposit, r.monthlyRent) for r in records}
+        undominated = {
+            (d, m) for d, m in pairs
+            if not any(d2 <= d and m2 <= m and (d2, m2) != (d, m) for d2, m2 in pairs)
+        }
+        assert [(r.deposit, r.monthlyRent) for r in front] == sorted(undominated, key=lambda p: (p[1], -p[0]))
+
+
+def test_budget_indexes_are_bounded_like_partitions(monkeypatch, tmp_path):
+    monkeypatch.setattr(realestate_server, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(realestate_server, "RENT_PARTITION_CACHE_SIZE", 2)
+    monkeypatch.setattr(realestate_server, "_partitions", OrderedDict())
+    monkeypatch.setattr(realestate_server, "_budget_indexes", OrderedDict())
+    months = ["202401", "202402", "202403"]
+    for month in months:
+        records = _random_records(random.Random(month), 5)
+        realestate_server._write_partition("11110", month, records, True)
+
+    for month in months:
+        index, info = realestate_server.get_budget_index("11110", month)
+        assert info["source"] == "archive" and index.count() == 5
+    assert list(realestate_server._budget_indexes) == [("apt", "11110", m) for m in months[1:]]
+    assert realestate_server.get_budget_index("11110", "202403")[1]["source"] == "index"
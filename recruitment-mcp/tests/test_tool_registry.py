@@ -0,0 +1,193 @@
+# ToolRegistry 호출 정책 — 캐시, 재시도, 제한 시간 응답 봉투
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.tool_registry import ToolRegistry, ToolSpec
+
+
+class FakeServer:
+    """호출 횟수를 세는 가짜 서버 모듈 — 도구 동작은 테스트마다 behaviour로 지정"""
+
+    def __init__(self):
+        self.calls = 0
+        self.behaviour = lambda **kwargs: {"items": [{"id": kwargs.get("id", 1)}]}
+        self._lock = threading.Lock()
+
+    def lookup(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        return self.behaviour(**kwargs)
+
+
+def make_registry(**spec_fields):
+    server = FakeServer()
+    registry = ToolRegistry({"fake": server})
+    registry.register(ToolSpec("fake", "lookup", **spec_fields))
+    return registry, server
+
+
+def test_cache_hit_returns_isolated_copy():
+    registry, server = make_registry(cache_ttl=60)
+
+    first = registry.call("fake", "lookup", {"id": 7})
+    first["result"]["items"].append({"id": "호출자가 고쳐 씀"})
+    second = registry.call("fake", "lookup", {"id": 7})
+    second["result"]["items"].clear()
+    third = registry.call("fake", "lookup", {"id": 7})
+
+    assert server.calls == 1
+    assert "cached" not in first
+    assert second["cached"] is True and third["cached"] is True
+    assert third["result"] == {"items": [{"id": 7}]}
+    assert registry.stats()["fake.lookup"]["cache_hits"] == 2
+
+
+def test_different_arguments_are_cached_separately():
+    registry, server = make_registry(cache_ttl=60)
+    registry.call("fake", "lookup", {"id": 1})
+    registry.call("fake", "lookup", {"id": 2})
+    assert server.calls == 2
+
+
+def test_error_result_is_not_cached():
+    registry, server = make_registry(cache_ttl=60)
+    server.behaviour = lambda **kwargs: {"status": "error", "message": "upstream 500"}
+
+    for _ in range(2):
+        response = registry.call("fake", "lookup", {"id": 1})
+        assert response["status"] == "success"
+        assert response["result"]["status"] == "error"
+    assert server.calls == 2
+    assert registry.stats()["fake.lookup"]["errors"] == 2
+
+
+def test_cache_key_none_skips_cache():
+    registry, server = make_registry(cache_ttl=60, cache_key=lambda arguments: None)
+    registry.call("fake", "lookup", {"id": 1})
+    registry.call("fake", "lookup", {"id": 1})
+    assert server.calls == 2
+
+
+def test_retries_exception_until_success():
+    registry, server = make_registry(retries=2, retry_backoff=0)
+    failures = iter([RuntimeError("1"), RuntimeError("2")])
+
+    def flaky(**kwargs):
+        error = next(failures, None)
+        if error is not None:
+            raise error
+        return {"ok": True}
+
+    server.behaviour = flaky
+    response = registry.call("fake", "lookup", {})
+    assert response == {"status": "success", "server": "fake", "tool": "lookup", "result": {"ok": True}}
+    assert server.calls == 3
+    assert registry.stats()["fake.lookup"]["retries"] == 2
+
+
+def test_retries_exhausted_returns_error_envelope():
+    registry, server = make_registry(retries=1, retry_backoff=0)
+
+    def broken(**kwargs):
+        raise RuntimeError("connection reset")
+
+    server.behaviour = broken
+    response = registry.call("fake", "lookup", {})
+    assert response["status"] == "error"
+    assert response["message"] == "connection reset"
+    assert server.calls == 2
+
+
+def test_error_result_is_retried_and_returned_when_retries_run_out():
+    registry, server = make_registry(retries=2, retry_backoff=0)
+    server.behaviour = lambda **kwargs: {"status": "error", "message": "busy"}
+    response = registry.call("fake", "lookup", {})
+    assert response["result"] == {"status": "error", "message": "busy"}
+    assert server.calls == 3
+
+
+def test_no_retries_by_default():
+    registry, server = make_registry()
+
+    def broken(**kwargs):
+        raise RuntimeError("boom")
+
+    server.behaviour = broken
+    assert registry.call("fake", "lookup", {})["status"] == "error"
+    assert server.calls == 1
+
+
+def _slow(**kwargs):
+    time.sleep(0.3)
+    return {"late": True}
+
+
+def test_call_timeout_envelope():
+    registry, server = make_registry(cache_ttl=60)
+    server.behaviour = _slow
+    response = registry.call("fake", "lookup", {}, timeout=0.05)
+    assert response["status"] == "error"
+    assert response["timed_out"] is True
+    assert response["server"] == "fake" and response["tool"] == "lookup"
+    assert registry.stats()["fake.lookup"]["timeouts"] == 1
+
+
+def test_acall_timeout_envelope():
+    registry, server = make_registry()
+    server.behaviour = _slow
+    response = asyncio.run(registry.acall("fake", "lookup", {}, timeout=0.05))
+    assert response["status"] == "error"
+    assert response["timed_out"] is True
+    assert registry.stats()["fake.lookup"]["timeouts"] == 1
+
+
+def test_acall_uses_cache():
+    registry, server = make_registry(cache_ttl=60)
+
+    async def twice():
+        return [await registry.acall("fake", "lookup", {"id": 3}) for _ in range(2)]
+
+    first, second = asyncio.run(twice())
+    assert server.calls == 1
+    assert second["cached"] is True and second["result"] == first["result"]
+
+
+def test_unknown_tool():
+    registry, _ = make_registry()
+    response = registry.call("fake", "missing", {})
+    assert response["status"] == "error"
+    assert "missing" in response["message"]
+
+
+def test_adapt_arguments_does_not_change_cache_key():
+    registry, server = make_registry(
+        cache_ttl=60, adapt_arguments=lambda arguments: {**arguments, "id": arguments.get("id", 99)}
+    )
+    assert registry.call("fake", "lookup", {})["result"] == {"items": [{"id": 99}]}
+    assert registry.call("fake", "lookup", {})["cached"] is True
+    assert server.calls == 1
+
+
+@pytest.fixture
+def shared_cache_key():
+    orchestrator = pytest.importorskip("src.enhanced_orchestrator")
+    return orchestrator._shared_cache_key
+
+
+def test_shared_cache_key_skips_personalised_queries(shared_cache_key):
+    assert shared_cache_key({"regionCode": "44790", "user_query": "월세 지원 받을 수 있나요?"}) is None
+    assert shared_cache_key({"regionCode": "44790", "user_query": ""}) is not None
+    assert shared_cache_key({"regionCode": "44790"}) == shared_cache_key({"regionCode": "44790"})
+
+
+def test_personalised_query_is_not_served_from_cache(shared_cache_key):
+    registry, server = make_registry(cache_ttl=60, cache_key=shared_cache_key)
+    arguments = {"regionCode": "44790", "user_query": "창업 지원"}
+    registry.call("fake", "lookup", arguments)
+    assert "cached" not in registry.call("fake", "lookup", arguments)
+    registry.call("fake", "lookup", {"regionCode": "44790"})
+    assert registry.call("fake", "lookup", {"regionCode": "44790"})["cached"] is True
+    assert server.calls == 3
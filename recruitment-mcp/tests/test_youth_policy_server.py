@@ -0,0 +1,156 @@
+# 청소년정책 서버 — 스냅샷 색인(날짜/자격요건)이 정책을 하나씩 검사하는 방식과 같은 결과를 내는지
+import copy
+import itertools
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("mcp")
+from src import youth_policy_server
+
+TODAY = date(2025, 6, 15)
+
+
+def baseline_is_active(policy, today: str) -> bool:
+    """색인 도입 전 PerfectChatbot.filter_active_policies의 정책 1건 판정"""
+    biz_end_date = policy.get("bizPrdEndYmd", "")
+    if biz_end_date and len(biz_end_date) == 8 and biz_end_date.isdigit() and biz_end_date < today:
+        return False
+    apply_period = policy.get("aplyYmd", "")
+    if apply_period and " ~ " in apply_period:
+        dates = apply_period.split(" ~ ")
+        if len(dates) == 2:
+            end_date = dates[1].strip()
+            if len(end_date) == 8 and end_date.isdigit() and end_date < today:
+                return False
+    elif apply_period and len(apply_period) == 8 and apply_period.isdigit() and apply_period < today:
+        return False
+    return True
+
+
+def _ymd(rng) -> str:
+    return (TODAY + timedelta(days=rng.randint(-400, 400))).strftime("%Y%m%d")
+
+
+def random_policy(rng, i: int) -> dict:
+    start, end = sorted([_ymd(rng), _ymd(rng)])
+    return {
+        "plcyNo": f"P{i:05d}",
+        "plcyNm": f"정책 {i}",
+        "bizPrdBgngYmd": rng.choice(["", start]),
+        "bizPrdEndYmd": rng.choice(["", end, _ymd(rng)]),
+        "aplyYmd": rng.choice(["", "상시", _ymd(rng), f"{start} ~ {end}"]),
+    }
+
+
+@pytest.fixture
+def policies(monkeypatch):
+    rng = random.Random(39)
+    policies = [random_policy(rng, i) for i in range(3000)]
+    snapshot = youth_policy_server.PolicySnapshot(policies, time.time())
+    monkeypatch.setattr(youth_policy_server.policy_mirror, "snapshot", snapshot)
+    return snapshot.policies
+
+
+def test_date_index_matches_linear_parse(policies):
+    today = TODAY.strftime("%Y%m%d")
+    expected = [p for p in policies if baseline_is_active(p, today)]
+
+    # 스냅샷 객체 그대로 / 캐시 사본(deepcopy) / 스냅샷에 없는 정책 모두 같은 판정
+    assert youth_policy_server.filter_active_policies(policies, TODAY.toordinal()) == expected
+    copies = copy.deepcopy(policies)
+    assert youth_policy_server.filter_active_policies(copies, TODAY.toordinal()) == expected
+    unknown = [{**p, "plcyNo": "X" + p["plcyNo"]} for p in policies]
+    assert youth_policy_server.filter_active_policies(unknown, TODAY.toordinal()) == [
+        p for p in unknown if baseline_is_active(p, today)
+    ]
+
+
+def test_modified_copy_is_parsed_again(policies):
+    policy = next(p for p in policies if baseline_is_active(p, TODAY.strftime("%Y%m%d")))
+    closed = {**policy, "bizPrdEndYmd": (TODAY - timedelta(days=1)).strftime("%Y%m%d")}
+    assert youth_policy_server.filter_active_policies([policy], TODAY.toordinal()) == [policy]
+    assert youth_policy_server.filter_active_policies([closed], TODAY.toordinal()) == []
+
+
+def test_multiple_apply_ranges_use_latest_end(policies):
+    """신청기간이 여러 개면 가장 늦은 마감 기준 (색인 도입 전에는 형식을 못 읽어 항상 유효로 취급)"""
+    multi = {"plcyNo": "M1", "aplyYmd": "20250101 ~ 20250131, 20250501 ~ 20250610"}
+    still_open = {**multi, "plcyNo": "M2", "aplyYmd": "20250101 ~ 20250131, 20250601 ~ 20250630"}
+    today = TODAY.strftime("%Y%m%d")
+    assert baseline_is_active(multi, today) and baseline_is_active(still_open, today)
+
+    assert youth_policy_server.filter_active_policies([multi, still_open], TODAY.toordinal()) == [still_open]
+    assert youth_policy_server.parse_policy_dates(multi).apply_end == date(2025, 6, 10).toordinal()
+
+
+def random_eligibility_policy(rng, i: int) -> dict:
+    min_age = rng.choice(["", "0", "15", "19", "25"])
+    return {
+        "plcyNo": f"E{i:05d}",
+        "sprtTrgtMinAge": min_age,
+        "sprtTrgtMaxAge": rng.choice(["", "0", "24", "34", "39"]),
+        "earnCndSeCd": rng.choice(["", "0043001", youth_policy_server.INCOME_ANNUAL]),
+        "earnMinAmt": rng.choice(["", "0", "1000"]),
+        "earnMaxAmt": rng.choice(["", "0", "3,600", "5000"]),
+        "jobCd": rng.choice(["", "0013003", "0013001,0013003", "0013006", "0013010", "0013003,0013010"]),
+        "mrgSttsCd": rng.choice(["", "0055001", "0055002", "0055003"]),
+    }
+
+
+ELIGIBILITY_CONDITIONS = [
+    {key: value for key, value in zip(("age", "income", "employment", "marital"), combo) if value is not None}
+    for combo in itertools.product(
+        (None, 17, 24, 30),
+        (None, 800, 3000, 6000),
+        (None, "미취업자", ["재직자", "(예비)창업자"]),
+        (None, "미혼", "기혼"),
+    )
+]
+
+
+@pytest.fixture
+def eligibility_policies(monkeypatch):
+    rng = random.Random(40)
+    policies = [random_eligibility_policy(rng, i) for i in range(500)]
+    snapshot = youth_policy_server.PolicySnapshot(policies, time.time())
+    monkeypatch.setattr(youth_policy_server.policy_mirror, "snapshot", snapshot)
+    return snapshot.policies
+
+
+def linear_eligibility_filter(policies, eligibility):
+    conditions = youth_policy_server.normalize_eligibility(eligibility)
+    return [
+        p for p in policies
+        if youth_policy_server.eligibility_allows(youth_policy_server.parse_policy_eligibility(p), **conditions)
+    ]
+
+
+@pytest.mark.parametrize("eligibility", ELIGIBILITY_CONDITIONS, ids=str)
+def test_eligibility_index_matches_linear_check(eligibility_policies, eligibility):
+    policies = eligibility_policies
+    expected = linear_eligibility_filter(policies, eligibility)
+    assert youth_policy_server.filter_policies_by_eligibility(policies, eligibility) == expected
+    assert youth_policy_server.filter_policies_by_eligibility(copy.deepcopy(policies), eligibility) == expected
+
+    # 자격요건을 고친 사본은 스냅샷 색인이 아니라 사본 값으로 판단
+    rng = random.Random(str(eligibility))
+    modified = [
+        {**p, "sprtTrgtMinAge": rng.choice(["", "20", "31"]), "mrgSttsCd": rng.choice(["", "0055001"])}
+        if i % 3 == 0 else p
+        for i, p in enumerate(policies)
+    ]
+    assert youth_policy_server.filter_policies_by_eligibility(modified, eligibility) == \
+        linear_eligibility_filter(modified, eligibility)
+
+
+def test_eligibility_excluded_is_cached_per_condition(eligibility_policies):
+    index = youth_policy_server.policy_mirror.snapshot.eligibility
+    first = index.excluded(age=24, job_codes=["0013003", "0013001"])
+    assert index.excluded(age=24, job_codes=["0013001", "0013003"]) is first
+    assert first == frozenset(
+        i for i, rule in enumerate(index.rules)
+        if not youth_policy_server.eligibility_allows(rule, age=24, job_codes=["0013003", "0013001"])
+    )